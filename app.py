@@ -1,37 +1,221 @@
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, flash, redirect, url_for, make_response, send_file
+from markupsafe import Markup
 from dotenv import load_dotenv
-from soap_service import SOAPService
+from roteamento import Roteador
+from resiliencia import EndpointIndisponivel, UltimosResultados
+from cache_fragmentos import CacheFragmentos
+from armazenamento_documentos import ArmazenamentoDocumentos
+from arquivos import diretorio_padrao
+from modelo import Processo, versao_conteudo
+from exportacao import ExportadorColunar, FORMATOS, exportar_processos
+from novidades import CursorExpirado, ServicoNovidades
+from compressao import configurar_compressao
+from log_estruturado import configurar_logging, configurar_requisicoes, registros_descartados
+from assets import configurar_assets
 import json
+import tempfile
+import zlib
+import shutil
+import zipfile
+import threading
+import time
 from datetime import datetime
 
 
-# Configurar logging para o app
-logging.basicConfig(level=logging.INFO) # <--- ADICIONAR ESTA LINHA
-logger = logging.getLogger(__name__)    # <--- ADICIONAR ESTA L
-
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Logging em JSON, fora da thread da requisição (LOG_NIVEL, LOG_FORMATO, LOG_AMOSTRAGEM_INFO)
+configurar_logging()
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
-# Configurar serviço SOAP
-WSDL_URL = os.getenv('SOAP_WSDL_URL')
-USUARIO = os.getenv('SOAP_USUARIO')
-SENHA = os.getenv('SOAP_SENHA')
-SERVIDOR_BASE = os.getenv('SOAP_SERVIDOR_BASE')
-# Corrigir lógica: se SOAP_VERIFY_SSL=false, então verify_ssl deve ser False
-VERIFY_SSL_STR = os.getenv('SOAP_VERIFY_SSL', 'true').lower()
-VERIFY_SSL = VERIFY_SSL_STR not in ('false', '0', 'no', 'n', 'off')
+# X-Request-ID e tempos por requisição (antes da compressão: registra a resposta final)
+configurar_requisicoes(app)
+
+# Compressão gzip/brotli das respostas HTML/JSON e assets versionados (python assets.py)
+configurar_compressao(
+    app,
+    nivel=int(os.getenv('COMPRESSAO_NIVEL', 6)),
+    tamanho_minimo=int(os.getenv('COMPRESSAO_MINIMO', 1024))
+)
+configurar_assets(app, max_age=int(os.getenv('ASSETS_MAX_AGE', 31536000)))
+
+# Roteamento dos processos para o endpoint SOAP do seu tribunal
+# (SOAP_* define o endpoint padrão; SOAP_TRIBUNAIS adiciona outros tribunais)
+_roteador = None
+_roteador_lock = threading.Lock()
+
+# Limite de processos por consulta em lote
+LOTE_MAX_PROCESSOS = int(os.getenv('LOTE_MAX_PROCESSOS', 100))
+# Segundos que os processos do lote esperam vaga no endpoint de um tribunal
+# lento; somado ao timeout SOAP, deve ficar abaixo do GUNICORN_TIMEOUT
+LOTE_PRAZO = float(os.getenv('LOTE_PRAZO', 60))
+
+# Máximo de processos por exportação via API (volumes maiores: python exportacao.py).
+# A exportação roda na thread da requisição: EXPORTACAO_PRAZO (segundos para
+# iniciar novos grupos de consulta) mais o timeout SOAP deve ficar abaixo do
+# GUNICORN_TIMEOUT; o que ficar de fora vai para a tabela de erros.
+EXPORTACAO_MAX_PROCESSOS = int(os.getenv('EXPORTACAO_MAX_PROCESSOS', 200))
+EXPORTACAO_PRAZO = float(os.getenv('EXPORTACAO_PRAZO', 60))
+
+# Cache de fragmentos HTML da página de resultado
+cache_fragmentos = CacheFragmentos(
+    max_itens=int(os.getenv('CACHE_FRAGMENTOS_MAX_ITENS', 2000)),
+    # Limite por tamanho: o bloco JSON de um processo grande passa de 1 MB
+    max_bytes=int(os.getenv('CACHE_FRAGMENTOS_MAX_MB', 64)) * 1024 * 1024
+)
+
+# Armazenamento local dos documentos baixados
+# (diretório próprio com permissão 0700; os menos acessados saem acima de DOCUMENTOS_MAX_MB)
+DOCUMENTOS_DIR = os.getenv('DOCUMENTOS_DIR', diretorio_padrao('documentos'))
+DOCUMENTOS_MAX_AGE = int(os.getenv('DOCUMENTOS_MAX_AGE', 31536000))
+armazenamento_documentos = ArmazenamentoDocumentos(
+    DOCUMENTOS_DIR,
+    max_bytes=int(os.getenv('DOCUMENTOS_MAX_MB', 2048)) * 1024 * 1024
+)
+
+# Últimos resultados por consulta, servidos quando o tribunal está indisponível
+ultimos_resultados = UltimosResultados(max_itens=int(os.getenv('ULTIMOS_RESULTADOS_MAX_ITENS', 1000)))
+
+# Feed de novidades (movimentos/documentos novos), compartilhado entre os workers
+# (diretório próprio fora do TMPDIR; snapshots comparados numa fila em segundo plano)
+novidades = ServicoNovidades(
+    os.getenv('NOVIDADES_DIR', diretorio_padrao('novidades')),
+    intervalo=int(os.getenv('NOVIDADES_INTERVALO', 300)),
+    tamanho_lote=int(os.getenv('NOVIDADES_WEBHOOK_LOTE', 50)),
+    espera_lote=float(os.getenv('NOVIDADES_WEBHOOK_ESPERA', 5)),
+    tentativas=int(os.getenv('NOVIDADES_WEBHOOK_TENTATIVAS', 5)),
+    max_snapshots=int(os.getenv('NOVIDADES_MAX_SNAPSHOTS', 50000)),
+    tamanho_fila=int(os.getenv('NOVIDADES_FILA', 1000)),
+    # Hosts aceitos nos webhooks, separados por vírgula (vazio = só hosts públicos)
+    hosts_webhook=[h.strip().lower() for h in os.getenv('NOVIDADES_WEBHOOK_HOSTS', '').split(',') if h.strip()]
+)
+NOVIDADES_LONG_POLL_MAX = int(os.getenv('NOVIDADES_LONG_POLL_MAX', 30))
+NOVIDADES_SSE_DURACAO = int(os.getenv('NOVIDADES_SSE_DURACAO', 300))
+# Long-poll e SSE prendem uma thread do worker enquanto esperam: no máximo
+# NOVIDADES_MAX_CONEXOES por worker (padrão: 1/4 das threads), o resto recebe 503
+NOVIDADES_MAX_CONEXOES = int(os.getenv('NOVIDADES_MAX_CONEXOES',
+                                       max(1, int(os.getenv('GUNICORN_THREADS', 8)) // 4)))
+conexoes_novidades = threading.BoundedSemaphore(NOVIDADES_MAX_CONEXOES)
+
+
+def get_roteador():
+    """Retorna o roteador de endpoints SOAP (criado no primeiro uso)"""
+    global _roteador
+    if _roteador is None:
+        with _roteador_lock:
+            if _roteador is None:
+                _roteador = Roteador.de_ambiente()
+    return _roteador
+
+
+def obter_cliente(numero_processo):
+    """Empresta um cliente SOAP do tribunal do processo (usar com 'with')"""
+    return get_roteador().cliente(numero_processo)
+
+
+def _consultar_processo(numero_processo, **opcoes):
+    """
+    Consulta o processo no tribunal, com fallback para o último resultado
+    
+    Se o endpoint estiver indisponível (circuito aberto ou sobrecarga), devolve
+    o último resultado obtido para a mesma consulta, quando houver. Em memória
+    o último resultado fica como modelo.Processo (página) e JSON compacto (API),
+    sem os dicionários da resposta.
+    
+    Returns:
+        tuple: (resultado, processo, versao, obtido_em) - dicionário da resposta,
+        modelo.Processo (None se a resposta não tem processo), hash do JSON
+        compacto da resposta inteira (ETag e cache) e timestamp do resultado
+        obsoleto, ou None se o resultado veio agora do tribunal
+    """
+    chave = (numero_processo, tuple(sorted(opcoes.items())))
+    try:
+        with obter_cliente(numero_processo) as soap_service:
+            resultado = soap_service.consultar_processo(numero_processo=numero_processo, **opcoes)
+    except EndpointIndisponivel as e:
+        anterior = ultimos_resultados.obter(chave)
+        if anterior is None:
+            raise
+        logger.warning(f"{e} - servindo resultado obsoleto de {numero_processo}")
+        (processo, resultado_json, versao), obtido_em = anterior
+        return app.json.loads(resultado_json), processo, versao, obtido_em
+    
+    processo = Processo.de_resposta(resultado, numero_processo)
+    resultado_json = app.json.dumps(resultado, separators=(',', ':'), ensure_ascii=False)
+    versao = versao_conteudo(resultado_json)
+    ultimos_resultados.guardar(chave, (processo, resultado_json, versao))
+    _registrar_novidades(numero_processo, processo, opcoes)
+    return resultado, processo, versao, None
+
+
+def _registrar_novidades(numero_processo, resultado, opcoes):
+    """Alimenta o feed de novidades com o resultado (ou modelo.Processo) vindo agora do tribunal"""
+    # Só consultas completas (sem filtro de datas) podem ser comparadas com o snapshot
+    if (not opcoes.get('incluir_movimentos', True) or not opcoes.get('incluir_documentos', True)
+            or opcoes.get('data_inicial') or opcoes.get('data_final')):
+        return
+    try:
+        novidades.registrar(numero_processo, resultado)
+    except Exception as e:
+        logger.error(f"Erro ao registrar novidades de {numero_processo}: {str(e)}")
+
+
+def _etag_resultado(numero_processo, versao, opcoes):
+    """ETag da página de resultado: processo + versão do conteúdo + opções da consulta"""
+    return f'{numero_processo}-{versao}-{_hash_opcoes(opcoes)}'
 
 
-def get_soap_service():
-    """Retorna instância do serviço SOAP"""
-    if not all([WSDL_URL, USUARIO, SENHA]):
-        raise ValueError("Configurações SOAP não encontradas. Configure as variáveis de ambiente.")
-    return SOAPService(WSDL_URL, USUARIO, SENHA, verify_ssl=VERIFY_SSL, servidor_base=SERVIDOR_BASE)
+def _hash_opcoes(opcoes):
+    """Identificador curto das opções da consulta (mudam os campos da resposta)"""
+    return format(zlib.crc32(repr(sorted(opcoes.items())).encode()), '08x')
+
+
+def _renderizar_resultado(resultado, processo, numero_processo, chave_json, obtido_em=None):
+    """
+    Monta a página de resultado a partir de fragmentos cacheados
+    
+    Cada card de movimento é cacheado pelos campos do próprio movimento e dos
+    documentos vinculados (tupla, sem serializar); o bloco JSON é cacheado pela
+    versão do processo e pelas opções da consulta (chave_json).
+    """
+    movimentos = processo.movimentos if processo else []
+    
+    cards = []
+    for mov in movimentos:
+        if not mov.ids_documentos:
+            continue
+        
+        docs_vinculados = [(id_doc, processo.documento(id_doc)) for id_doc in mov.ids_documentos]
+        chave = ('movimento', numero_processo, mov.id_movimento, mov.data_hora, mov.tipo,
+                 mov.descricao, tuple((id_doc, doc.hash, doc.titulo, doc.mimetype) if doc else id_doc
+                                      for id_doc, doc in docs_vinculados))
+        cards.append(cache_fragmentos.obter_ou_renderizar(
+            chave,
+            lambda: render_template('_movimento.html',
+                                    mov=mov,
+                                    docs_vinculados=docs_vinculados,
+                                    numero_processo=numero_processo)
+        ))
+    
+    json_html = cache_fragmentos.obter_ou_renderizar(
+        ('json', numero_processo) + chave_json,
+        lambda: render_template('_resultado_json.html', resultado=resultado)
+    )
+    
+    return render_template('resultado.html',
+                           possui_movimentos=bool(movimentos),
+                           total_movimentos=len(cards),
+                           movimentos_html=Markup(''.join(cards)),
+                           json_html=Markup(json_html),
+                           numero_processo=numero_processo,
+                           obtido_em=datetime.fromtimestamp(obtido_em) if obtido_em else None,
+                           data_consulta=datetime.now())
 
 
 @app.route('/')
@@ -40,21 +224,27 @@ def index():
     return render_template('index.html')
 
 
-@app.route('/consultar', methods=['POST'])
+@app.route('/consultar', methods=['GET', 'POST'])
 def consultar():
-    """Endpoint para consultar processo"""
+    """
+    Endpoint para consultar processo
+    
+    O formulário usa GET: a página tem URL própria e recarregar/voltar revalida
+    com If-None-Match (304 sem renderizar). POST continua aceito, sem ETag.
+    """
     try:
-        # Obter dados do formulário
-        numero_processo = request.form.get('numero_processo', '').strip()
-        data_inicial = request.form.get('data_inicial', '').strip()
-        data_final = request.form.get('data_final', '').strip()
+        # Obter dados do formulário (query string no GET, corpo no POST)
+        dados = request.args if request.method == 'GET' else request.form
+        numero_processo = dados.get('numero_processo', '').strip()
+        data_inicial = dados.get('data_inicial', '').strip()
+        data_final = dados.get('data_final', '').strip()
         
         # Opções booleanas
-        incluir_cabecalho = request.form.get('incluir_cabecalho') == 'on'
-        incluir_partes = request.form.get('incluir_partes') == 'on'
-        incluir_enderecos = request.form.get('incluir_enderecos') == 'on'
-        incluir_movimentos = request.form.get('incluir_movimentos') == 'on'
-        incluir_documentos = request.form.get('incluir_documentos') == 'on'
+        incluir_cabecalho = dados.get('incluir_cabecalho') == 'on'
+        incluir_partes = dados.get('incluir_partes') == 'on'
+        incluir_enderecos = dados.get('incluir_enderecos') == 'on'
+        incluir_movimentos = dados.get('incluir_movimentos') == 'on'
+        incluir_documentos = dados.get('incluir_documentos') == 'on'
         
         # Validar número do processo
         if not numero_processo:
@@ -68,11 +258,7 @@ def consultar():
             flash('Número do processo deve ter 20 dígitos', 'error')
             return redirect(url_for('index'))
         
-        # Criar serviço e consultar
-        soap_service = get_soap_service()
-        
-        resultado = soap_service.consultar_processo(
-            numero_processo=numero_processo,
+        opcoes = dict(
             data_inicial=data_inicial if data_inicial else None,
             data_final=data_final if data_final else None,
             incluir_cabecalho=incluir_cabecalho,
@@ -82,12 +268,29 @@ def consultar():
             incluir_documentos=incluir_documentos
         )
         
-        return render_template('resultado.html', 
-                             resultado=resultado,
-                             numero_processo=numero_processo,
-                             data_consulta=datetime.now())
+        # Criar serviço e consultar
+        resultado, processo, versao, obtido_em = _consultar_processo(numero_processo, **opcoes)
+        chave_json = (versao, _hash_opcoes(opcoes))
+        
+        if request.method != 'GET':
+            return _renderizar_resultado(resultado, processo, numero_processo, chave_json,
+                                         obtido_em=obtido_em)
+        
+        # Visualizações repetidas do mesmo conteúdo não precisam ser renderizadas
+        etag = _etag_resultado(numero_processo, versao, opcoes)
+        if obtido_em:
+            etag += '-obsoleto'
+        if request.if_none_match.contains_weak(etag):
+            resposta = app.response_class(status=304)
+        else:
+            resposta = make_response(_renderizar_resultado(resultado, processo, numero_processo, chave_json,
+                                                           obtido_em=obtido_em))
+        
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = 'private, no-cache'
+        return resposta
         
-    except ValueError as e:
+    except (ValueError, EndpointIndisponivel) as e:
         flash(str(e), 'error')
         return redirect(url_for('index'))
     except Exception as e:
@@ -117,10 +320,8 @@ def api_consultar():
             return jsonify({'error': 'Número do processo deve ter 20 dígitos'}), 400
         
         # Criar serviço e consultar
-        soap_service = get_soap_service()
-        
-        resultado = soap_service.consultar_processo(
-            numero_processo=numero_processo,
+        resultado, _, _, obtido_em = _consultar_processo(
+            numero_processo,
             data_inicial=data.get('data_inicial'),
             data_final=data.get('data_final'),
             incluir_cabecalho=data.get('incluir_cabecalho', True),
@@ -130,17 +331,289 @@ def api_consultar():
             incluir_documentos=data.get('incluir_documentos', True)
         )
         
-        return jsonify({
+        resposta = {
             'success': True,
             'data': resultado
-        })
+        }
+        if obtido_em:
+            # Tribunal indisponível: último resultado conhecido
+            resposta['stale'] = True
+            resposta['fetched_at'] = datetime.fromtimestamp(obtido_em).isoformat()
+        return jsonify(resposta)
         
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except EndpointIndisponivel as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
     except Exception as e:
         return jsonify({'error': f'Erro ao consultar processo: {str(e)}'}), 500
 
 
+@app.route('/api/consultar-lote', methods=['POST'])
+def api_consultar_lote():
+    """API endpoint para consultar vários processos em paralelo (retorna JSON)"""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'Dados não fornecidos'}), 400
+
+        numeros = data.get('numeros_processo') or []
+        if not isinstance(numeros, list) or not numeros:
+            return jsonify({'error': 'Lista numeros_processo é obrigatória'}), 400
+
+        if len(numeros) > LOTE_MAX_PROCESSOS:
+            return jsonify({'error': f'Máximo de {LOTE_MAX_PROCESSOS} processos por lote'}), 400
+
+        # Remover caracteres especiais e duplicados, mantendo a ordem
+        numeros_processo = list(dict.fromkeys(''.join(filter(str.isdigit, str(n))) for n in numeros))
+        invalidos = [n for n in numeros_processo if len(n) != 20]
+        if invalidos:
+            return jsonify({'error': 'Número do processo deve ter 20 dígitos', 'invalidos': invalidos}), 400
+
+        opcoes = {
+            'data_inicial': data.get('data_inicial'),
+            'data_final': data.get('data_final'),
+            'incluir_cabecalho': data.get('incluir_cabecalho', True),
+            'incluir_partes': data.get('incluir_partes', False),
+            'incluir_enderecos': data.get('incluir_enderecos', False),
+            'incluir_movimentos': data.get('incluir_movimentos', True),
+            'incluir_documentos': data.get('incluir_documentos', True)
+        }
+
+        def consultar_um(soap_service, numero_processo):
+            return soap_service.consultar_processo(numero_processo=numero_processo, **opcoes)
+
+        # Cada processo vai para o endpoint do seu tribunal, em paralelo
+        resultados = get_roteador().executar_em_paralelo(numeros_processo, consultar_um, prazo=LOTE_PRAZO)
+
+        # Fora do cliente emprestado: I/O local não conta como latência do tribunal
+        for numero_processo, (resultado, erro) in resultados.items():
+            if erro is None:
+                _registrar_novidades(numero_processo, resultado, opcoes)
+
+        return jsonify({
+            'success': True,
+            'data': {n: r for n, (r, erro) in resultados.items() if erro is None},
+            'erros': {n: str(erro) for n, (r, erro) in resultados.items() if erro is not None}
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro ao consultar processos: {str(e)}'}), 500
+
+
+@app.route('/api/exportar', methods=['POST'])
+def api_exportar():
+    """API endpoint para exportar movimentos, documentos e partes (retorna ZIP)"""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'Dados não fornecidos'}), 400
+
+        numeros = data.get('numeros_processo') or []
+        if not isinstance(numeros, list) or not numeros:
+            return jsonify({'error': 'Lista numeros_processo é obrigatória'}), 400
+
+        if len(numeros) > EXPORTACAO_MAX_PROCESSOS:
+            return jsonify({'error': f'Máximo de {EXPORTACAO_MAX_PROCESSOS} processos por exportação'}), 400
+
+        formato = data.get('formato')
+        if formato is not None and formato not in FORMATOS:
+            return jsonify({'error': f'Formato inválido (use {", ".join(FORMATOS)})'}), 400
+
+        # Remover caracteres especiais e duplicados, mantendo a ordem
+        numeros_processo = list(dict.fromkeys(''.join(filter(str.isdigit, str(n))) for n in numeros))
+        invalidos = [n for n in numeros_processo if len(n) != 20]
+        if invalidos:
+            return jsonify({'error': 'Número do processo deve ter 20 dígitos', 'invalidos': invalidos}), 400
+
+        # Tabelas gravadas em disco por lotes; o ZIP vai para um arquivo temporário
+        # anônimo (removido ao fechar) e o diretório de trabalho é apagado em seguida
+        diretorio = tempfile.mkdtemp(prefix='mni_exportacao_')
+        try:
+            with ExportadorColunar(diretorio, formato) as exportador:
+                exportar_processos(get_roteador(), numeros_processo, exportador,
+                                   prazo=EXPORTACAO_PRAZO,
+                                   data_inicial=data.get('data_inicial'),
+                                   data_final=data.get('data_final'),
+                                   incluir_partes=data.get('incluir_partes', True))
+
+            # Parquet/Arrow já são comprimidos; só o CSV é deflacionado
+            compressao = zipfile.ZIP_DEFLATED if exportador.formato == 'csv' else zipfile.ZIP_STORED
+            arquivo = tempfile.TemporaryFile()
+            with zipfile.ZipFile(arquivo, 'w', compression=compressao) as arquivo_zip:
+                for caminho in exportador.arquivos:
+                    arquivo_zip.write(caminho, os.path.basename(caminho))
+        finally:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+        arquivo.seek(0)
+        response = send_file(arquivo, mimetype='application/zip', as_attachment=True,
+                             download_name=f'exportacao_mni_{exportador.formato}.zip')
+        response.headers['X-Processos-Exportados'] = str(exportador.total_processos)
+        response.headers['X-Processos-Com-Erro'] = str(exportador.total_erros)
+        return response
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro ao exportar processos: {str(e)}'}), 500
+
+
+def _numeros_validos(numeros):
+    """Normaliza uma lista de números de processo; levanta ValueError se inválida"""
+    if not isinstance(numeros, list) or not numeros:
+        raise ValueError('Lista numeros_processo é obrigatória')
+    numeros_processo = list(dict.fromkeys(''.join(filter(str.isdigit, str(n))) for n in numeros))
+    if any(len(n) != 20 for n in numeros_processo):
+        raise ValueError('Número do processo deve ter 20 dígitos')
+    return numeros_processo
+
+
+def _filtro_assinatura():
+    """Números da assinatura informada em ?assinatura= (None = todos os processos)"""
+    id_assinatura = request.args.get('assinatura')
+    if not id_assinatura:
+        return None
+    assinatura = novidades.assinaturas.obter(id_assinatura)
+    if assinatura is None:
+        raise LookupError('Assinatura não encontrada')
+    return set(assinatura['numeros_processo'])
+
+
+@app.route('/api/assinaturas', methods=['POST'])
+def api_criar_assinatura():
+    """Cria uma assinatura de novidades (processos monitorados e webhook opcional)"""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'Dados não fornecidos'}), 400
+    
+    try:
+        numeros_processo = _numeros_validos(data.get('numeros_processo'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    webhook_url = data.get('webhook_url')
+    if webhook_url:
+        try:
+            novidades.validar_webhook_url(webhook_url)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    # O segredo (chave HMAC das entregas) só é mostrado na criação
+    assinatura = novidades.assinaturas.criar(numeros_processo, webhook_url)
+    return jsonify({'success': True, 'data': assinatura}), 201
+
+
+@app.route('/api/assinaturas/<id_assinatura>', methods=['GET', 'DELETE'])
+def api_assinatura(id_assinatura):
+    """Consulta ou remove uma assinatura de novidades"""
+    if request.method == 'DELETE':
+        if not novidades.assinaturas.remover(id_assinatura):
+            return jsonify({'error': 'Assinatura não encontrada'}), 404
+        return '', 204
+    
+    assinatura = novidades.assinaturas.obter(id_assinatura)
+    if assinatura is None:
+        return jsonify({'error': 'Assinatura não encontrada'}), 404
+    return jsonify({'success': True, 'data': {k: v for k, v in assinatura.items() if k != 'segredo'}})
+
+
+def _sem_vaga_novidades():
+    """Resposta para long-poll/SSE acima de NOVIDADES_MAX_CONEXOES neste worker"""
+    return jsonify({'error': 'Muitas conexões de novidades abertas; tente novamente'}), 503, {'Retry-After': '5'}
+
+
+@app.route('/api/novidades')
+def api_novidades():
+    """
+    Long-poll do feed de novidades
+    
+    Sem cursor, responde na hora com o cursor atual; com cursor, espera até
+    timeout segundos por eventos posteriores a ele. Cursor de um segmento do
+    diário já descartado: 410 com o cursor atual para ressincronizar.
+    """
+    try:
+        numeros = _filtro_assinatura()
+        timeout = min(max(request.args.get('timeout', 25, type=float), 0), NOVIDADES_LONG_POLL_MAX)
+        cursor = request.args.get('cursor')
+        if cursor:
+            if not conexoes_novidades.acquire(blocking=False):
+                return _sem_vaga_novidades()
+            try:
+                eventos, cursor = novidades.diario.aguardar(cursor, numeros, timeout=timeout)
+            finally:
+                conexoes_novidades.release()
+        else:
+            eventos, cursor = novidades.diario.ler(None)
+        return jsonify({'success': True, 'eventos': [evento for _, evento in eventos], 'cursor': cursor})
+    except CursorExpirado as e:
+        return jsonify({'error': str(e), 'cursor': e.cursor_atual}), 410
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/api/novidades/stream')
+def api_novidades_stream():
+    """
+    Feed de novidades via Server-Sent Events
+    
+    O id de cada evento é o cursor; ao reconectar o navegador envia
+    Last-Event-ID e o feed continua de onde parou. A conexão é encerrada
+    após NOVIDADES_SSE_DURACAO segundos para liberar a thread do worker, e a
+    vaga (NOVIDADES_MAX_CONEXOES) é devolvida quando a resposta é fechada.
+    Se o cursor expirar (segmento do diário descartado), o feed envia o evento
+    cursor_expirado e continua a partir do cursor atual.
+    """
+    try:
+        numeros = _filtro_assinatura()
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor') or novidades.diario.cursor_atual()
+    expirado = None
+    try:
+        novidades.diario.ler(cursor, numeros, limite=1)
+    except CursorExpirado as e:
+        expirado = e
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def cursor_expirado(erro):
+        dados = json.dumps({'error': str(erro), 'cursor': erro.cursor_atual}, ensure_ascii=False)
+        return f"id: {erro.cursor_atual}\nevent: cursor_expirado\ndata: {dados}\n\n"
+    
+    def gerar(cursor):
+        fim = time.monotonic() + NOVIDADES_SSE_DURACAO
+        yield 'retry: 3000\n\n'
+        if expirado is not None:
+            cursor = expirado.cursor_atual
+            yield cursor_expirado(expirado)
+        while time.monotonic() < fim:
+            try:
+                eventos, cursor = novidades.diario.aguardar(cursor, numeros, timeout=15)
+            except CursorExpirado as e:
+                cursor = e.cursor_atual
+                yield cursor_expirado(e)
+                continue
+            if not eventos:
+                yield ': ping\n\n'  # mantém proxies e balanceadores com a conexão aberta
+            for cursor_evento, evento in eventos:
+                yield f"id: {cursor_evento}\nevent: {evento['tipo']}\ndata: {json.dumps(evento, ensure_ascii=False)}\n\n"
+    
+    if not conexoes_novidades.acquire(blocking=False):
+        return _sem_vaga_novidades()
+    response = Response(gerar(cursor), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(conexoes_novidades.release)
+    return response
+
+
 @app.route('/debug/xml', methods=['POST'])
 def debug_xml():
     """Endpoint para visualizar XMLs de requisição e resposta"""
@@ -157,16 +630,15 @@ def debug_xml():
             flash('Número do processo deve ter 20 dígitos', 'error')
             return redirect(url_for('index'))
         
-        soap_service = get_soap_service()
-        
-        xml_data = soap_service.consultar_processo_raw_xml(
-            numero_processo=numero_processo,
-            incluir_cabecalho=True,
-            incluir_partes=False,
-            incluir_enderecos=False,
-            incluir_movimentos=True,
-            incluir_documentos=True
-        )
+        with obter_cliente(numero_processo) as soap_service:
+            xml_data = soap_service.consultar_processo_raw_xml(
+                numero_processo=numero_processo,
+                incluir_cabecalho=True,
+                incluir_partes=False,
+                incluir_enderecos=False,
+                incluir_movimentos=True,
+                incluir_documentos=True
+            )
         
         return render_template('debug_xml.html', 
                              xml_data=xml_data,
@@ -183,90 +655,140 @@ def sobre():
     return render_template('sobre.html')
 
 
-@app.route('/download-documento', methods=['POST'])
-def download_documento():
-    
-    logger.info(f"Iniciando download de documento################################################################")
-    """Endpoint para baixar documento do processo"""
+@app.route('/health/live')
+def health_live():
+    """Liveness: o processo está respondendo"""
+    return jsonify({'status': 'ok'})
+
+
+@app.route('/health/ready')
+def health_ready():
+    """Readiness: os clientes SOAP de todos os endpoints já estão aquecidos"""
     try:
-        # Obter dados do POST
-        numero_processo = request.form.get('numero_processo', '').strip()
-        id_documento = request.form.get('id_documento', '').strip()
-        id_movimento = request.form.get('id_movimento', '').strip()
-        descricao_movimento = request.form.get('descricao_movimento', '').strip()
-        
-        if not numero_processo or not id_documento:
-            flash('Número do processo e ID do documento são obrigatórios', 'error')
-            return redirect(request.referrer or url_for('index'))
-        
-        # Remover caracteres especiais do número do processo
-        numero_processo = ''.join(filter(str.isdigit, numero_processo))
-        
-        # Log de informações
-        logger.info(f"Download documento: Processo={numero_processo}, Doc={id_documento}, Mov={id_movimento}")
-        
-        # Criar serviço e consultar documento
-        soap_service = get_soap_service()
-        
+        roteador = get_roteador()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 503
+    
+    status = 'ready' if roteador.pronto else 'warming'
+    return jsonify({
+        'status': status,
+        'endpoints': roteador.estado(),
+        'logs_descartados': registros_descartados()
+    }), 200 if roteador.pronto else 503
+
+
+EXTENSOES_MIMETYPE = {
+    'application/pdf': 'pdf',
+    'text/html': 'html',
+    'text/plain': 'txt',
+    'application/msword': 'doc',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+}
+
+
+def _obter_documento(numero_processo, id_documento):
+    """
+    Retorna o documento do armazenamento local, baixando do MNI se necessário
+    
+    Returns:
+        dict: Metadados do documento armazenado (caminho, mimetype, hash)
+        
+    Raises:
+        ValueError: Se o MNI não retornar o documento
+    """
+    documento_local = armazenamento_documentos.obter(numero_processo, id_documento)
+    if documento_local:
+        return documento_local
+    
+    with obter_cliente(numero_processo) as soap_service:
         resultado = soap_service.consultar_documentos_processo(
             numero_processo=numero_processo,
             ids_documentos=id_documento
         )
+    
+    if not resultado.get('sucesso'):
+        raise ValueError(f'Erro ao baixar documento: {resultado.get("erro", "Erro desconhecido")}')
+    
+    # Obter primeiro documento
+    documentos = resultado.get('documentos', [])
+    if not documentos:
+        raise ValueError('Nenhum documento encontrado')
+    
+    documento = documentos[0]
+    conteudo = documento.get('conteudo')
+    if not conteudo:
+        raise ValueError('Documento sem conteúdo')
+    
+    return armazenamento_documentos.guardar(
+        numero_processo,
+        id_documento,
+        conteudo,
+        mimetype=documento.get('mimetype'),
+        hash_documento=documento.get('hash')
+    )
+
+
+@app.route('/documento/<numero_processo>/<id_documento>')
+def documento(numero_processo, id_documento):
+    """Download de documento via GET (cacheável, com suporte a Range e ETag)"""
+    try:
+        # Remover caracteres especiais do número do processo
+        numero_processo = ''.join(filter(str.isdigit, numero_processo))
         
-        if not resultado.get('sucesso'):
-            flash(f'Erro ao baixar documento: {resultado.get("erro", "Erro desconhecido")}', 'error')
-            return redirect(request.referrer or url_for('index'))
-        
-        # Obter primeiro documento
-        documentos = resultado.get('documentos', [])
-        if not documentos:
-            flash('Nenhum documento encontrado', 'error')
+        if not numero_processo or not id_documento:
+            flash('Número do processo e ID do documento são obrigatórios', 'error')
             return redirect(request.referrer or url_for('index'))
         
-        documento = documentos[0]
+        # Log de informações
+        logger.info(f"Download documento: Processo={numero_processo}, Doc={id_documento}",
+                    extra={'evento': 'download', 'numero_processo': numero_processo, 'id_documento': id_documento})
         
-        # Preparar resposta com arquivo
-        conteudo = documento.get('conteudo')
-        if not conteudo:
-            flash('Documento sem conteúdo', 'error')
-            return redirect(request.referrer or url_for('index'))
+        documento_local = _obter_documento(numero_processo, id_documento)
         
         # Determinar nome do arquivo e tipo MIME
-        mimetype = documento.get('mimetype', 'application/octet-stream')
-        extensao = {
-            'application/pdf': 'pdf',
-            'text/html': 'html',
-            'text/plain': 'txt',
-            'application/msword': 'doc',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
-            'image/jpeg': 'jpg',
-            'image/png': 'png',
-        }.get(mimetype, 'bin')
-        
-        # Criar nome do arquivo com informações do movimento se disponível
-        if descricao_movimento and id_movimento:
-            # Sanitizar descrição para usar no nome do arquivo
-            descricao_safe = ''.join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in descricao_movimento)
-            descricao_safe = descricao_safe[:50]  # Limitar tamanho
-            filename = f'mov_{id_movimento}_{descricao_safe}.{extensao}'
-        else:
-            filename = f'documento_{id_documento}.{extensao}'
-        
-        # Retornar arquivo para download
-        from flask import send_file
-        from io import BytesIO
-        
-        return send_file(
-            BytesIO(conteudo),
+        # (a URL identifica só o documento: a mesma URL vale para todos os movimentos)
+        mimetype = documento_local.get('mimetype') or 'application/octet-stream'
+        extensao = EXTENSOES_MIMETYPE.get(mimetype, 'bin')
+        filename = f'documento_{id_documento}.{extensao}'
+        
+        # Range, If-None-Match (hash do MNI) e If-Modified-Since tratados pelo send_file
+        resposta = send_file(
+            documento_local['caminho'],
             mimetype=mimetype,
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            conditional=True,
+            etag=documento_local['etag'],
+            max_age=DOCUMENTOS_MAX_AGE
         )
+        # Documentos de um processo não mudam, mas não devem ficar em caches compartilhados
+        resposta.headers['Cache-Control'] = f'private, max-age={DOCUMENTOS_MAX_AGE}, immutable'
+        return resposta
         
     except Exception as e:
         logger.error(f"Erro ao baixar documento: {str(e)}")
-        flash(f'Erro ao baixar documento: {str(e)}', 'error')
+        flash(str(e) if isinstance(e, ValueError) else f'Erro ao baixar documento: {str(e)}', 'error')
+        return redirect(request.referrer or url_for('index'))
+
+
+@app.route('/download-documento', methods=['POST'])
+def download_documento():
+    """Endpoint para baixar documento do processo (redireciona para a URL GET)"""
+    numero_processo = request.form.get('numero_processo', '').strip()
+    id_documento = request.form.get('id_documento', '').strip()
+    
+    # Remover caracteres especiais do número do processo
+    numero_processo = ''.join(filter(str.isdigit, numero_processo))
+    
+    if not numero_processo or not id_documento:
+        flash('Número do processo e ID do documento são obrigatórios', 'error')
         return redirect(request.referrer or url_for('index'))
+    
+    return redirect(url_for('documento',
+                            numero_processo=numero_processo,
+                            id_documento=id_documento), code=303)
 
 
 @app.route('/api/download-documento', methods=['POST'])
@@ -289,12 +811,11 @@ def api_download_documento():
         numero_processo = ''.join(filter(str.isdigit, numero_processo))
         
         # Criar serviço e consultar documento
-        soap_service = get_soap_service()
-        
-        resultado = soap_service.consultar_documentos_processo(
-            numero_processo=numero_processo,
-            ids_documentos=id_documento
-        )
+        with obter_cliente(numero_processo) as soap_service:
+            resultado = soap_service.consultar_documentos_processo(
+                numero_processo=numero_processo,
+                ids_documentos=id_documento
+            )
         
         if not resultado.get('sucesso'):
             return jsonify({
@@ -326,4 +847,5 @@ def internal_error(e):
 if __name__ == '__main__':
     port = int(os.getenv('FLASK_PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    novidades.iniciar(get_roteador)
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
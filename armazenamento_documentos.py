@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import logging
+
+from arquivos import criar_diretorio_privado, gravar_atomico
+
+logger = logging.getLogger(__name__)
+
+# Caracteres aceitos numa ETag sem aspas (RFC 9110: etagc, sem '"')
+_RE_ETAG = re.compile(r'[\x21\x23-\x7e]{1,128}')
+
+
+def etag_documento(hash_documento):
+    """ETag do documento: o hash do MNI, ou um SHA-256 dele se tiver aspas/espaços"""
+    if _RE_ETAG.fullmatch(hash_documento):
+        return hash_documento
+    return hashlib.sha256(hash_documento.encode('utf-8')).hexdigest()
+
+
+class ArmazenamentoDocumentos:
+    """
+    Armazena localmente os documentos já baixados do MNI
+
+    O diretório é criado com permissão 0700 (os arquivos, 0600). O tamanho
+    total é limitado a max_bytes: ao passar do limite, os documentos menos
+    acessados recentemente (mtime, atualizado a cada leitura) são removidos
+    até sobrar 90% do limite.
+    """
+
+    def __init__(self, diretorio, max_bytes=2 * 1024 ** 3, intervalo_varredura=60):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            diretorio: Diretório onde conteúdo e metadados são gravados
+            max_bytes: Tamanho máximo do armazenamento (0 = sem limite)
+            intervalo_varredura: Segundos entre recontagens do uso em disco
+                (outros workers também gravam no diretório)
+        """
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.intervalo_varredura = intervalo_varredura
+        criar_diretorio_privado(diretorio)
+        self._lock = threading.Lock()
+        self._uso_estimado = None
+        self._ultima_varredura = 0
+
+    def _caminho_base(self, numero_processo, id_documento):
+        """Retorna o caminho (sem extensão) do documento no disco"""
+        id_seguro = str(id_documento)
+        if not re.fullmatch(r'[A-Za-z0-9_-]{1,100}', id_seguro):
+            id_seguro = hashlib.sha256(id_seguro.encode('utf-8')).hexdigest()
+        pasta = os.path.join(self.diretorio, ''.join(filter(str.isdigit, numero_processo)))
+        return os.path.join(pasta, id_seguro)
+
+    def obter(self, numero_processo, id_documento):
+        """
+        Retorna o documento armazenado
+
+        Returns:
+            dict: 'caminho', 'mimetype', 'hash', 'etag' e 'tamanho', ou None se ausente
+        """
+        base = self._caminho_base(numero_processo, id_documento)
+        try:
+            with open(base + '.json', encoding='utf-8') as f:
+                metadados = json.load(f)
+            # Marca o acesso para a remoção por LRU
+            os.utime(base + '.bin')
+        except (OSError, ValueError):
+            return None
+
+        metadados['caminho'] = base + '.bin'
+        metadados['etag'] = etag_documento(metadados['hash'])
+        return metadados
+
+    def guardar(self, numero_processo, id_documento, conteudo, mimetype=None, hash_documento=None):
+        """
+        Grava conteúdo e metadados de um documento
+
+        Args:
+            numero_processo: Número do processo
+            id_documento: ID do documento no MNI
+            conteudo: Bytes do documento
+            mimetype: Tipo MIME informado pelo MNI
+            hash_documento: Hash informado pelo MNI (calculado se ausente)
+
+        Returns:
+            dict: Mesmo formato de obter()
+        """
+        base = self._caminho_base(numero_processo, id_documento)
+        pasta = os.path.dirname(base)
+        os.makedirs(pasta, mode=0o700, exist_ok=True)
+
+        metadados = {
+            'mimetype': mimetype or 'application/octet-stream',
+            'hash': hash_documento or hashlib.sha256(conteudo).hexdigest(),
+            'tamanho': len(conteudo)
+        }
+
+        # Gravação atômica: conteúdo antes dos metadados, ambos via rename
+        gravar_atomico(base + '.bin', conteudo)
+        gravar_atomico(base + '.json', json.dumps(metadados).encode('utf-8'))
+
+        logger.info(f"Documento armazenado localmente: {base}.bin ({len(conteudo)} bytes)")
+        self._contabilizar(len(conteudo))
+
+        metadados['caminho'] = base + '.bin'
+        metadados['etag'] = etag_documento(metadados['hash'])
+        return metadados
+
+    def _contabilizar(self, tamanho):
+        """Soma a gravação ao uso estimado e remove documentos antigos se passou do limite"""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            recontar = (self._uso_estimado is None
+                        or time.monotonic() - self._ultima_varredura > self.intervalo_varredura)
+            if not recontar:
+                self._uso_estimado += tamanho
+                if self._uso_estimado <= self.max_bytes:
+                    return
+            self._uso_estimado = self._liberar_espaco()
+            self._ultima_varredura = time.monotonic()
+
+    def _documentos(self):
+        """Lista (mtime, tamanho, base) de cada documento no disco"""
+        documentos = []
+        for pasta in os.scandir(self.diretorio):
+            if not pasta.is_dir(follow_symlinks=False):
+                continue
+            for arquivo in os.scandir(pasta.path):
+                if arquivo.name.endswith('.bin'):
+                    try:
+                        info = arquivo.stat()
+                    except FileNotFoundError:
+                        continue
+                    documentos.append((info.st_mtime, info.st_size, arquivo.path[:-4]))
+        return documentos
+
+    def _liberar_espaco(self):
+        """
+        Reconta o uso em disco e remove os documentos menos usados
+
+        Returns:
+            int: Bytes ocupados após a limpeza
+        """
+        documentos = self._documentos()
+        uso = sum(tamanho for _, tamanho, _ in documentos)
+        if uso <= self.max_bytes:
+            return uso
+
+        alvo = self.max_bytes * 0.9
+        removidos = 0
+        for _, tamanho, base in sorted(documentos):
+            if uso <= alvo:
+                break
+            # Metadados primeiro: sem eles o documento já conta como ausente
+            for extensao in ('.json', '.bin'):
+                try:
+                    os.remove(base + extensao)
+                except FileNotFoundError:
+                    pass
+            uso -= tamanho
+            removidos += 1
+
+        logger.info(f"Armazenamento de documentos: {removidos} documento(s) removido(s), {uso} bytes em uso")
+        return uso
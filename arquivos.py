@@ -0,0 +1,53 @@
+"""
+Diretórios e arquivos locais da aplicação
+
+Documentos baixados e o feed de novidades (com os segredos dos webhooks)
+ficam em diretórios próprios com permissão 0700, fora do TMPDIR
+compartilhado, e são gravados via arquivo temporário + rename, para que
+outros workers nunca leiam um arquivo pela metade.
+"""
+
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def diretorio_padrao(nome):
+    """
+    Diretório próprio da aplicação: $XDG_CACHE_HOME/consulta-mni/<nome>
+
+    Args:
+        nome: Subdiretório (ex: 'documentos', 'novidades')
+    """
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'consulta-mni', nome)
+
+
+def criar_diretorio_privado(diretorio):
+    """Cria o diretório com permissão 0700, restringindo também um diretório já existente"""
+    os.makedirs(diretorio, mode=0o700, exist_ok=True)
+    try:
+        os.chmod(diretorio, 0o700)
+    except OSError as e:
+        logger.warning(f"Não foi possível restringir as permissões de {diretorio}: {str(e)}")
+
+
+def gravar_atomico(destino, dados):
+    """
+    Grava os bytes via arquivo temporário (0600) na mesma pasta + rename
+
+    Args:
+        destino: Caminho final do arquivo (a pasta já deve existir)
+        dados: Conteúdo em bytes
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destino), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dados)
+        os.replace(temp_path, destino)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,119 @@
+"""
+Assets estáticos com hash no nome, pré-comprimidos e cache imutável
+
+Build (rodar no deploy, após alterar CSS/JS):
+
+    python assets.py
+
+copia cada arquivo de static/ para static/dist/ com o hash do conteúdo no
+nome (css/style.css -> css/style.1a2b3c4d5e6f.css), grava as versões .gz e
+.br (com o pacote opcional brotli) e o manifest.json com o mapeamento.
+
+Nos templates, asset_url('css/style.css') aponta para a versão com hash,
+servida em /assets/ com Cache-Control immutable e a codificação negociada
+já pronta em disco. Sem manifest (build não executado) cai em /static/.
+"""
+
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import shutil
+
+from compressao import MIMETYPES_COMPRIMIVEIS, codificacoes_disponiveis, comprimir, escolher_codificacao
+
+logger = logging.getLogger(__name__)
+
+DIRETORIO_DIST = 'dist'
+EXTENSOES_CODIFICACAO = {'br': '.br', 'gzip': '.gz'}
+
+
+def construir(diretorio_static, nivel=9):
+    """
+    Gera static/dist com os assets versionados e pré-comprimidos
+
+    Returns:
+        dict: Manifest (caminho original -> caminho com hash)
+    """
+    destino = os.path.join(diretorio_static, DIRETORIO_DIST)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+
+    manifest = {}
+    for raiz, pastas, arquivos in os.walk(diretorio_static):
+        if os.path.abspath(raiz) == os.path.abspath(diretorio_static):
+            pastas[:] = [p for p in pastas if p != DIRETORIO_DIST]
+        for nome in sorted(arquivos):
+            origem = os.path.join(raiz, nome)
+            relativo = os.path.relpath(origem, diretorio_static).replace(os.sep, '/')
+            with open(origem, 'rb') as f:
+                dados = f.read()
+
+            base, extensao = os.path.splitext(relativo)
+            versionado = f'{base}.{hashlib.sha256(dados).hexdigest()[:12]}{extensao}'
+            caminho = os.path.join(destino, versionado)
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, 'wb') as f:
+                f.write(dados)
+
+            if mimetypes.guess_type(nome)[0] in MIMETYPES_COMPRIMIVEIS:
+                for codificacao in codificacoes_disponiveis():
+                    comprimido = comprimir(dados, codificacao, nivel)
+                    if len(comprimido) < len(dados):
+                        with open(caminho + EXTENSOES_CODIFICACAO[codificacao], 'wb') as f:
+                            f.write(comprimido)
+
+            manifest[relativo] = versionado
+
+    with open(os.path.join(destino, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def configurar_assets(app, max_age=31536000):
+    """Registra asset_url nos templates e a rota /assets/ da aplicação"""
+    from flask import request, send_from_directory, url_for
+    from werkzeug.security import safe_join
+
+    diretorio = os.path.join(app.static_folder, DIRETORIO_DIST)
+    try:
+        with open(os.path.join(diretorio, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        logger.warning("Manifest de assets ausente: rode 'python assets.py'; usando /static/")
+        manifest = {}
+
+    @app.template_global()
+    def asset_url(caminho):
+        """URL do asset versionado (ou de /static/ se o build não foi executado)"""
+        versionado = manifest.get(caminho)
+        if versionado is None:
+            return url_for('static', filename=caminho)
+        return url_for('asset', filename=versionado)
+
+    @app.route('/assets/<path:filename>')
+    def asset(filename):
+        """Asset versionado: imutável e com a versão pré-comprimida negociada"""
+        caminho = safe_join(diretorio, filename)
+        codificacoes = [c for c in codificacoes_disponiveis()
+                        if caminho and os.path.isfile(caminho + EXTENSOES_CODIFICACAO[c])]
+        codificacao = escolher_codificacao(request.accept_encodings, codificacoes) if codificacoes else None
+
+        arquivo = filename + EXTENSOES_CODIFICACAO[codificacao] if codificacao else filename
+        response = send_from_directory(diretorio, arquivo, max_age=max_age,
+                                       mimetype=mimetypes.guess_type(filename)[0])
+        if codificacao:
+            response.headers['Content-Encoding'] = codificacao
+        if codificacoes:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = f'public, max-age={max_age}, immutable'
+        return response
+
+
+if __name__ == '__main__':
+    diretorio_static = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    manifest = construir(diretorio_static)
+    print(f"Codificações: {', '.join(codificacoes_disponiveis())}")
+    for original, versionado in manifest.items():
+        print(f"  {original} -> {DIRETORIO_DIST}/{versionado}")
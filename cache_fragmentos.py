@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+
+class CacheFragmentos:
+    """
+    Cache LRU em memória para fragmentos HTML já renderizados
+
+    Limitado pela quantidade de fragmentos e pelo tamanho somado deles
+    (len() de cada fragmento, ~bytes no HTML): o bloco JSON de um processo
+    grande passa de 1 MB, então o limite de itens sozinho não segura a
+    memória do worker.
+    """
+
+    def __init__(self, max_itens=2000, max_bytes=64 * 1024 * 1024):
+        """
+        Inicializa o cache
+
+        Args:
+            max_itens: Quantidade máxima de fragmentos mantidos em memória
+            max_bytes: Tamanho somado máximo dos fragmentos (0 = sem limite);
+                fragmentos maiores que o limite não são guardados
+        """
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna o fragmento armazenado para a chave ou None"""
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is not None:
+                self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave, valor):
+        """Armazena um fragmento, descartando os menos usados se necessário"""
+        tamanho = len(valor)
+        if self.max_bytes and tamanho > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._itens[chave] = valor
+            self._bytes += tamanho
+            while len(self._itens) > self.max_itens or (self.max_bytes and self._bytes > self.max_bytes):
+                _, removido = self._itens.popitem(last=False)
+                self._bytes -= len(removido)
+
+    def obter_ou_renderizar(self, chave, renderizar):
+        """
+        Retorna o fragmento em cache ou renderiza e armazena
+
+        Args:
+            chave: Chave do fragmento (tupla com número do processo e hash)
+            renderizar: Função sem argumentos que produz o fragmento
+
+        Returns:
+            Fragmento renderizado
+        """
+        valor = self.obter(chave)
+        if valor is None:
+            valor = renderizar()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        """Remove todos os fragmentos"""
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    @property
+    def tamanho_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,118 @@
+"""
+Servidor MNI 3.0 simulado para testes de carga
+
+Serve o WSDL (mni_stub.wsdl, com o placeholder [servidor] como nos tribunais)
+e responde consultarProcesso e consultarDocumentosProcesso com dados
+sintéticos e determinísticos:
+
+- processos cujo número começa com 9 são "grandes" (--movimentos-grande)
+- os demais têm --movimentos movimentos, cada um com um documento vinculado
+- documentos retornam um PDF falso de --tamanho-documento bytes
+
+Uso:
+    python carga/stub_mni.py --porta 8765 --atraso 50
+"""
+
+import argparse
+import base64
+import os
+import re
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+WSDL = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mni_stub.wsdl'), 'rb').read()
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:ns="http://www.cnj.jus.br/mni/v300/" '
+    'xmlns:tip="http://www.cnj.jus.br/mni/v300/tipos-servico-intercomunicacao" '
+    'xmlns:int="http://www.cnj.jus.br/mni/v300/intercomunicacao">'
+    '<soap:Body>{}</soap:Body></soap:Envelope>'
+)
+
+RE_NUMERO = re.compile(r'numeroProcesso[^>]*>(\d+)<')
+RE_ID_DOCUMENTO = re.compile(r'idDocumento[^>]*>([^<]+)<')
+
+
+def resposta_processo(numero, total_movimentos):
+    movimentos = ''.join(
+        f'<int:movimento dataHora="2025{(i // 28) % 12 + 1:02d}{i % 28 + 1:02d}1200{i % 60:02d}" '
+        f'idMovimento="{i}" tipoMovimento="T{i % 3}">'
+        f'<int:movimentoLocal codigoMovimento="{i % 7}" descricao="Juntada {i % 5}"/>'
+        f'<int:idDocumentoVinculado>{1000 + i}</int:idDocumentoVinculado></int:movimento>'
+        for i in range(total_movimentos)
+    )
+    documentos = ''.join(
+        f'<int:documento idDocumento="{1000 + i}" tipoDocumento="5" dataHora="20250101120000" '
+        f'mimetype="application/pdf" descricao="Documento {i % 9}" hash="h{i}">'
+        f'<int:outroParametro nome="rotulo" valor="Rótulo {i % 4}"/></int:documento>'
+        for i in range(total_movimentos)
+    )
+    return (
+        '<ns:respostaConsultarProcesso><tip:sucesso>true</tip:sucesso><tip:mensagem>ok</tip:mensagem>'
+        f'<tip:processo><int:dadosBasicos numero="{numero}" classeProcessual="7" '
+        'dataAjuizamento="20250101120000"><int:polo polo="AT"><int:parte>'
+        '<int:pessoa nome="Parte Autora" numeroDocumentoPrincipal="00000000000" tipoPessoa="fisica"/>'
+        f'</int:parte></int:polo></int:dadosBasicos>{movimentos}{documentos}</tip:processo>'
+        '</ns:respostaConsultarProcesso>'
+    )
+
+
+def resposta_documentos(ids_documentos, tamanho):
+    documentos = ''.join(
+        f'<tip:documentos idDocumento="{id_documento}" mimetype="application/pdf" hash="h{id_documento}">'
+        f'<int:conteudo>{base64.b64encode((b"%PDF-1.4 " + id_documento.encode() * tamanho)[:tamanho]).decode()}'
+        '</int:conteudo></tip:documentos>'
+        for id_documento in ids_documentos
+    )
+    return (
+        '<ns:respostaConsultarDocumentosProcesso><tip:sucesso>true</tip:sucesso>'
+        f'<tip:mensagem>ok</tip:mensagem>{documentos}</ns:respostaConsultarDocumentosProcesso>'
+    )
+
+
+class ManipuladorMNI(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, conteudo, tipo='text/xml; charset=utf-8'):
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(conteudo)))
+        self.end_headers()
+        self.wfile.write(conteudo)
+
+    def do_GET(self):
+        self._responder(WSDL, 'text/xml')
+
+    def do_POST(self):
+        corpo = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        if self.config.atraso:
+            time.sleep(self.config.atraso / 1000)
+
+        numero = RE_NUMERO.search(corpo).group(1)
+        if 'ConsultarDocumentos' in corpo:
+            resposta = resposta_documentos(RE_ID_DOCUMENTO.findall(corpo), self.config.tamanho_documento)
+        else:
+            total = self.config.movimentos_grande if numero.startswith('9') else self.config.movimentos
+            resposta = resposta_processo(numero, total)
+        self._responder(ENVELOPE.format(resposta).encode('utf-8'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor MNI simulado')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--atraso', type=int, default=0, help='Latência simulada por chamada (ms)')
+    parser.add_argument('--movimentos', type=int, default=30)
+    parser.add_argument('--movimentos-grande', type=int, default=2000)
+    parser.add_argument('--tamanho-documento', type=int, default=200000, help='Bytes por documento')
+    ManipuladorMNI.config = parser.parse_args()
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', ManipuladorMNI.config.porta), ManipuladorMNI)
+    servidor.daemon_threads = True
+    print(f"MNI simulado em http://127.0.0.1:{ManipuladorMNI.config.porta}/ws/mni.wsdl", flush=True)
+    servidor.serve_forever()
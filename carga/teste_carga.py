@@ -0,0 +1,430 @@
+"""
+Teste de carga e soak da aplicação Flask contra o MNI simulado
+
+Sobe o stub (carga/stub_mni.py) e a aplicação real (wsgi:app, com werkzeug
+ou gunicorn) em processos separados e dispara tráfego misto de vários
+usuários simultâneos:
+
+- navegacao: página inicial, GET /consultar de processos pequenos (metade
+  das repetições revalida com If-None-Match e deve receber 304; a rota
+  'GET /consultar (revalidação)' conta como erro cada 200) e /sobre
+- processo_grande: /consultar e /api/consultar de processos com milhares de
+  movimentos
+- download: lote de documentos via POST /download-documento (303 -> GET)
+
+Durante a execução amostra, no processo da aplicação (e workers), memória
+residente, descritores de arquivo abertos e arquivos no diretório temporário
+(TMPDIR exclusivo da aplicação). Ao final imprime vazão, percentis de
+latência por rota e o crescimento desses indicadores após o aquecimento, e
+sai com código 1 se algum limite for ultrapassado.
+
+Uso:
+    python carga/teste_carga.py --duracao 60 --usuarios 16
+    python carga/teste_carga.py --duracao 1800 --servidor gunicorn --perfil misto   # soak
+
+As métricas de processo usam /proc (Linux); em outros sistemas só a vazão e
+as latências são avaliadas.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+DIRETORIO_CARGA = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_PROJETO = os.path.dirname(DIRETORIO_CARGA)
+
+# Pesos de cada perfil no tráfego misto
+PERFIS = {
+    'navegacao': 70,
+    'processo_grande': 10,
+    'download': 20,
+}
+
+
+def numero_processo(indice, grande=False):
+    """Número CNJ sintético (20 dígitos); o stub trata os iniciados em 9 como grandes"""
+    return f"{'9' if grande else '0'}{indice:06d}1120248270001"
+
+
+def percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(int(round(p / 100 * (len(valores_ordenados) - 1))), len(valores_ordenados) - 1)
+    return valores_ordenados[indice]
+
+
+class Registro:
+    """Resultados das requisições (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.itens = []
+
+    def adicionar(self, rota, latencia, ok):
+        with self._lock:
+            self.itens.append((time.monotonic(), rota, latencia, ok))
+
+
+class Usuario:
+    """Usuário simulado: sessão HTTP própria executando ações dos perfis"""
+
+    def __init__(self, base, registro, args, semente):
+        self.base = base
+        self.registro = registro
+        self.args = args
+        self.sessao = requests.Session()
+        self.aleatorio = random.Random(semente)
+        self.etags = {}
+
+    def _requisicao(self, rota, metodo, caminho, status_ok=(200,), **kwargs):
+        inicio = time.perf_counter()
+        try:
+            resposta = self.sessao.request(metodo, self.base + caminho, timeout=self.args.timeout,
+                                           allow_redirects=False, **kwargs)
+            conteudo = resposta.content
+            ok = resposta.status_code in status_ok
+        except requests.RequestException:
+            resposta, conteudo, ok = None, b'', False
+        self.registro.adicionar(rota, time.perf_counter() - inicio, ok)
+        return resposta, conteudo
+
+    def navegacao(self):
+        self._requisicao('GET /', 'GET', '/')
+        numero = numero_processo(self.aleatorio.randrange(self.args.processos))
+        params = {
+            'numero_processo': numero,
+            'incluir_cabecalho': 'on',
+            'incluir_movimentos': 'on',
+            'incluir_documentos': 'on',
+        }
+        # ETag/304 só existem no GET (o formulário usa GET); o stub responde
+        # sempre o mesmo conteúdo, então toda revalidação deve dar 304
+        if numero in self.etags and self.aleatorio.random() < 0.5:
+            resposta, _ = self._requisicao('GET /consultar (revalidação)', 'GET', '/consultar',
+                                           status_ok=(304,), params=params,
+                                           headers={'If-None-Match': self.etags[numero]})
+        else:
+            resposta, _ = self._requisicao('GET /consultar', 'GET', '/consultar', params=params)
+        if resposta is not None and resposta.headers.get('ETag'):
+            self.etags[numero] = resposta.headers['ETag']
+        if self.aleatorio.random() < 0.2:
+            self._requisicao('GET /sobre', 'GET', '/sobre')
+
+    def processo_grande(self):
+        numero = numero_processo(self.aleatorio.randrange(self.args.processos_grandes), grande=True)
+        self._requisicao('POST /consultar (grande)', 'POST', '/consultar', data={
+            'numero_processo': numero,
+            'incluir_cabecalho': 'on',
+            'incluir_movimentos': 'on',
+            'incluir_documentos': 'on',
+        })
+        self._requisicao('POST /api/consultar (grande)', 'POST', '/api/consultar',
+                         json={'numero_processo': numero})
+
+    def download(self):
+        numero = numero_processo(self.aleatorio.randrange(self.args.processos))
+        for _ in range(self.args.documentos_por_lote):
+            id_documento = str(1000 + self.aleatorio.randrange(self.args.documentos_por_processo))
+            resposta, _ = self._requisicao('POST /download-documento', 'POST', '/download-documento',
+                                           status_ok=(303,), data={
+                                               'numero_processo': numero,
+                                               'id_documento': id_documento,
+                                           })
+            if resposta is not None and resposta.status_code == 303:
+                self._requisicao('GET /documento', 'GET', resposta.headers['Location'])
+
+    def executar(self, perfis, fim):
+        nomes = list(perfis)
+        pesos = [perfis[nome] for nome in nomes]
+        while time.monotonic() < fim:
+            getattr(self, self.aleatorio.choices(nomes, pesos)[0])()
+        self.sessao.close()
+
+
+def processos_da_arvore(pid):
+    """PID e descendentes (workers do gunicorn), via /proc"""
+    filhos = defaultdict(list)
+    for entrada in os.listdir('/proc'):
+        if entrada.isdigit():
+            try:
+                with open(f'/proc/{entrada}/stat') as f:
+                    campos = f.read().rsplit(')', 1)[1].split()
+                filhos[int(campos[1])].append(int(entrada))
+            except (OSError, IndexError):
+                continue
+    pids, pendentes = [], [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        pids.append(atual)
+        pendentes.extend(filhos.get(atual, []))
+    return pids
+
+
+def amostrar(pid, diretorio_temporario):
+    """RSS (MB), descritores abertos e arquivos temporários da aplicação"""
+    rss_kb = fds = 0
+    for p in processos_da_arvore(pid):
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for linha in f:
+                    if linha.startswith('VmRSS:'):
+                        rss_kb += int(linha.split()[1])
+            fds += len(os.listdir(f'/proc/{p}/fd'))
+        except OSError:
+            continue
+    temporarios = sum(len(arquivos) for _, _, arquivos in os.walk(diretorio_temporario))
+    return {'t': time.monotonic(), 'rss_mb': rss_kb / 1024, 'fds': fds, 'temporarios': temporarios}
+
+
+def aguardar(url, timeout=60):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if requests.get(url, timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'Sem resposta de {url} em {timeout}s')
+
+
+def iniciar_processos(args, diretorio):
+    """Sobe o stub MNI e a aplicação; retorna (stub, app, TMPDIR da aplicação)"""
+    log = open(os.path.join(diretorio, 'processos.log'), 'wb')
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(DIRETORIO_CARGA, 'stub_mni.py'),
+         '--porta', str(args.porta_stub), '--atraso', str(args.atraso_stub),
+         '--movimentos-grande', str(args.movimentos_grande),
+         '--movimentos', str(args.documentos_por_processo)],
+        stdout=log, stderr=subprocess.STDOUT)
+    aguardar(f'http://127.0.0.1:{args.porta_stub}/ws/mni.wsdl')
+
+    diretorio_temporario = os.path.join(diretorio, 'tmp')
+    os.makedirs(diretorio_temporario)
+    ambiente = dict(
+        os.environ,
+        SOAP_WSDL_URL=f'http://127.0.0.1:{args.porta_stub}/ws/mni.wsdl',
+        SOAP_SERVIDOR_BASE=f'http://127.0.0.1:{args.porta_stub}',
+        SOAP_USUARIO='carga',
+        SOAP_SENHA='carga',
+        SOAP_VERIFY_SSL='true',
+        SOAP_TRIBUNAIS='',
+        TMPDIR=diretorio_temporario,
+        # Dados persistentes da aplicação fora do TMPDIR monitorado: só
+        # temporários de verdade (ZIPs, uploads) contam como vazamento
+        DOCUMENTOS_DIR=os.path.join(diretorio, 'documentos'),
+        NOVIDADES_DIR=os.path.join(diretorio, 'novidades'),
+        XDG_CACHE_HOME=os.path.join(diretorio, 'cache'),
+        FLASK_SECRET_KEY='teste-carga',
+        GUNICORN_BIND=f'127.0.0.1:{args.porta_app}',
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_MAX_REQUESTS='0',  # sem reciclagem: vazamentos precisam aparecer
+    )
+
+    if args.servidor == 'gunicorn':
+        comando = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+    else:
+        comando = [sys.executable, '-c',
+                   'from werkzeug.serving import run_simple\n'
+                   'from wsgi import app\n'
+                   f'run_simple("127.0.0.1", {args.porta_app}, app, threaded=True)']
+    aplicacao = subprocess.Popen(comando, cwd=DIRETORIO_PROJETO, env=ambiente,
+                                 stdout=log, stderr=subprocess.STDOUT)
+    aguardar(f'http://127.0.0.1:{args.porta_app}/health/live')
+    return stub, aplicacao, diretorio_temporario
+
+
+def relatorio(registro, amostras, inicio_medicao, fim):
+    """Consolida os resultados medidos após o aquecimento"""
+    medidos = [item for item in registro.itens if item[0] >= inicio_medicao]
+    duracao = max(fim - inicio_medicao, 1e-9)
+    por_rota = defaultdict(list)
+    erros_por_rota = defaultdict(int)
+    for _, rota, latencia, ok in medidos:
+        por_rota[rota].append(latencia)
+        erros_por_rota[rota] += not ok
+
+    rotas = {}
+    for rota, latencias in sorted(por_rota.items()):
+        latencias.sort()
+        rotas[rota] = {
+            'requisicoes': len(latencias),
+            'erros': erros_por_rota[rota],
+            'vazao': len(latencias) / duracao,
+            'p50': percentil(latencias, 50),
+            'p90': percentil(latencias, 90),
+            'p95': percentil(latencias, 95),
+            'p99': percentil(latencias, 99),
+            'max': latencias[-1],
+        }
+
+    todas = sorted(item[2] for item in medidos)
+    resultado = {
+        'duracao': duracao,
+        'requisicoes': len(medidos),
+        'erros': sum(erros_por_rota.values()),
+        'taxa_erros': sum(erros_por_rota.values()) / len(medidos) if medidos else 1.0,
+        'vazao': len(medidos) / duracao,
+        'p95': percentil(todas, 95),
+        'p99': percentil(todas, 99),
+        'rotas': rotas,
+        'amostras': amostras,
+    }
+
+    # Crescimento entre o início e o fim da medição, pela média de até 3 amostras
+    # em cada ponta para não reagir a picos isolados (ex.: processo grande em curso)
+    medidas = [a for a in amostras if a['t'] >= inicio_medicao]
+    if len(medidas) >= 2:
+        n = min(3, len(medidas) // 2)
+        resultado['crescimento'] = {}
+        resultado['final'] = {}
+        for chave in ('rss_mb', 'fds', 'temporarios'):
+            inicial = sum(a[chave] for a in medidas[:n]) / n
+            final = sum(a[chave] for a in medidas[-n:]) / n
+            resultado['crescimento'][chave] = final - inicial
+            resultado['final'][chave] = medidas[-1][chave]
+    return resultado
+
+
+def avaliar(resultado, args):
+    """Lista de limites violados (vazia = aprovado)"""
+    falhas = []
+    if resultado['taxa_erros'] > args.max_taxa_erros:
+        falhas.append(f"taxa de erros {resultado['taxa_erros']:.2%} > {args.max_taxa_erros:.2%}")
+    if resultado['p95'] > args.max_p95:
+        falhas.append(f"p95 {resultado['p95'] * 1000:.0f}ms > {args.max_p95 * 1000:.0f}ms")
+    if resultado['vazao'] < args.min_vazao:
+        falhas.append(f"vazão {resultado['vazao']:.1f} req/s < {args.min_vazao:.1f} req/s")
+
+    crescimento = resultado.get('crescimento')
+    if crescimento:
+        if crescimento['rss_mb'] > args.max_crescimento_rss:
+            falhas.append(f"RSS cresceu {crescimento['rss_mb']:.1f}MB > {args.max_crescimento_rss:.0f}MB")
+        if crescimento['fds'] > args.max_crescimento_fds:
+            falhas.append(f"descritores abertos cresceram {crescimento['fds']:.0f} > {args.max_crescimento_fds}")
+        if crescimento['temporarios'] > args.max_crescimento_temporarios:
+            falhas.append(f"arquivos temporários cresceram {crescimento['temporarios']:.0f} > "
+                          f"{args.max_crescimento_temporarios}")
+    return falhas
+
+
+def imprimir(resultado, falhas):
+    print(f"\nDuração medida: {resultado['duracao']:.0f}s  Requisições: {resultado['requisicoes']}  "
+          f"Vazão: {resultado['vazao']:.1f} req/s  Erros: {resultado['erros']} "
+          f"({resultado['taxa_erros']:.2%})\n")
+    print(f"{'Rota':<32}{'req':>7}{'erros':>7}{'req/s':>8}{'p50':>8}{'p90':>8}{'p95':>8}{'p99':>8}{'max':>8}")
+    for rota, r in resultado['rotas'].items():
+        print(f"{rota:<32}{r['requisicoes']:>7}{r['erros']:>7}{r['vazao']:>8.1f}"
+              + ''.join(f"{r[p] * 1000:>6.0f}ms" for p in ('p50', 'p90', 'p95', 'p99', 'max')))
+
+    if 'crescimento' in resultado:
+        final, crescimento = resultado['final'], resultado['crescimento']
+        print(f"\nRSS: {final['rss_mb']:.1f}MB ({crescimento['rss_mb']:+.1f}MB)  "
+              f"Descritores: {final['fds']} ({crescimento['fds']:+.0f})  "
+              f"Temporários: {final['temporarios']} ({crescimento['temporarios']:+.0f})")
+    else:
+        print("\nMétricas de processo indisponíveis (requer /proc)")
+
+    print()
+    for falha in falhas:
+        print(f"❌ {falha}")
+    print("✅ Aprovado" if not falhas else "❌ Reprovado")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga/soak contra o MNI simulado')
+    parser.add_argument('--duracao', type=float, default=60, help='Segundos de carga (incluindo aquecimento)')
+    parser.add_argument('--aquecimento', type=float,
+                        help='Segundos iniciais fora da medição, enquanto os caches enchem '
+                             '(padrão: um terço da duração, no mínimo 10s)')
+    parser.add_argument('--usuarios', type=int, default=16, help='Usuários simultâneos')
+    parser.add_argument('--perfil', choices=['misto'] + list(PERFIS), default='misto')
+    parser.add_argument('--servidor', choices=['werkzeug', 'gunicorn'], default='werkzeug')
+    parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn')
+    parser.add_argument('--amostragem', type=float, default=5, help='Intervalo entre amostras (s)')
+    parser.add_argument('--timeout', type=float, default=60, help='Timeout por requisição (s)')
+    parser.add_argument('--porta-app', type=int, default=5055)
+    parser.add_argument('--porta-stub', type=int, default=8766)
+    parser.add_argument('--atraso-stub', type=int, default=20, help='Latência simulada do MNI (ms)')
+    parser.add_argument('--processos', type=int, default=200, help='Processos pequenos distintos')
+    parser.add_argument('--processos-grandes', type=int, default=5, help='Processos grandes distintos')
+    parser.add_argument('--movimentos-grande', type=int, default=2000)
+    parser.add_argument('--documentos-por-processo', type=int, default=30)
+    parser.add_argument('--documentos-por-lote', type=int, default=5)
+    parser.add_argument('--max-taxa-erros', type=float, default=0.01)
+    parser.add_argument('--max-p95', type=float, default=5.0, help='Limite do p95 geral (s)')
+    parser.add_argument('--min-vazao', type=float, default=0.0, help='Vazão mínima (req/s)')
+    parser.add_argument('--max-crescimento-rss', type=float, default=64, help='MB após o aquecimento')
+    parser.add_argument('--max-crescimento-fds', type=int, default=16)
+    parser.add_argument('--max-crescimento-temporarios', type=int, default=0)
+    parser.add_argument('--json', metavar='ARQUIVO', help='Grava o resultado completo em JSON')
+    args = parser.parse_args()
+
+    if args.aquecimento is None:
+        args.aquecimento = max(args.duracao / 3, 10)
+    perfis = PERFIS if args.perfil == 'misto' else {args.perfil: 1}
+    diretorio = tempfile.mkdtemp(prefix='mni_carga_')
+    stub = aplicacao = None
+    try:
+        stub, aplicacao, diretorio_temporario = iniciar_processos(args, diretorio)
+        print(f"Aplicação ({args.servidor}) e MNI simulado no ar; {args.usuarios} usuários, "
+              f"perfil {args.perfil}, {args.duracao:.0f}s")
+
+        com_proc = os.path.isdir('/proc/self/fd')
+        amostras = []
+        inicio = time.monotonic()
+        fim = inicio + args.duracao
+        registro = Registro()
+        usuarios = [Usuario(f'http://127.0.0.1:{args.porta_app}', registro, args, semente)
+                    for semente in range(args.usuarios)]
+        threads = [threading.Thread(target=u.executar, args=(perfis, fim), daemon=True) for u in usuarios]
+        for thread in threads:
+            thread.start()
+
+        while time.monotonic() < fim:
+            time.sleep(min(args.amostragem, max(fim - time.monotonic(), 0)))
+            if com_proc:
+                amostra = amostrar(aplicacao.pid, diretorio_temporario)
+                amostras.append(amostra)
+                print(f"  t={amostra['t'] - inicio:5.0f}s  req={len(registro.itens):6d}  "
+                      f"rss={amostra['rss_mb']:7.1f}MB  fds={amostra['fds']:4d}  "
+                      f"tmp={amostra['temporarios']:4d}", flush=True)
+
+        for thread in threads:
+            thread.join(args.timeout)
+
+        resultado = relatorio(registro, amostras, inicio + args.aquecimento, time.monotonic())
+        falhas = avaliar(resultado, args)
+        imprimir(resultado, falhas)
+
+        if args.json:
+            for amostra in resultado['amostras']:
+                amostra['t'] -= inicio
+            resultado['falhas'] = falhas
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+        return 1 if falhas else 0
+    finally:
+        for processo in (aplicacao, stub):
+            if processo is not None:
+                processo.terminate()
+                try:
+                    processo.wait(10)
+                except subprocess.TimeoutExpired:
+                    processo.kill()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import gzip
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Tipos de texto que compensam comprimir
+MIMETYPES_COMPRIMIVEIS = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+})
+
+
+def codificacoes_disponiveis():
+    """Codificações suportadas, na ordem de preferência"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def escolher_codificacao(accept_encodings, codificacoes=None):
+    """
+    Escolhe a codificação aceita pelo cliente (cabeçalho Accept-Encoding)
+
+    Args:
+        accept_encodings: request.accept_encodings
+        codificacoes: Candidatas em ordem de preferência (padrão: disponíveis)
+
+    Returns:
+        str ou None se o cliente não aceita nenhuma
+    """
+    for codificacao in codificacoes or codificacoes_disponiveis():
+        if accept_encodings[codificacao] > 0:
+            return codificacao
+    return None
+
+
+def comprimir(dados, codificacao, nivel=6):
+    """Comprime com gzip (níveis 1-9) ou brotli (nível convertido para 0-11)"""
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=min(round(nivel * 11 / 9), 11))
+    # mtime=0: mesmo conteúdo gera os mesmos bytes
+    return gzip.compress(dados, compresslevel=nivel, mtime=0)
+
+
+def configurar_compressao(app, nivel=6, tamanho_minimo=1024):
+    """
+    Comprime respostas dinâmicas de texto (HTML/JSON) conforme Accept-Encoding
+
+    Não comprime respostas em streaming (SSE, downloads), arquivos servidos
+    com send_file nem respostas menores que tamanho_minimo. O ETag passa a ser
+    fraco, já que os bytes dependem da codificação negociada.
+
+    Args:
+        app: Aplicação Flask
+        nivel: Nível de compressão (1-9)
+        tamanho_minimo: Bytes abaixo dos quais a resposta vai sem compressão
+    """
+    from flask import request
+
+    def enfraquecer_etag(response):
+        etag, fraco = response.get_etag()
+        if etag and not fraco:
+            response.set_etag(etag, weak=True)
+
+    def comprimivel(response):
+        # 304 de send_file mantém direct_passthrough e o mimetype do arquivo
+        return not (response.direct_passthrough or response.is_streamed
+                    or 'Content-Encoding' in response.headers
+                    or response.mimetype not in MIMETYPES_COMPRIMIVEIS)
+
+    @app.after_request
+    def comprimir_resposta(response):
+        if response.status_code == 304:
+            # Mantém o ETag do 304 igual ao da resposta completa, se ela for comprimida
+            if comprimivel(response) and escolher_codificacao(request.accept_encodings):
+                response.vary.add('Accept-Encoding')
+                enfraquecer_etag(response)
+            return response
+
+        if response.status_code < 200 or response.status_code in (204, 206) or not comprimivel(response):
+            return response
+
+        dados = response.get_data()
+        if len(dados) < tamanho_minimo:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacao = escolher_codificacao(request.accept_encodings)
+        if codificacao is None:
+            return response
+
+        response.set_data(comprimir(dados, codificacao, nivel))
+        response.headers['Content-Encoding'] = codificacao
+        enfraquecer_etag(response)
+        return response
+
+    return comprimir_resposta
@@ -0,0 +1,269 @@
+"""
+Conformidade do caminho rápido (MotorRapidoMNI) com o caminho zeep
+
+Gravação (acessa o tribunal configurado no .env):
+
+    python conformidade_caminho_rapido.py --gravar 00000000000000000000 --documento 123 456
+
+grava em gravacoes/ o XML bruto de cada resposta, já sanitizado (nomes,
+documentos de identificação, endereços e conteúdo dos documentos trocados
+por valores fictícios estáveis), e o resultado do zeep (serialize_object)
+para esse mesmo XML. Textos livres (descrições, complementos) são mantidos:
+revise-os antes de versionar uma gravação. gravacoes/ está no .gitignore.
+
+Verificação (offline, sobre as gravações):
+
+    python conformidade_caminho_rapido.py
+    python conformidade_caminho_rapido.py --diretorio tests/gravacoes --wsdl tests/gravacoes/mni.wsdl
+
+interpreta cada XML gravado pelo caminho rápido e compara o dicionário
+obtido, campo a campo e com os tipos (int, bool, None), com o resultado do
+zeep. O schema vem de --wsdl (padrão: mni.wsdl no diretório das gravações
+ou o WSDL do tribunal configurado). Sai com código 1 se houver divergência.
+
+--regerar refaz os .json a partir dos .xml (ex: após editar uma gravação).
+"""
+
+import argparse
+import base64
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+from dotenv import load_dotenv
+
+DIRETORIO_GRAVACOES = os.getenv('GRAVACOES_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gravacoes'))
+
+# Atributos/elementos com dados pessoais, trocados na gravação
+CAMPOS_SENSIVEIS = frozenset({
+    'nome', 'outroNome', 'nomeGenitor', 'nomeGenitora', 'numeroDocumentoPrincipal',
+    'codigoDocumento', 'emissorDocumento', 'logradouro', 'complemento', 'bairro', 'cep',
+    'numeroOAB', 'email', 'numeroTelefone',
+})
+CAMPOS_CONTEUDO = frozenset({'conteudo'})
+CONTEUDO_FICTICIO = base64.b64encode(b'%PDF-1.4 conteudo omitido na gravacao').decode()
+
+
+def _criar_servico(numero_processo):
+    """SOAPService do endpoint do processo, com os dois caminhos disponíveis"""
+    from roteamento import Roteador
+    from soap_service import SOAPService
+
+    config = Roteador.de_ambiente().pool_para(numero_processo).config
+    return SOAPService(config.wsdl_url, config.usuario, config.senha,
+                       verify_ssl=config.verify_ssl,
+                       servidor_base=config.servidor_base,
+                       timeout=config.timeout,
+                       caminho_rapido=True)
+
+
+def _ficticio(valor):
+    """Valor fictício estável: dígitos viram dígitos (mesmo tamanho), texto vira 'Anonimo <hash>'"""
+    resumo = hashlib.sha256(valor.encode('utf-8')).hexdigest()
+    if valor.isdigit():
+        return ''.join(str(int(c, 16) % 10) for c in resumo)[:len(valor)].ljust(len(valor), '0')
+    return f'Anonimo {resumo[:8]}'
+
+
+def sanitizar(xml):
+    """Troca dados pessoais e conteúdo de documentos do XML por valores fictícios"""
+    from lxml import etree
+
+    raiz = etree.fromstring(xml, etree.XMLParser(huge_tree=True, resolve_entities=False, no_network=True))
+    for elemento in raiz.iter():
+        if not isinstance(elemento.tag, str):
+            continue
+        for atributo, valor in elemento.attrib.items():
+            if etree.QName(atributo).localname in CAMPOS_SENSIVEIS:
+                elemento.set(atributo, _ficticio(valor))
+        nome = etree.QName(elemento).localname
+        if nome in CAMPOS_CONTEUDO and elemento.text and elemento.text.strip():
+            elemento.text = CONTEUDO_FICTICIO
+        elif nome in CAMPOS_SENSIVEIS and elemento.text and elemento.text.strip():
+            elemento.text = _ficticio(elemento.text.strip())
+    return etree.tostring(raiz, xml_declaration=True, encoding='UTF-8')
+
+
+def _binding(cliente):
+    """Binding da porta usada pelo cliente (primeiro serviço e primeira porta do WSDL)"""
+    servico = next(iter(cliente.wsdl.services.values()))
+    return next(iter(servico.ports.values())).binding
+
+
+def resultado_zeep(cliente, operacao, xml):
+    """
+    Interpreta o XML pelo caminho zeep, sem acessar a rede
+
+    Returns:
+        Resultado no formato do SOAPService (serialize_object para processos)
+    """
+    from types import SimpleNamespace
+    from zeep.helpers import serialize_object
+    from soap_service import SOAPService
+
+    binding = _binding(cliente)
+    nome = next(n for n in binding.port_type.operations if n.lower() == operacao.lower())
+    # Só o que o zeep lê da resposta HTTP
+    resposta = SimpleNamespace(status_code=200, headers={'Content-Type': 'text/xml; charset=utf-8'},
+                               content=xml, encoding='utf-8')
+    resultado = binding.process_reply(cliente, binding.get(nome), resposta)
+
+    if operacao == 'consultarDocumentosProcesso':
+        resultado = SOAPService._parse_documentos_response(resultado)
+        # O conteúdo é gravado só em base64 (conteudo_base64)
+        resultado['documentos'] = [{**doc, 'conteudo': None} for doc in resultado['documentos']]
+        return resultado
+    return serialize_object(resultado)
+
+
+def _normalizar(resultado):
+    """Mesma forma do .json gravado (Decimal, datas e bytes viram str; tipos JSON preservados)"""
+    return json.loads(json.dumps(resultado, ensure_ascii=False, default=str))
+
+
+def _salvar(diretorio, nome, xml, resultado):
+    with open(os.path.join(diretorio, nome + '.xml'), 'wb') as f:
+        f.write(xml)
+    with open(os.path.join(diretorio, nome + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(_normalizar(resultado), f, ensure_ascii=False, indent=2)
+    print(f"Gravado: {nome}")
+
+
+def _operacao(nome):
+    return 'consultarDocumentosProcesso' if nome.endswith('.documentos') else 'consultarProcesso'
+
+
+def gravar(numero_processo, ids_documentos, diretorio=DIRETORIO_GRAVACOES):
+    """Grava as respostas sanitizadas e o resultado do zeep para o processo"""
+    os.makedirs(diretorio, exist_ok=True)
+    servico = _criar_servico(numero_processo)
+    motor = servico.motor_rapido
+
+    xml = sanitizar(motor._enviar(motor._montar_envelope('requisicaoConsultarProcesso', [
+        ('numeroProcesso', numero_processo),
+        ('incluirCabecalho', True),
+        ('incluirPartes', True),
+        ('incluirEnderecos', False),
+        ('incluirMovimentos', True),
+        ('incluirDocumentos', True),
+    ])).content)
+    _salvar(diretorio, f'{numero_processo}.processo', xml,
+            resultado_zeep(servico.client, 'consultarProcesso', xml))
+
+    if ids_documentos:
+        campos = [('numeroProcesso', numero_processo)] + [('idDocumento', i) for i in ids_documentos]
+        xml = sanitizar(motor._enviar(motor._montar_envelope('requisicaoConsultarDocumentosProcesso', campos)).content)
+        _salvar(diretorio, f'{numero_processo}.documentos', xml,
+                resultado_zeep(servico.client, 'consultarDocumentosProcesso', xml))
+
+
+def _cliente(diretorio, wsdl):
+    """Cliente zeep com o schema das gravações"""
+    from zeep import Client, Settings
+
+    if not wsdl and os.path.exists(os.path.join(diretorio, 'mni.wsdl')):
+        wsdl = os.path.join(diretorio, 'mni.wsdl')
+    if wsdl:
+        return Client(wsdl, settings=Settings(strict=False, xml_huge_tree=True))
+    # Sem WSDL local: o do tribunal configurado (já corrigido pelo SOAPService)
+    return _criar_servico('0' * 20).client
+
+
+def _gravacoes(diretorio):
+    return sorted(glob.glob(os.path.join(diretorio, '*.xml')))
+
+
+def regerar(diretorio=DIRETORIO_GRAVACOES, wsdl=None):
+    """Refaz o resultado do zeep (.json) de cada XML gravado"""
+    cliente = _cliente(diretorio, wsdl)
+    for caminho_xml in _gravacoes(diretorio):
+        nome = os.path.basename(caminho_xml)[:-4]
+        with open(caminho_xml, 'rb') as f:
+            xml = f.read()
+        _salvar(diretorio, nome, xml, resultado_zeep(cliente, _operacao(nome), xml))
+
+
+def verificar(diretorio=DIRETORIO_GRAVACOES, wsdl=None):
+    """Compara o caminho rápido com as gravações do zeep; retorna o total de divergências"""
+    from soap_service import MotorRapidoMNI
+
+    arquivos = _gravacoes(diretorio)
+    if not arquivos:
+        print(f"Nenhuma gravação em {diretorio}")
+        return 0
+
+    motor = MotorRapidoMNI(None, '', '', '', _cliente(diretorio, wsdl).wsdl.types)
+    divergencias = 0
+    for caminho_xml in arquivos:
+        nome = os.path.basename(caminho_xml)[:-4]
+        with open(caminho_xml, 'rb') as f:
+            xml = f.read()
+        with open(caminho_xml[:-4] + '.json', encoding='utf-8') as f:
+            esperado = json.load(f)
+
+        if _operacao(nome) == 'consultarDocumentosProcesso':
+            obtido = motor.interpretar_documentos(xml)
+            obtido['documentos'] = [{**doc, 'conteudo': None} for doc in obtido['documentos']]
+        else:
+            obtido = motor.interpretar_processo(xml)
+        obtido = _normalizar(obtido)
+
+        iguais = obtido == esperado
+        print(f"{'OK        ' if iguais else 'DIVERGENTE'} {nome}")
+        if not iguais:
+            for caminho, valor_obtido, valor_esperado in _diferencas(obtido, esperado)[:10]:
+                print(f"    {caminho}: caminho rápido {valor_obtido!r}, zeep {valor_esperado!r}")
+        divergencias += not iguais
+
+    return divergencias
+
+
+def _diferencas(obtido, esperado, caminho='$'):
+    """Lista (caminho, obtido, esperado) das diferenças entre dois resultados"""
+    if isinstance(obtido, dict) and isinstance(esperado, dict):
+        diferencas = []
+        for chave in list(esperado) + [c for c in obtido if c not in esperado]:
+            diferencas += _diferencas(obtido.get(chave, '<ausente>'), esperado.get(chave, '<ausente>'),
+                                      f'{caminho}.{chave}')
+        return diferencas
+    if isinstance(obtido, list) and isinstance(esperado, list) and len(obtido) == len(esperado):
+        diferencas = []
+        for i, (a, b) in enumerate(zip(obtido, esperado)):
+            diferencas += _diferencas(a, b, f'{caminho}[{i}]')
+        return diferencas
+    # type() distingue 1 de True e de '1'
+    if obtido != esperado or type(obtido) is not type(esperado):
+        return [(caminho, obtido, esperado)]
+    return []
+
+
+if __name__ == '__main__':
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Conformidade do caminho rápido com o zeep')
+    parser.add_argument('--gravar', metavar='NUMERO', help='Grava as respostas do processo informado')
+    parser.add_argument('--documento', nargs='*', default=[], metavar='ID',
+                        help='IDs de documentos a gravar junto com o processo')
+    parser.add_argument('--diretorio', default=DIRETORIO_GRAVACOES, help='Diretório das gravações')
+    parser.add_argument('--wsdl', help='WSDL com o schema (padrão: mni.wsdl do diretório ou o do tribunal)')
+    parser.add_argument('--regerar', action='store_true', help='Refaz os .json a partir dos .xml')
+    args = parser.parse_args()
+
+    if args.gravar:
+        if not re.fullmatch(r'\d{20}', args.gravar):
+            parser.error('Número do processo deve ter 20 dígitos')
+        gravar(args.gravar, args.documento, args.diretorio)
+        sys.exit(0)
+
+    if args.regerar:
+        regerar(args.diretorio, args.wsdl)
+        sys.exit(0)
+
+    divergencias = verificar(args.diretorio, args.wsdl)
+    if divergencias:
+        print(f"\n{divergencias} divergência(s) entre o caminho rápido e o zeep")
+        sys.exit(1)
+    print("\nCaminho rápido conforme com o zeep")
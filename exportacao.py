@@ -0,0 +1,397 @@
+"""
+Exportação colunar de processos, movimentos, documentos e partes
+
+Grava uma tabela por arquivo (processos, movimentos, documentos, partes e
+erros) em Parquet ou Arrow (com pyarrow instalado) ou CSV. As linhas são
+acumuladas em lotes e gravadas incrementalmente, então exportar milhares de
+processos usa memória limitada ao lote.
+
+Linha de comando (um número de processo por linha; '-' lê da entrada padrão):
+
+    python exportacao.py numeros.txt --saida exportacao/ --formato parquet
+
+Os arquivos abrem direto no pandas/DuckDB:
+
+    pandas.read_parquet('exportacao/movimentos.parquet')
+    duckdb.sql("SELECT tipo, count(*) FROM 'exportacao/movimentos.parquet' GROUP BY tipo")
+"""
+
+import csv
+import logging
+import os
+import sys
+import time
+
+from modelo import Processo
+
+logger = logging.getLogger(__name__)
+
+# pyarrow é opcional (sem ele só CSV) e pesado: importado na primeira exportação
+pa = pc = pa_csv = pq = None
+_pyarrow_verificado = False
+
+FORMATOS = ('parquet', 'arrow', 'csv')
+
+EXTENSOES = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+
+# Colunas de cada tabela: (nome, tipo). 'categoria' são textos muito repetidos
+# (dictionary encoding no Parquet); 'data_hora' vem do MNI como AAAAMMDDHHMMSS.
+TABELAS = {
+    'processos': [
+        ('numero_processo', 'texto'),
+        ('classe_processual', 'categoria'),
+        ('data_ajuizamento', 'data_hora'),
+        ('total_movimentos', 'inteiro'),
+        ('total_documentos', 'inteiro'),
+    ],
+    'movimentos': [
+        ('numero_processo', 'texto'),
+        ('id_movimento', 'texto'),
+        ('data_hora', 'data_hora'),
+        ('tipo', 'categoria'),
+        ('descricao', 'categoria'),
+        ('total_documentos', 'inteiro'),
+    ],
+    'documentos': [
+        ('numero_processo', 'texto'),
+        ('id_documento', 'texto'),
+        ('id_movimento', 'texto'),
+        ('data_hora', 'data_hora'),
+        ('tipo_documento', 'categoria'),
+        ('mimetype', 'categoria'),
+        ('descricao', 'categoria'),
+        ('rotulo', 'categoria'),
+        ('hash', 'texto'),
+    ],
+    'partes': [
+        ('numero_processo', 'texto'),
+        ('polo', 'categoria'),
+        ('nome', 'texto'),
+        ('documento', 'texto'),
+        ('tipo_pessoa', 'categoria'),
+    ],
+    'erros': [
+        ('numero_processo', 'texto'),
+        ('erro', 'texto'),
+    ],
+}
+
+
+def _carregar_pyarrow():
+    """Importa o pyarrow no primeiro uso; False se não estiver instalado"""
+    global pa, pc, pa_csv, pq, _pyarrow_verificado
+    if not _pyarrow_verificado:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.csv
+            import pyarrow.parquet
+        except ImportError:
+            pass
+        else:
+            pa, pc, pa_csv, pq = pyarrow, pyarrow.compute, pyarrow.csv, pyarrow.parquet
+        _pyarrow_verificado = True
+    return pa is not None
+
+
+def formato_padrao():
+    return 'parquet' if _carregar_pyarrow() else 'csv'
+
+
+def _data_hora_iso(valor):
+    """AAAAMMDD[HHMMSS] -> 'AAAA-MM-DD HH:MM:SS' (CSV sem pyarrow)"""
+    if not valor or len(valor) < 8 or not valor[:8].isdigit():
+        return None
+    valor = valor[:14].ljust(14, '0')
+    return f'{valor[0:4]}-{valor[4:6]}-{valor[6:8]} {valor[8:10]}:{valor[10:12]}:{valor[12:14]}'
+
+
+class _EscritorArrow:
+    """Grava lotes de uma tabela em Parquet, Arrow (IPC) ou CSV via pyarrow"""
+
+    def __init__(self, caminho, colunas, formato):
+        self.colunas = colunas
+        self.formato = formato
+        # Só o Parquet refaz o dicionário a cada row group. O arquivo Arrow (IPC)
+        # não aceita dicionários diferentes entre lotes, e o CSV não tem
+        # dictionary encoding: nos dois, categorias viram texto simples.
+        tipo_categoria = pa.dictionary(pa.int32(), pa.string()) if formato == 'parquet' else pa.string()
+        tipos = {
+            'texto': pa.string(),
+            'categoria': tipo_categoria,
+            'data_hora': pa.timestamp('s'),
+            'inteiro': pa.int32(),
+        }
+        self.schema = pa.schema([(nome, tipos[tipo]) for nome, tipo in colunas])
+
+        if formato == 'parquet':
+            self._escritor = pq.ParquetWriter(caminho, self.schema, compression='zstd')
+        elif formato == 'arrow':
+            self._escritor = pa.ipc.new_file(caminho, self.schema)
+        else:
+            self._escritor = pa_csv.CSVWriter(caminho, self.schema)
+
+    def _coluna(self, valores, tipo, tipo_arrow):
+        """Normaliza uma coluna inteira de uma vez (compute do Arrow)"""
+        if tipo == 'data_hora':
+            textos = pa.array(valores, type=pa.string())
+            # Datas sem hora (AAAAMMDD) são completadas com zeros; inválidas viram nulo
+            textos = pc.utf8_rpad(pc.utf8_slice_codeunits(textos, 0, 14), 14, padding='0')
+            return pc.strptime(textos, format='%Y%m%d%H%M%S', unit='s', error_is_null=True)
+        if tipo == 'categoria' and pa.types.is_dictionary(tipo_arrow):
+            return pa.array(valores, type=pa.string()).dictionary_encode()
+        return pa.array(valores, type=tipo_arrow)
+
+    def gravar(self, dados):
+        arrays = [self._coluna(dados[nome], tipo, self.schema.field(nome).type)
+                  for nome, tipo in self.colunas]
+        self._escritor.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def fechar(self):
+        self._escritor.close()
+
+
+class _EscritorCSV:
+    """Grava lotes de uma tabela em CSV sem pyarrow"""
+
+    def __init__(self, caminho, colunas, formato='csv'):
+        self.colunas = colunas
+        self._arquivo = open(caminho, 'w', newline='', encoding='utf-8')
+        self._csv = csv.writer(self._arquivo)
+        self._csv.writerow(nome for nome, _ in colunas)
+
+    def gravar(self, dados):
+        colunas = []
+        for nome, tipo in self.colunas:
+            valores = dados[nome]
+            if tipo == 'data_hora':
+                valores = [_data_hora_iso(v) for v in valores]
+            colunas.append(valores)
+        self._csv.writerows(zip(*colunas))
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class ExportadorColunar:
+    """
+    Exporta processos (modelo.Processo) para arquivos colunares em lotes
+
+    Uso:
+        with ExportadorColunar('saida/', formato='parquet') as exportador:
+            exportador.adicionar(processo)
+            exportador.adicionar_erro(numero, 'mensagem')
+        exportador.arquivos  # caminhos gravados
+    """
+
+    def __init__(self, diretorio, formato=None, tamanho_lote=10000):
+        """
+        Args:
+            diretorio: Diretório de saída (criado se não existir)
+            formato: 'parquet', 'arrow' ou 'csv' (padrão: parquet com pyarrow)
+            tamanho_lote: Linhas acumuladas por tabela antes de gravar
+        """
+        formato = (formato or formato_padrao()).lower()
+        if formato not in FORMATOS:
+            raise ValueError(f'Formato inválido: {formato} (use {", ".join(FORMATOS)})')
+        if formato != 'csv' and not _carregar_pyarrow():
+            logger.warning(f"pyarrow não instalado: exportando em CSV em vez de {formato}")
+            formato = 'csv'
+
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.formato = formato
+        self.tamanho_lote = tamanho_lote
+        self._classe_escritor = _EscritorArrow if _carregar_pyarrow() else _EscritorCSV
+        self._escritores = {}
+        self._buffers = {tabela: {nome: [] for nome, _ in colunas} for tabela, colunas in TABELAS.items()}
+        self.total_processos = 0
+        self.total_erros = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        if tipo is None:
+            self.fechar()
+            return
+        # Já há uma exceção: um erro ao fechar não pode escondê-la
+        try:
+            self.fechar()
+        except Exception as e:
+            logger.warning(f"Erro ao fechar a exportação após falha: {str(e)}")
+
+    @property
+    def arquivos(self):
+        return [os.path.join(self.diretorio, tabela + EXTENSOES[self.formato]) for tabela in TABELAS]
+
+    def _adicionar_linha(self, tabela, **valores):
+        buffer = self._buffers[tabela]
+        for nome, lista in buffer.items():
+            lista.append(valores.get(nome))
+        if len(buffer['numero_processo']) >= self.tamanho_lote:
+            self._descarregar(tabela)
+
+    def _escritor(self, tabela):
+        escritor = self._escritores.get(tabela)
+        if escritor is None:
+            caminho = os.path.join(self.diretorio, tabela + EXTENSOES[self.formato])
+            escritor = self._classe_escritor(caminho, TABELAS[tabela], self.formato)
+            self._escritores[tabela] = escritor
+        return escritor
+
+    def _descarregar(self, tabela):
+        buffer = self._buffers[tabela]
+        if buffer['numero_processo']:
+            self._escritor(tabela).gravar(buffer)
+        for lista in buffer.values():
+            lista.clear()
+
+    def adicionar(self, processo):
+        """Adiciona as linhas de um modelo.Processo"""
+        numero = processo.numero
+        id_movimento_por_documento = {}
+
+        for mov in processo.movimentos:
+            self._adicionar_linha('movimentos', numero_processo=numero, id_movimento=mov.id_movimento,
+                                  data_hora=mov.data_hora, tipo=mov.tipo, descricao=mov.descricao,
+                                  total_documentos=len(mov.ids_documentos))
+            for id_documento in mov.ids_documentos:
+                id_movimento_por_documento.setdefault(id_documento, mov.id_movimento)
+
+        for doc in processo.documentos:
+            self._adicionar_linha('documentos', numero_processo=numero, id_documento=doc.id_documento,
+                                  id_movimento=id_movimento_por_documento.get(doc.id_documento),
+                                  data_hora=doc.data_hora, tipo_documento=doc.tipo_documento,
+                                  mimetype=doc.mimetype, descricao=doc.descricao,
+                                  rotulo=doc.rotulo, hash=doc.hash)
+
+        for parte in processo.partes:
+            self._adicionar_linha('partes', numero_processo=numero, polo=parte.polo, nome=parte.nome,
+                                  documento=parte.documento, tipo_pessoa=parte.tipo_pessoa)
+
+        self._adicionar_linha('processos', numero_processo=numero,
+                              classe_processual=processo.classe_processual,
+                              data_ajuizamento=processo.data_ajuizamento,
+                              total_movimentos=len(processo.movimentos),
+                              total_documentos=len(processo.documentos))
+        self.total_processos += 1
+
+    def adicionar_erro(self, numero_processo, erro):
+        """Registra um processo que não pôde ser exportado"""
+        self._adicionar_linha('erros', numero_processo=numero_processo, erro=str(erro))
+        self.total_erros += 1
+
+    def fechar(self):
+        """
+        Grava os lotes pendentes e fecha os arquivos (tabelas vazias incluídas)
+
+        Todas as tabelas são fechadas mesmo se uma falhar; o primeiro erro é
+        relançado no fim.
+        """
+        primeiro_erro = None
+        for tabela in TABELAS:
+            try:
+                self._descarregar(tabela)
+            except Exception as e:
+                primeiro_erro = primeiro_erro or e
+            try:
+                self._escritor(tabela).fechar()
+            except Exception as e:
+                primeiro_erro = primeiro_erro or e
+        self._escritores = {}
+        if primeiro_erro is not None:
+            raise primeiro_erro
+
+
+def exportar_processos(roteador, numeros_processo, exportador, tamanho_consulta=50, prazo=None, **opcoes):
+    """
+    Consulta os processos em paralelo (por tribunal) e os adiciona ao exportador
+
+    Os processos são consultados em grupos de tamanho_consulta; cada resposta
+    é convertida em modelo.Processo ainda na thread da consulta e descartada,
+    de modo que só um grupo fica em memória por vez.
+
+    Args:
+        roteador: roteamento.Roteador
+        numeros_processo: Iterável de números (20 dígitos)
+        exportador: ExportadorColunar
+        tamanho_consulta: Processos consultados por grupo
+        prazo: Segundos para iniciar novos grupos (None = sem limite); os
+            processos que ficarem de fora entram na tabela de erros
+        **opcoes: Repassadas a consultar_processo (incluir_partes etc.)
+    """
+    opcoes.setdefault('incluir_partes', True)
+
+    def consultar_um(soap_service, numero_processo):
+        resposta = soap_service.consultar_processo(numero_processo=numero_processo, **opcoes)
+        return Processo.de_resposta(resposta, numero_processo)
+
+    limite = time.monotonic() + prazo if prazo is not None else None
+
+    def consultar_grupo(grupo):
+        if limite is not None and time.monotonic() >= limite:
+            for numero in grupo:
+                exportador.adicionar_erro(numero, 'Prazo da exportação esgotado')
+            return
+        # A espera por vaga no endpoint também termina no prazo da exportação
+        espera = {'prazo': max(limite - time.monotonic(), 0)} if limite is not None else {}
+        for numero, (processo, erro) in roteador.executar_em_paralelo(grupo, consultar_um, **espera).items():
+            if erro is not None:
+                exportador.adicionar_erro(numero, erro)
+            elif processo is None:
+                exportador.adicionar_erro(numero, 'Resposta sem processo')
+            else:
+                exportador.adicionar(processo)
+
+    grupo = []
+    for numero in numeros_processo:
+        grupo.append(numero)
+        if len(grupo) >= tamanho_consulta:
+            consultar_grupo(grupo)
+            logger.info(f"Exportação: {exportador.total_processos} processos, {exportador.total_erros} erros")
+            grupo = []
+    if grupo:
+        consultar_grupo(grupo)
+
+
+def ler_numeros(arquivo):
+    """Números de processo (20 dígitos) de um arquivo texto, um por linha, sem duplicados"""
+    vistos = set()
+    for linha in arquivo:
+        numero = ''.join(filter(str.isdigit, linha))
+        if not numero or numero in vistos:
+            continue
+        if len(numero) != 20:
+            logger.warning(f"Ignorando número inválido: {linha.strip()}")
+            continue
+        vistos.add(numero)
+        yield numero
+
+
+if __name__ == '__main__':
+    import argparse
+    from dotenv import load_dotenv
+    from log_estruturado import configurar_logging
+    from roteamento import Roteador
+
+    load_dotenv()
+    configurar_logging(formato=os.getenv('LOG_FORMATO', 'texto'))
+
+    parser = argparse.ArgumentParser(description='Exporta processos do MNI em formato colunar')
+    parser.add_argument('numeros', help="Arquivo com um número de processo por linha ('-' para stdin)")
+    parser.add_argument('--saida', default='exportacao', help='Diretório de saída (padrão: exportacao)')
+    parser.add_argument('--formato', choices=FORMATOS, default=formato_padrao())
+    parser.add_argument('--tamanho-lote', type=int, default=10000, help='Linhas por lote gravado')
+    parser.add_argument('--tamanho-consulta', type=int, default=50, help='Processos consultados por grupo')
+    args = parser.parse_args()
+
+    arquivo = sys.stdin if args.numeros == '-' else open(args.numeros, encoding='utf-8')
+    with arquivo, ExportadorColunar(args.saida, args.formato, args.tamanho_lote) as exportador:
+        exportar_processos(Roteador.de_ambiente(), ler_numeros(arquivo), exportador,
+                           tamanho_consulta=args.tamanho_consulta)
+
+    print(f"Processos exportados: {exportador.total_processos}")
+    print(f"Erros:                {exportador.total_erros}")
+    for caminho in exportador.arquivos:
+        print(f"  {caminho}")
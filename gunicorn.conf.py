@@ -0,0 +1,58 @@
+"""
+Configuração do gunicorn para produção
+
+    gunicorn -c gunicorn.conf.py
+
+As chamadas ao MNI são bloqueantes (zeep/requests), por isso os workers são
+gthread: cada worker atende várias requisições em threads. Mantenha
+SOAP_MAX_CONCORRENCIA abaixo de GUNICORN_THREADS para sempre haver threads
+livres para páginas estáticas e health checks.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# Deve cobrir o timeout SOAP mais a espera na fila do endpoint
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Reciclar workers periodicamente limita o crescimento de memória
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 500))
+
+# Importa o app (e aquece o WSDL/clientes SOAP) no master, antes do fork
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() not in ('false', '0', 'no', 'n', 'off')
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    """Com preload, aquece os clientes SOAP no master (antes do fork dos workers)"""
+    if preload_app:
+        from wsgi import aquecer_clientes
+        aquecer_clientes()
+
+
+def post_fork(server, worker):
+    """Cada worker abre suas próprias conexões HTTP e a própria thread de logs"""
+    if preload_app:
+        from wsgi import reiniciar_conexoes, reiniciar_logging
+        reiniciar_logging()
+        reiniciar_conexoes()
+
+
+def post_worker_init(worker):
+    """Cada worker aquece em segundo plano o que o master não aqueceu (tudo, sem preload)"""
+    from wsgi import aquecer_em_segundo_plano, iniciar_novidades
+    aquecer_em_segundo_plano()
+    # Threads só depois do fork; o lock de líder garante um único monitor
+    iniciar_novidades()
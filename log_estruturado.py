@@ -0,0 +1,311 @@
+"""
+Logging estruturado e não bloqueante
+
+As threads de requisição só colocam o registro numa fila (QueueHandler);
+formatação em JSON, redação de dados sensíveis e escrita no stderr ficam numa
+thread própria (QueueListener). Com a fila cheia o registro é descartado em
+vez de atrasar a requisição.
+
+Cada requisição recebe um X-Request-ID (o do cliente/proxy, se válido, ou um
+novo), presente em todos os eventos dela e devolvido na resposta. Ao final é
+emitido um evento com método, rota, status, duração e tempos parciais
+(ex: tempo no MNI). Eventos INFO/DEBUG são amostrados por requisição
+(LOG_AMOSTRAGEM_INFO): uma requisição amostrada registra todos os seus
+eventos; WARNING/ERROR, requisições lentas e erros 5xx sempre são registrados.
+
+Senhas, segredos e conteúdo de documentos (elementos <conteudo>, base64
+longo) nunca chegam à saída, mesmo em DEBUG com os envelopes do zeep.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Contexto da requisição atual: id, início, decisão de amostragem e tempos parciais
+_requisicao = ContextVar('requisicao', default=None)
+
+_RE_REQUEST_ID = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Dados sensíveis em mensagens livres (envelopes SOAP, reprs de dicts, query strings)
+_PADROES_REDACAO = (
+    (re.compile(r'(<(?:[\w.-]+:)?senha[\w-]*\b[^>]*>)[^<]*', re.IGNORECASE), r'\1***'),
+    (re.compile(r'(<(?:[\w.-]+:)?conteudo\b[^>]*>)[^<]*', re.IGNORECASE), r'\1[conteúdo omitido]'),
+    (re.compile(r'''(["']?\b(?:senha|password|segredo|secret|conteudo)\w*["']?\s*[:=]\s*)'''
+                r'''(b?'[^']*'|b?"[^"]*"|[^\s,;&)}]+)''', re.IGNORECASE), r"\1'***'"),
+    (re.compile(r'[A-Za-z0-9+/]{200,}={0,2}'), '[base64 omitido]'),
+)
+_RE_CHAVE_SENSIVEL = re.compile(r'senha|password|segredo|secret|conteudo', re.IGNORECASE)
+
+# Atributos de todo LogRecord (o resto veio de extra=)
+_CAMPOS_PADRAO = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'request_id', 'contexto'}
+
+_configuracao = None
+
+
+def redigir(texto):
+    """Remove senhas, segredos e conteúdo de documentos de um texto"""
+    for padrao, substituto in _PADROES_REDACAO:
+        texto = padrao.sub(substituto, texto)
+    return texto
+
+
+def _redigir_valor(valor):
+    if isinstance(valor, str):
+        return redigir(valor)
+    if isinstance(valor, dict):
+        return {chave: '***' if _RE_CHAVE_SENSIVEL.search(str(chave)) else _redigir_valor(item)
+                for chave, item in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_redigir_valor(item) for item in valor]
+    if isinstance(valor, (bytes, bytearray)):
+        return f'[{len(valor)} bytes omitidos]'
+    return valor
+
+
+def _truncar(texto, max_caracteres):
+    if max_caracteres and len(texto) > max_caracteres:
+        return f'{texto[:max_caracteres]}... [+{len(texto) - max_caracteres} caracteres]'
+    return texto
+
+
+class FormatadorJSON(logging.Formatter):
+    """Um objeto JSON por linha, com request_id e campos de extra="""
+
+    def __init__(self, max_caracteres=2000):
+        super().__init__()
+        self.max_caracteres = max_caracteres
+
+    def format(self, record):
+        evento = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': _truncar(redigir(record.getMessage()), self.max_caracteres),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            evento['request_id'] = request_id
+        for chave, valor in vars(record).items():
+            if chave not in _CAMPOS_PADRAO:
+                evento[chave] = '***' if _RE_CHAVE_SENSIVEL.search(chave) else _redigir_valor(valor)
+        if record.exc_info:
+            evento['excecao'] = redigir(self.formatException(record.exc_info))
+        elif record.exc_text:
+            evento['excecao'] = redigir(record.exc_text)
+        if record.stack_info:
+            evento['pilha'] = self.formatStack(record.stack_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+class FormatadorTexto(logging.Formatter):
+    """Formato legível para desenvolvimento (LOG_FORMATO=texto), também redigido"""
+
+    def __init__(self, max_caracteres=2000):
+        super().__init__('%(asctime)s %(levelname)s %(name)s%(contexto)s: %(message)s')
+        self.max_caracteres = max_caracteres
+
+    def format(self, record):
+        request_id = getattr(record, 'request_id', None)
+        record.contexto = f' [{request_id}]' if request_id else ''
+        return _truncar(redigir(super().format(record)), self.max_caracteres)
+
+
+class FiltroRequisicao(logging.Filter):
+    """Anexa o request_id e descarta INFO/DEBUG de requisições não amostradas"""
+
+    def filter(self, record):
+        contexto = _requisicao.get()
+        if contexto is None:
+            return True
+        record.request_id = contexto['id']
+        return contexto['amostrada'] or record.levelno > logging.INFO
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """QueueHandler que nunca bloqueia: com a fila cheia, descarta e conta"""
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        # Na thread da requisição só a mensagem é resolvida (os args podem mudar
+        # depois); traceback, JSON e redação ficam para o listener
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class _Configuracao:
+
+    def __init__(self, nivel, formatador, taxa_info, fila_maxima, lenta_ms):
+        self.taxa_info = taxa_info
+        self.lenta_ms = lenta_ms
+        self.fila_maxima = fila_maxima
+        self.saida = logging.StreamHandler(sys.stderr)
+        self.saida.setFormatter(formatador)
+        self.handler = HandlerFila(queue.Queue(fila_maxima))
+        self.handler.addFilter(FiltroRequisicao())
+        self.listener = None
+
+        raiz = logging.getLogger()
+        for handler in list(raiz.handlers):
+            raiz.removeHandler(handler)
+        raiz.addHandler(self.handler)
+        raiz.setLevel(nivel)
+        self.iniciar()
+
+    def iniciar(self):
+        self.listener = logging.handlers.QueueListener(self.handler.queue, self.saida,
+                                                       respect_handler_level=True)
+        self.listener.start()
+
+    def parar(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+def configurar_logging(nivel=None, formato=None):
+    """
+    Configura o logging da aplicação (idempotente)
+
+    Substitui os handlers do logger raiz por um QueueHandler; a thread do
+    QueueListener formata e escreve no stderr.
+
+    Args:
+        nivel: Nível mínimo (padrão: LOG_NIVEL ou INFO)
+        formato: 'json' ou 'texto' (padrão: LOG_FORMATO ou json)
+    """
+    global _configuracao
+    if _configuracao is not None:
+        return _configuracao
+
+    nivel = (nivel or os.getenv('LOG_NIVEL', 'INFO')).upper()
+    max_caracteres = int(os.getenv('LOG_MAX_CARACTERES', 2000))
+    formato = (formato or os.getenv('LOG_FORMATO', 'json')).lower()
+    formatador = FormatadorTexto(max_caracteres) if formato == 'texto' else FormatadorJSON(max_caracteres)
+
+    _configuracao = _Configuracao(
+        nivel, formatador,
+        taxa_info=float(os.getenv('LOG_AMOSTRAGEM_INFO', 1.0)),
+        fila_maxima=int(os.getenv('LOG_FILA_MAXIMA', 10000)),
+        lenta_ms=float(os.getenv('LOG_REQUISICAO_LENTA_MS', 5000))
+    )
+    # Escreve o que ainda estiver na fila ao encerrar o processo
+    atexit.register(_configuracao.parar)
+    return _configuracao
+
+
+def reiniciar_apos_fork():
+    """
+    Recria a fila e a thread do listener no processo filho
+
+    A thread do listener não sobrevive ao fork (gunicorn com preload_app) e a
+    fila herdada pode estar com o lock preso; o filho começa com uma nova.
+    """
+    if _configuracao is None:
+        return
+    _configuracao.listener = None
+    _configuracao.handler.queue = queue.Queue(_configuracao.fila_maxima)
+    _configuracao.iniciar()
+
+
+def registros_descartados():
+    """Registros descartados por fila cheia desde o início do processo"""
+    return _configuracao.handler.descartados if _configuracao is not None else 0
+
+
+def request_id_atual():
+    """X-Request-ID da requisição atual (None fora de requisições)"""
+    contexto = _requisicao.get()
+    return contexto['id'] if contexto is not None else None
+
+
+@contextmanager
+def medir(nome):
+    """Soma a duração do bloco aos tempos parciais da requisição atual (em ms)"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        contexto = _requisicao.get()
+        if contexto is not None:
+            tempos = contexto['tempos']
+            tempos[nome] = round(tempos.get(nome, 0) + (time.perf_counter() - inicio) * 1000, 1)
+
+
+def configurar_requisicoes(app):
+    """
+    Correlação e tempos por requisição na aplicação Flask
+
+    Registrar antes de outros after_request (ex: compressão) para que a
+    duração e o tamanho registrados sejam os da resposta final.
+    """
+    from flask import g, request
+
+    configuracao = configurar_logging()
+
+    @app.before_request
+    def iniciar_requisicao():
+        request_id = request.headers.get('X-Request-ID', '')
+        if not _RE_REQUEST_ID.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        g.token_log = _requisicao.set({
+            'id': request_id,
+            'inicio': time.perf_counter(),
+            'amostrada': random.random() < configuracao.taxa_info,
+            'tempos': {},
+        })
+
+    @app.after_request
+    def registrar_requisicao(response):
+        contexto = _requisicao.get()
+        if contexto is None:
+            return response
+        response.headers['X-Request-ID'] = contexto['id']
+
+        duracao_ms = round((time.perf_counter() - contexto['inicio']) * 1000, 1)
+        lenta = duracao_ms >= configuracao.lenta_ms
+        nivel = logging.WARNING if response.status_code >= 500 or lenta else logging.INFO
+        logger.log(nivel, f"{request.method} {request.path} {response.status_code} {duracao_ms:.0f}ms", extra={
+            'evento': 'requisicao',
+            'metodo': request.method,
+            'rota': request.url_rule.rule if request.url_rule else None,
+            'status': response.status_code,
+            'duracao_ms': duracao_ms,
+            'tempos_ms': contexto['tempos'],
+            'bytes': response.content_length,
+            'lenta': lenta,
+        })
+        return response
+
+    @app.teardown_request
+    def encerrar_requisicao(exc):
+        token = g.pop('token_log', None)
+        if token is not None:
+            try:
+                _requisicao.reset(token)
+            except ValueError:
+                pass
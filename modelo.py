@@ -0,0 +1,286 @@
+"""
+Modelo de domínio compacto para processos do MNI
+
+Converte a resposta de consultarProcesso (objeto do zeep ou dicionário de
+serialize_object) em objetos com __slots__, com listas sempre normalizadas
+e strings repetidas (tipos, descrições, rótulos, mimetypes) internadas.
+
+Medição de memória por movimento (dicionários x modelo):
+
+    python modelo.py resposta.json
+
+onde resposta.json é a saída de /api/consultar (campo 'data') ou de
+serialize_object.
+"""
+
+import hashlib
+import sys
+
+
+def _campo(obj, nome, padrao=None):
+    """Lê um campo de dicionário ou de objeto do zeep"""
+    if obj is None:
+        return padrao
+    if isinstance(obj, dict):
+        valor = obj.get(nome, padrao)
+    else:
+        valor = getattr(obj, nome, padrao)
+    return padrao if valor is None else valor
+
+
+def _lista(valor):
+    """Normaliza campos que podem vir como item único, lista ou None"""
+    if valor is None:
+        return []
+    if isinstance(valor, (list, tuple)):
+        return list(valor)
+    return [valor]
+
+
+def _texto(valor, internar=False):
+    """Converte para str (ou None); internar=True para valores muito repetidos"""
+    if valor is None:
+        return None
+    texto = valor if isinstance(valor, str) else str(valor)
+    return sys.intern(texto) if internar else texto
+
+
+class Parte:
+    """Parte de um polo processual"""
+
+    __slots__ = ('polo', 'nome', 'documento', 'tipo_pessoa')
+
+    def __init__(self, polo, nome, documento=None, tipo_pessoa=None):
+        self.polo = polo
+        self.nome = nome
+        self.documento = documento
+        self.tipo_pessoa = tipo_pessoa
+
+    @classmethod
+    def de_resposta(cls, parte, polo):
+        pessoa = _campo(parte, 'pessoa')
+        return cls(
+            polo=_texto(polo, internar=True),
+            nome=_texto(_campo(pessoa, 'nome')),
+            documento=_texto(_campo(pessoa, 'numeroDocumentoPrincipal')),
+            tipo_pessoa=_texto(_campo(pessoa, 'tipoPessoa'), internar=True),
+        )
+
+    def para_dict(self):
+        return {'polo': self.polo, 'nome': self.nome, 'documento': self.documento,
+                'tipo_pessoa': self.tipo_pessoa}
+
+
+class Documento:
+    """Metadados de um documento do processo (sem conteúdo)"""
+
+    __slots__ = ('id_documento', 'tipo_documento', 'data_hora', 'mimetype', 'descricao',
+                 'rotulo', 'hash', 'parametros')
+
+    def __init__(self, id_documento, tipo_documento=None, data_hora=None, mimetype=None,
+                 descricao=None, rotulo=None, hash=None, parametros=()):
+        self.id_documento = id_documento
+        self.tipo_documento = tipo_documento
+        self.data_hora = data_hora
+        self.mimetype = mimetype
+        self.descricao = descricao
+        self.rotulo = rotulo
+        self.hash = hash
+        self.parametros = parametros
+
+    @classmethod
+    def de_resposta(cls, doc):
+        parametros = tuple(
+            (_texto(_campo(p, 'nome'), internar=True), _texto(_campo(p, 'valor')))
+            for p in _lista(_campo(doc, 'outroParametro'))
+        )
+        rotulo = next((valor for nome, valor in parametros if nome == 'rotulo' and valor), None)
+        return cls(
+            id_documento=_texto(_campo(doc, 'idDocumento')),
+            tipo_documento=_texto(_campo(doc, 'tipoDocumento'), internar=True),
+            data_hora=_texto(_campo(doc, 'dataHora')),
+            mimetype=_texto(_campo(doc, 'mimetype'), internar=True),
+            descricao=_texto(_campo(doc, 'descricao'), internar=True),
+            rotulo=_texto(rotulo, internar=True),
+            hash=_texto(_campo(doc, 'hash')),
+            parametros=parametros,
+        )
+
+    @property
+    def titulo(self):
+        """Descrição amigável: rótulo, descrição ou 'Documento'"""
+        return self.rotulo or self.descricao or 'Documento'
+
+    def para_dict(self):
+        return {'id_documento': self.id_documento, 'tipo_documento': self.tipo_documento,
+                'data_hora': self.data_hora, 'mimetype': self.mimetype,
+                'descricao': self.descricao, 'rotulo': self.rotulo, 'hash': self.hash,
+                'parametros': dict(self.parametros)}
+
+
+class Movimento:
+    """Movimento processual com os IDs dos documentos vinculados"""
+
+    __slots__ = ('id_movimento', 'data_hora', 'tipo', 'descricao', 'ids_documentos')
+
+    def __init__(self, id_movimento, data_hora=None, tipo=None, descricao=None, ids_documentos=()):
+        self.id_movimento = id_movimento
+        self.data_hora = data_hora
+        self.tipo = tipo
+        self.descricao = descricao
+        self.ids_documentos = ids_documentos
+
+    @classmethod
+    def de_resposta(cls, mov):
+        descricao = _campo(_campo(mov, 'movimentoLocal'), 'descricao') or _campo(mov, 'descricao')
+        return cls(
+            id_movimento=_texto(_campo(mov, 'idMovimento')),
+            data_hora=_texto(_campo(mov, 'dataHora')),
+            tipo=_texto(_campo(mov, 'tipoMovimento'), internar=True),
+            descricao=_texto(descricao, internar=True),
+            ids_documentos=tuple(_texto(i) for i in _lista(_campo(mov, 'idDocumentoVinculado'))),
+        )
+
+    def para_dict(self):
+        return {'id_movimento': self.id_movimento, 'data_hora': self.data_hora,
+                'tipo': self.tipo, 'descricao': self.descricao,
+                'ids_documentos': list(self.ids_documentos)}
+
+
+class Processo:
+    """Processo judicial com partes, movimentos e documentos normalizados"""
+
+    __slots__ = ('numero', 'classe_processual', 'data_ajuizamento', 'partes', 'movimentos',
+                 'documentos', '_documentos_por_id')
+
+    def __init__(self, numero, classe_processual=None, data_ajuizamento=None,
+                 partes=None, movimentos=None, documentos=None):
+        self.numero = numero
+        self.classe_processual = classe_processual
+        self.data_ajuizamento = data_ajuizamento
+        self.partes = partes or []
+        self.movimentos = movimentos or []
+        self.documentos = documentos or []
+        self._documentos_por_id = {doc.id_documento: doc for doc in self.documentos}
+
+    @classmethod
+    def de_resposta(cls, resposta, numero_processo=None):
+        """
+        Converte a resposta de consultarProcesso
+
+        Args:
+            resposta: Objeto do zeep ou dicionário (serialize_object)
+            numero_processo: Número usado se a resposta não trouxer cabeçalho
+
+        Returns:
+            Processo ou None se a resposta não contém processo
+        """
+        processo = _campo(resposta, 'processo')
+        if processo is None:
+            return None
+
+        dados_basicos = _campo(processo, 'dadosBasicos')
+        partes = [
+            Parte.de_resposta(parte, _campo(polo, 'polo'))
+            for polo in _lista(_campo(dados_basicos, 'polo'))
+            for parte in _lista(_campo(polo, 'parte'))
+        ]
+
+        return cls(
+            numero=_texto(_campo(dados_basicos, 'numero') or numero_processo),
+            classe_processual=_texto(_campo(dados_basicos, 'classeProcessual'), internar=True),
+            data_ajuizamento=_texto(_campo(dados_basicos, 'dataAjuizamento')),
+            partes=partes,
+            movimentos=[Movimento.de_resposta(m) for m in _lista(_campo(processo, 'movimento'))],
+            documentos=[Documento.de_resposta(d) for d in _lista(_campo(processo, 'documento'))],
+        )
+
+    def documento(self, id_documento):
+        """Retorna o documento pelo ID ou None"""
+        return self._documentos_por_id.get(str(id_documento))
+
+    def movimentos_com_documentos(self):
+        """Movimentos que têm documentos vinculados"""
+        return [mov for mov in self.movimentos if mov.ids_documentos]
+
+    def para_dict(self):
+        return {'numero': self.numero, 'classe_processual': self.classe_processual,
+                'data_ajuizamento': self.data_ajuizamento,
+                'partes': [p.para_dict() for p in self.partes],
+                'movimentos': [m.para_dict() for m in self.movimentos],
+                'documentos': [d.para_dict() for d in self.documentos]}
+
+
+def versao_conteudo(resultado_json):
+    """
+    Identifica o conteúdo de uma resposta pelo JSON compacto já serializado
+
+    Cobre todos os campos que a página e a API mostram (valor da causa,
+    assuntos, órgão julgador, advogados, endereços...), não só os do modelo.
+    Serve de ETag e de chave de cache.
+    """
+    if isinstance(resultado_json, str):
+        resultado_json = resultado_json.encode('utf-8')
+    return hashlib.blake2b(resultado_json, digest_size=16).hexdigest()
+
+
+def tamanho_profundo(obj, vistos=None):
+    """Memória aproximada (bytes) de um objeto e tudo que ele referencia"""
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+
+    tamanho = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        tamanho += sum(tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in obj)
+    elif hasattr(obj, '__slots__'):
+        tamanho += sum(tamanho_profundo(getattr(obj, s, None), vistos) for s in obj.__slots__)
+    return tamanho
+
+
+def medir_memoria(resposta):
+    """
+    Compara a memória da resposta em dicionários com a do modelo
+
+    Returns:
+        dict: Bytes totais e por movimento de cada representação
+    """
+    processo = Processo.de_resposta(resposta)
+    total_movimentos = len(processo.movimentos) if processo else 0
+    bytes_dict = tamanho_profundo(resposta)
+    bytes_modelo = tamanho_profundo(processo)
+    por_movimento = max(total_movimentos, 1)
+    return {
+        'movimentos': total_movimentos,
+        'bytes_dict': bytes_dict,
+        'bytes_modelo': bytes_modelo,
+        'bytes_por_movimento_dict': bytes_dict // por_movimento,
+        'bytes_por_movimento_modelo': bytes_modelo // por_movimento,
+        'reducao': 1 - bytes_modelo / bytes_dict if bytes_dict else 0,
+    }
+
+
+if __name__ == '__main__':
+    import json
+    from collections import OrderedDict
+
+    if len(sys.argv) != 2:
+        print("Uso: python modelo.py resposta.json")
+        sys.exit(1)
+
+    with open(sys.argv[1], encoding='utf-8') as f:
+        # OrderedDict reproduz o que serialize_object entrega à aplicação
+        resposta = json.load(f, object_pairs_hook=OrderedDict)
+    resposta = resposta.get('data', resposta)
+
+    medicao = medir_memoria(resposta)
+    print(f"Movimentos:              {medicao['movimentos']}")
+    print(f"Dicionários (total):     {medicao['bytes_dict']:,} bytes")
+    print(f"Modelo (total):          {medicao['bytes_modelo']:,} bytes")
+    print(f"Por movimento (dict):    {medicao['bytes_por_movimento_dict']:,} bytes")
+    print(f"Por movimento (modelo):  {medicao['bytes_por_movimento_modelo']:,} bytes")
+    print(f"Redução:                 {medicao['reducao']:.0%}")
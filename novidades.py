@@ -0,0 +1,726 @@
+"""
+Feed de novidades: movimentos e documentos novos nos processos
+
+Cada resultado completo de consultarProcesso é comparado com o último
+snapshot do processo (IDs de movimentos e documentos já vistos). O que é
+novo vira evento num diário append-only em disco, compartilhado entre os
+workers, de onde é servido por long-poll/SSE e entregue a webhooks.
+
+Um único processo (eleito por lock de arquivo) monitora os processos com
+assinatura e entrega os webhooks; os demais workers só servem o feed.
+Consultas feitas pelos usuários também alimentam o feed, e o monitor não
+reconsulta processos atualizados há menos de um intervalo.
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from arquivos import criar_diretorio_privado, gravar_atomico
+from modelo import Processo
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos (use um único worker)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def validar_webhook_url(url, hosts_permitidos=()):
+    """
+    Valida a URL de um webhook (proteção contra SSRF)
+
+    Com hosts_permitidos (NOVIDADES_WEBHOOK_HOSTS) só esses hosts são aceitos,
+    inclusive internos. Sem a lista, o host precisa resolver apenas para
+    endereços públicos: loopback, redes privadas, link-local (metadados de
+    nuvem), multicast e faixas reservadas são recusados.
+
+    Raises:
+        ValueError: URL inválida ou host não permitido
+    """
+    partes = urlsplit(url) if isinstance(url, str) else None
+    if partes is None or partes.scheme not in ('http', 'https') or not partes.hostname:
+        raise ValueError('webhook_url deve ser uma URL http(s)')
+    host = partes.hostname
+    if hosts_permitidos:
+        if host not in hosts_permitidos:
+            raise ValueError(f'Host do webhook não permitido: {host}')
+        return
+
+    try:
+        porta = partes.port or (443 if partes.scheme == 'https' else 80)
+        enderecos = {info[4][0] for info in socket.getaddrinfo(host, porta, proto=socket.IPPROTO_TCP)}
+    except (OSError, ValueError):
+        raise ValueError(f'Host do webhook não resolvido: {host}')
+    for endereco in enderecos:
+        ip = ipaddress.ip_address(endereco.split('%', 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f'Host do webhook aponta para endereço não público: {host}')
+
+
+class _LockArquivo:
+    """Lock exclusivo entre threads e processos (flock onde disponível)"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._arquivo = open(self.caminho, 'a')
+        if fcntl:
+            fcntl.flock(self._arquivo, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self._arquivo, fcntl.LOCK_UN)
+        self._arquivo.close()
+        self._lock.release()
+
+
+class CursorExpirado(Exception):
+    """O cursor aponta para um segmento do diário já descartado (eventos perdidos)"""
+
+    def __init__(self, cursor_atual):
+        super().__init__('Cursor expirado: eventos descartados, retome pelo cursor atual')
+        self.cursor_atual = cursor_atual
+
+
+class DiarioEventos:
+    """
+    Diário append-only de eventos em JSON Lines, em segmentos numerados
+
+    Os eventos vão para eventos.<n>.jsonl; quando o segmento atual passa de
+    max_bytes, um novo (n + 1) é criado e só os segmentos_mantidos mais
+    recentes ficam em disco. O cursor de leitura é '<n>:<posição>': como os
+    números nunca se repetem, um cursor antigo não cai em outro arquivo, e
+    um cursor de segmento já descartado levanta CursorExpirado. Leitores
+    não usam o lock: o descritor aberto continua válido mesmo se o segmento
+    for removido durante a leitura.
+    """
+
+    PREFIXO = 'eventos.'
+    SUFIXO = '.jsonl'
+
+    def __init__(self, diretorio, max_bytes=64 * 1024 * 1024, segmentos_mantidos=2):
+        self.diretorio = diretorio
+        self.max_bytes = max_bytes
+        self.segmentos_mantidos = max(segmentos_mantidos, 2)
+        self._lock = _LockArquivo(os.path.join(diretorio, 'eventos.lock'))
+        self._condicao = threading.Condition()
+        with self._lock:
+            if not self._segmentos():
+                open(self._caminho(1), 'ab').close()
+
+    def _caminho(self, segmento):
+        return os.path.join(self.diretorio, f'{self.PREFIXO}{segmento}{self.SUFIXO}')
+
+    def _segmentos(self):
+        """Números dos segmentos em disco, em ordem crescente"""
+        segmentos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith(self.PREFIXO) and nome.endswith(self.SUFIXO):
+                numero = nome[len(self.PREFIXO):-len(self.SUFIXO)]
+                if numero.isdigit():
+                    segmentos.append(int(numero))
+        return sorted(segmentos)
+
+    def publicar(self, eventos):
+        """Acrescenta os eventos ao diário (numa única escrita)"""
+        if not eventos:
+            return
+        dados = ''.join(json.dumps(e, ensure_ascii=False, default=str) + '\n' for e in eventos)
+        with self._lock:
+            segmento = self._segmentos()[-1]
+            if os.path.getsize(self._caminho(segmento)) > self.max_bytes:
+                segmento = self._rotacionar(segmento)
+            with open(self._caminho(segmento), 'ab') as f:
+                f.write(dados.encode('utf-8'))
+        with self._condicao:
+            self._condicao.notify_all()
+
+    def _rotacionar(self, segmento):
+        """Cria o próximo segmento e descarta os antigos (chamado com o lock)"""
+        novo = segmento + 1
+        open(self._caminho(novo), 'ab').close()
+        for antigo in self._segmentos():
+            if antigo <= novo - self.segmentos_mantidos:
+                try:
+                    os.remove(self._caminho(antigo))
+                except FileNotFoundError:
+                    pass
+        return novo
+
+    def cursor_atual(self):
+        """Cursor do fim do diário (somente eventos futuros)"""
+        while True:
+            segmento = self._segmentos()[-1]
+            try:
+                return f'{segmento}:{os.path.getsize(self._caminho(segmento))}'
+            except FileNotFoundError:
+                continue  # descartado entre a listagem e o stat: listar de novo
+
+    def _ler_arquivo(self, f, posicao, limite):
+        """Lê até limite linhas completas a partir de posicao; retorna (linhas, nova posição)"""
+        linhas = []
+        f.seek(posicao)
+        while len(linhas) < limite:
+            linha = f.readline()
+            if not linha.endswith(b'\n'):
+                break  # linha ainda sendo escrita
+            posicao += len(linha)
+            linhas.append(linha)
+        return linhas, posicao
+
+    def ler(self, cursor=None, numeros=None, limite=500):
+        """
+        Lê eventos após o cursor
+
+        Args:
+            cursor: Cursor retornado anteriormente (None = fim do diário)
+            numeros: Conjunto de números de processo para filtrar (None = todos)
+            limite: Máximo de linhas lidas por chamada
+
+        Returns:
+            tuple: (lista de (cursor do evento, evento), novo cursor)
+
+        Raises:
+            ValueError: Cursor mal formado
+            CursorExpirado: Segmento do cursor já descartado (ou de outro diário)
+        """
+        if not cursor:
+            return [], self.cursor_atual()
+
+        try:
+            segmento, posicao = (int(parte) for parte in cursor.split(':', 1))
+        except ValueError:
+            raise ValueError('Cursor inválido')
+
+        eventos = []
+        restantes = limite
+        while True:
+            # Com o próximo segmento já criado este não recebe mais escritas
+            # (ambos acontecem sob o lock): lido até o fim, segue no próximo
+            terminado = os.path.exists(self._caminho(segmento + 1))
+            try:
+                f = open(self._caminho(segmento), 'rb')
+            except FileNotFoundError:
+                raise CursorExpirado(self.cursor_atual())
+            with f:
+                linhas, nova_posicao = self._ler_arquivo(f, posicao, restantes)
+            for linha in linhas:
+                posicao += len(linha)
+                evento = json.loads(linha)
+                if numeros is None or evento.get('numero_processo') in numeros:
+                    eventos.append((f'{segmento}:{posicao}', evento))
+            cursor = f'{segmento}:{nova_posicao}'
+            restantes -= len(linhas)
+            if restantes <= 0 or not terminado:
+                return eventos, cursor
+            segmento, posicao = segmento + 1, 0
+
+    def aguardar(self, cursor=None, numeros=None, timeout=25, limite=500):
+        """Long-poll: como ler(), mas espera até timeout segundos por eventos"""
+        if not cursor:
+            cursor = self.cursor_atual()
+        fim = time.monotonic() + timeout
+        while True:
+            eventos, cursor = self.ler(cursor, numeros, limite)
+            restante = fim - time.monotonic()
+            if eventos or restante <= 0:
+                return eventos, cursor
+            # Publicações deste processo acordam na hora; as de outros workers
+            # são vistas na próxima verificação
+            with self._condicao:
+                self._condicao.wait(min(restante, 0.5))
+
+
+class RepositorioSnapshots:
+    """
+    IDs de movimentos e documentos já vistos de cada processo
+
+    O total de snapshots é limitado a max_itens: ao passar do limite, os
+    atualizados há mais tempo (mtime) são removidos até sobrar 90% do limite.
+    Processos com assinatura nunca são removidos; os demais só perdem a
+    linha de base (a próxima consulta cria outra, sem eventos).
+    """
+
+    def __init__(self, diretorio, max_itens=50000, protegidos=None, intervalo_varredura=60):
+        """
+        Args:
+            diretorio: Diretório do feed (os snapshots ficam em snapshots/)
+            max_itens: Máximo de snapshots guardados (0 = sem limite)
+            protegidos: Função que retorna os números que não podem ser removidos
+            intervalo_varredura: Segundos entre recontagens (outros workers também gravam)
+        """
+        self.diretorio = os.path.join(diretorio, 'snapshots')
+        self.max_itens = max_itens
+        self.protegidos = protegidos or (lambda: ())
+        self.intervalo_varredura = intervalo_varredura
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_estimado = None
+        self._ultima_varredura = 0
+
+    def _caminho(self, numero_processo):
+        return os.path.join(self.diretorio, ''.join(filter(str.isdigit, numero_processo)) + '.json')
+
+    def obter(self, numero_processo):
+        """Retorna {'movimentos', 'documentos', 'atualizado_em'} ou None"""
+        try:
+            with open(self._caminho(numero_processo), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def guardar(self, numero_processo, movimentos, documentos):
+        snapshot = {
+            'movimentos': sorted(movimentos),
+            'documentos': sorted(documentos),
+            'atualizado_em': time.time(),
+        }
+        caminho = self._caminho(numero_processo)
+        novo = not os.path.exists(caminho)
+        gravar_atomico(caminho, json.dumps(snapshot).encode('utf-8'))
+        if novo:
+            self._contabilizar()
+
+    def _contabilizar(self):
+        """Soma o snapshot novo ao total estimado e remove os antigos se passou do limite"""
+        if not self.max_itens:
+            return
+        with self._lock:
+            recontar = (self._total_estimado is None
+                        or time.monotonic() - self._ultima_varredura > self.intervalo_varredura)
+            if not recontar:
+                self._total_estimado += 1
+                if self._total_estimado <= self.max_itens:
+                    return
+            self._total_estimado = self._liberar_espaco()
+            self._ultima_varredura = time.monotonic()
+
+    def _liberar_espaco(self):
+        """
+        Reconta os snapshots e remove os atualizados há mais tempo
+
+        Returns:
+            int: Snapshots restantes após a limpeza
+        """
+        snapshots = []
+        for arquivo in os.scandir(self.diretorio):
+            if arquivo.name.endswith('.json'):
+                try:
+                    snapshots.append((arquivo.stat().st_mtime, arquivo.path, arquivo.name[:-5]))
+                except FileNotFoundError:
+                    continue
+        total = len(snapshots)
+        if total <= self.max_itens:
+            return total
+
+        protegidos = set(self.protegidos())
+        alvo = self.max_itens * 0.9
+        removidos = 0
+        for _, caminho, numero in sorted(snapshots):
+            if total <= alvo:
+                break
+            if numero in protegidos:
+                continue
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= 1
+            removidos += 1
+
+        logger.info(f"Snapshots de novidades: {removidos} removido(s), {total} restante(s)")
+        return total
+
+
+class Assinaturas:
+    """Assinaturas do feed (processos monitorados e webhook opcional), em JSON"""
+
+    def __init__(self, diretorio):
+        self.caminho = os.path.join(diretorio, 'assinaturas.json')
+        self._lock = _LockArquivo(os.path.join(diretorio, 'assinaturas.lock'))
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def listar(self):
+        return self._carregar()
+
+    def obter(self, id_assinatura):
+        return self._carregar().get(id_assinatura)
+
+    def criar(self, numeros_processo, webhook_url=None):
+        """
+        Cria uma assinatura
+
+        Returns:
+            dict: Assinatura com 'id' e 'segredo' (chave HMAC das entregas do webhook)
+        """
+        assinatura = {
+            'id': uuid.uuid4().hex,
+            'numeros_processo': sorted(set(numeros_processo)),
+            'webhook_url': webhook_url,
+            'segredo': uuid.uuid4().hex,
+            'criada_em': datetime.now().isoformat(),
+        }
+        with self._lock:
+            todas = self._carregar()
+            todas[assinatura['id']] = assinatura
+            gravar_atomico(self.caminho, json.dumps(todas, indent=2).encode('utf-8'))
+        return assinatura
+
+    def remover(self, id_assinatura):
+        with self._lock:
+            todas = self._carregar()
+            if todas.pop(id_assinatura, None) is None:
+                return False
+            gravar_atomico(self.caminho, json.dumps(todas, indent=2).encode('utf-8'))
+        return True
+
+    def numeros_monitorados(self):
+        return sorted({n for a in self._carregar().values() for n in a['numeros_processo']})
+
+
+class DetectorMudancas:
+    """Compara resultados de consultarProcesso com o snapshot e publica as novidades"""
+
+    def __init__(self, snapshots, diario):
+        self.snapshots = snapshots
+        self.diario = diario
+        # Locks por processo (distribuídos em faixas) evitam eventos duplicados
+        # quando o mesmo processo é consultado em paralelo no mesmo worker
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def registrar(self, numero_processo, resposta):
+        """
+        Registra um resultado completo (com movimentos e documentos, sem filtro de datas)
+
+        A primeira consulta de um processo só cria o snapshot (linha de base).
+        Aceita a resposta de consultarProcesso ou o modelo.Processo já convertido.
+
+        Returns:
+            list: Eventos publicados
+        """
+        if isinstance(resposta, Processo):
+            processo = resposta
+        else:
+            processo = Processo.de_resposta(resposta, numero_processo)
+        if processo is None:
+            return []
+
+        movimentos = {m.id_movimento for m in processo.movimentos if m.id_movimento}
+        documentos = {d.id_documento for d in processo.documentos if d.id_documento}
+
+        with self._locks[hash(numero_processo) % len(self._locks)]:
+            anterior = self.snapshots.obter(numero_processo)
+            if anterior is None:
+                self.snapshots.guardar(numero_processo, movimentos, documentos)
+                return []
+
+            vistos_movimentos = set(anterior['movimentos'])
+            vistos_documentos = set(anterior['documentos'])
+            detectado_em = datetime.now().isoformat()
+
+            eventos = [
+                {'id': f'{numero_processo}:movimento:{m.id_movimento}', 'tipo': 'movimento',
+                 'numero_processo': numero_processo, 'detectado_em': detectado_em,
+                 'movimento': m.para_dict()}
+                for m in processo.movimentos
+                if m.id_movimento and m.id_movimento not in vistos_movimentos
+            ] + [
+                {'id': f'{numero_processo}:documento:{d.id_documento}', 'tipo': 'documento',
+                 'numero_processo': numero_processo, 'detectado_em': detectado_em,
+                 'documento': d.para_dict()}
+                for d in processo.documentos
+                if d.id_documento and d.id_documento not in vistos_documentos
+            ]
+
+            # União com o já visto: itens que somem e voltam não são anunciados de novo
+            self.snapshots.guardar(numero_processo, vistos_movimentos | movimentos,
+                                   vistos_documentos | documentos)
+            if eventos:
+                self.diario.publicar(eventos)
+                logger.info(f"Novidades em {numero_processo}: {len(eventos)} evento(s)")
+            return eventos
+
+
+class EntregadorWebhooks:
+    """
+    Entrega os eventos do diário aos webhooks das assinaturas
+
+    Eventos são agrupados em lotes (até tamanho_lote ou espera segundos) e
+    cada lote é enviado com POST JSON assinado (X-MNI-Assinatura: sha256=HMAC
+    do corpo com o segredo da assinatura). Falhas são repetidas com backoff
+    exponencial; esgotadas as tentativas, o lote vai para webhooks_falhas.jsonl.
+    A URL é validada de novo a cada entrega (o DNS pode ter mudado desde a
+    assinatura) e redirecionamentos não são seguidos.
+    """
+
+    def __init__(self, diretorio, diario, assinaturas, tamanho_lote=50, espera=5.0,
+                 tentativas=5, timeout=10, hosts_permitidos=()):
+        self.caminho_cursor = os.path.join(diretorio, 'webhooks.cursor')
+        self.caminho_falhas = os.path.join(diretorio, 'webhooks_falhas.jsonl')
+        self.diario = diario
+        self.assinaturas = assinaturas
+        self.tamanho_lote = tamanho_lote
+        self.espera = espera
+        self.tentativas = tentativas
+        self.timeout = timeout
+        self.hosts_permitidos = hosts_permitidos
+        self._session = None
+        self._lock_session = threading.Lock()
+
+    def _obter_session(self):
+        """Sessão HTTP dos webhooks, criada (com o requests) na primeira entrega"""
+        with self._lock_session:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            return self._session
+
+    def _ler_cursor(self):
+        try:
+            with open(self.caminho_cursor, encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _enviar(self, assinatura, eventos):
+        corpo = json.dumps({'assinatura': assinatura['id'], 'eventos': eventos},
+                           ensure_ascii=False, default=str).encode('utf-8')
+        assinatura_hmac = hmac.new(assinatura['segredo'].encode('utf-8'), corpo, hashlib.sha256).hexdigest()
+        headers = {'Content-Type': 'application/json', 'X-MNI-Assinatura': f'sha256={assinatura_hmac}'}
+
+        session = self._obter_session()
+        for tentativa in range(1, self.tentativas + 1):
+            try:
+                validar_webhook_url(assinatura['webhook_url'], self.hosts_permitidos)
+            except ValueError as e:
+                erro = str(e)
+                break
+            try:
+                resposta = session.post(assinatura['webhook_url'], data=corpo, headers=headers,
+                                        timeout=self.timeout, allow_redirects=False)
+                if resposta.status_code < 300:
+                    return True
+                erro = f'HTTP {resposta.status_code}'
+            except OSError as e:  # requests.RequestException é subclasse de OSError
+                erro = str(e)
+            logger.warning(f"Webhook {assinatura['id']}: tentativa {tentativa} falhou ({erro})")
+            if tentativa < self.tentativas:
+                time.sleep(min(2 ** (tentativa - 1), 60))
+
+        with open(self.caminho_falhas, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'assinatura': assinatura['id'], 'erro': erro, 'eventos': eventos},
+                               ensure_ascii=False, default=str) + '\n')
+        logger.error(f"Webhook {assinatura['id']}: {len(eventos)} evento(s) não entregues")
+        return False
+
+    def entregar(self, eventos):
+        """Envia os eventos a cada assinatura com webhook interessada"""
+        envios = []
+        for assinatura in self.assinaturas.listar().values():
+            if not assinatura.get('webhook_url'):
+                continue
+            numeros = set(assinatura['numeros_processo'])
+            seus = [e for e in eventos if e['numero_processo'] in numeros]
+            for i in range(0, len(seus), self.tamanho_lote):
+                envios.append((assinatura, seus[i:i + self.tamanho_lote]))
+
+        if envios:
+            with ThreadPoolExecutor(max_workers=min(len(envios), 4)) as executor:
+                list(executor.map(lambda envio: self._enviar(*envio), envios))
+
+    def executar(self, parar):
+        cursor = self._ler_cursor() or self.diario.cursor_atual()
+        while not parar.is_set():
+            try:
+                eventos, cursor_lido = self.diario.aguardar(cursor, timeout=self.espera, limite=self.tamanho_lote)
+            except (CursorExpirado, ValueError) as e:
+                cursor = self._retomar(e)
+                continue
+            if not eventos:
+                cursor = cursor_lido
+                continue
+
+            # Completar o lote por até 'espera' segundos
+            lote = [evento for _, evento in eventos]
+            fim = time.monotonic() + self.espera
+            while len(lote) < self.tamanho_lote and time.monotonic() < fim:
+                try:
+                    mais, cursor_lido = self.diario.aguardar(cursor_lido, timeout=fim - time.monotonic(),
+                                                              limite=self.tamanho_lote - len(lote))
+                except CursorExpirado as e:
+                    cursor_lido = self._retomar(e)
+                    break
+                lote.extend(evento for _, evento in mais)
+
+            self.entregar(lote)
+            cursor = cursor_lido
+            gravar_atomico(self.caminho_cursor, cursor.encode('utf-8'))
+
+    def _retomar(self, erro):
+        """Cursor salvo inválido ou de segmento descartado: segue do fim do diário"""
+        logger.error(f"Webhooks: {str(erro)}; eventos não entregues entre o cursor salvo e o atual")
+        cursor = getattr(erro, 'cursor_atual', None) or self.diario.cursor_atual()
+        gravar_atomico(self.caminho_cursor, cursor.encode('utf-8'))
+        return cursor
+
+
+class ServicoNovidades:
+    """Reúne diário, snapshots, assinaturas, monitor e entrega de webhooks"""
+
+    def __init__(self, diretorio, intervalo=300, tamanho_lote=50, espera_lote=5.0, tentativas=5,
+                 max_snapshots=50000, tamanho_fila=1000, hosts_webhook=()):
+        """
+        Args:
+            diretorio: Diretório compartilhado pelos workers (criado com permissão 0700:
+                guarda os segredos dos webhooks)
+            intervalo: Segundos entre consultas do monitor a cada processo assinado
+            tamanho_lote: Eventos por entrega de webhook
+            espera_lote: Segundos aguardando para completar um lote
+            tentativas: Tentativas de entrega de cada lote
+            max_snapshots: Máximo de snapshots guardados (0 = sem limite)
+            tamanho_fila: Resultados aguardando comparação com o snapshot
+            hosts_webhook: Hosts aceitos nos webhooks (vazio = qualquer host público)
+        """
+        criar_diretorio_privado(diretorio)
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self.hosts_webhook = frozenset(hosts_webhook)
+        self.diario = DiarioEventos(diretorio)
+        self.assinaturas = Assinaturas(diretorio)
+        self.snapshots = RepositorioSnapshots(diretorio, max_itens=max_snapshots,
+                                              protegidos=self.assinaturas.numeros_monitorados)
+        self.detector = DetectorMudancas(self.snapshots, self.diario)
+        self.entregador = EntregadorWebhooks(diretorio, self.diario, self.assinaturas,
+                                             tamanho_lote=tamanho_lote, espera=espera_lote,
+                                             tentativas=tentativas, hosts_permitidos=self.hosts_webhook)
+        self._parar = threading.Event()
+        self._thread = None
+        self._arquivo_lider = None
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._thread_fila = None
+        self._lock_fila = threading.Lock()
+
+    def validar_webhook_url(self, url):
+        """Valida a URL de webhook de uma nova assinatura (levanta ValueError)"""
+        validar_webhook_url(url, self.hosts_webhook)
+
+    def registrar(self, numero_processo, resposta):
+        """
+        Alimenta o feed com um resultado completo de consultarProcesso
+
+        A comparação com o snapshot (leitura e gravação em disco) roda numa
+        thread do processo, fora da requisição. Com a fila cheia o resultado
+        é descartado: o snapshot não muda e a próxima consulta detecta as
+        mesmas novidades.
+
+        Returns:
+            bool: False se o resultado foi descartado
+        """
+        self._iniciar_fila()
+        try:
+            self._fila.put_nowait((numero_processo, resposta))
+        except queue.Full:
+            logger.warning(f"Fila de novidades cheia: {numero_processo} fica para a próxima consulta")
+            return False
+        return True
+
+    def _iniciar_fila(self):
+        """Inicia a thread da fila no primeiro uso (depois do fork dos workers)"""
+        if self._thread_fila is None:
+            with self._lock_fila:
+                if self._thread_fila is None:
+                    self._thread_fila = threading.Thread(target=self._processar_fila,
+                                                         name='novidades-registro', daemon=True)
+                    self._thread_fila.start()
+
+    def _processar_fila(self):
+        while True:
+            numero_processo, resposta = self._fila.get()
+            try:
+                self.detector.registrar(numero_processo, resposta)
+            except Exception as e:
+                logger.error(f"Erro ao registrar novidades de {numero_processo}: {str(e)}")
+            finally:
+                self._fila.task_done()
+
+    def _tentar_lideranca(self):
+        """Tenta obter o lock de líder (mantido enquanto o processo viver)"""
+        if fcntl is None:
+            return True
+        arquivo = open(os.path.join(self.diretorio, 'lider.lock'), 'a')
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            return False
+        self._arquivo_lider = arquivo
+        return True
+
+    def monitorar(self, roteador):
+        """Um ciclo do monitor: consulta os processos assinados não atualizados no intervalo"""
+        agora = time.time()
+        numeros = [
+            n for n in self.assinaturas.numeros_monitorados()
+            if agora - (self.snapshots.obter(n) or {}).get('atualizado_em', 0) >= self.intervalo
+        ]
+        if not numeros:
+            return
+
+        def consultar(soap_service, numero_processo):
+            return soap_service.consultar_processo(numero_processo=numero_processo)
+
+        resultados = roteador.executar_em_paralelo(numeros, consultar)
+        # Registrado depois de devolver o cliente: gravação em disco não é latência do tribunal
+        novos = sum(len(self.detector.registrar(numero, resposta))
+                    for numero, (resposta, erro) in resultados.items() if erro is None)
+        logger.info(f"Monitor de novidades: {len(numeros)} processo(s) consultado(s), {novos} evento(s)")
+
+    def _executar(self, obter_roteador):
+        # Aguarda a liderança; se o líder cair, outro worker assume
+        while not self._parar.is_set() and not self._tentar_lideranca():
+            self._parar.wait(10)
+        if self._parar.is_set():
+            return
+
+        logger.info(f"Monitor de novidades ativo neste processo (pid {os.getpid()})")
+        threading.Thread(target=self.entregador.executar, args=(self._parar,),
+                         name='novidades-webhooks', daemon=True).start()
+        while not self._parar.is_set():
+            try:
+                self.monitorar(obter_roteador())
+            except Exception as e:
+                logger.error(f"Erro no monitor de novidades: {str(e)}")
+            self._parar.wait(min(self.intervalo, 60))
+
+    def iniciar(self, obter_roteador):
+        """Inicia (uma vez por processo) a disputa pela liderança do monitor"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, args=(obter_roteador,),
+                                            name='novidades-monitor', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
@@ -0,0 +1,149 @@
+"""
+Orçamento de tempo de importação e de módulos carregados na inicialização
+
+Importar app.py (e os demais pontos de entrada) não deve carregar a pilha
+SOAP (zeep, lxml, requests, urllib3) nem o pyarrow: eles são importados no
+primeiro uso. Este script mede a importação em um interpretador novo com
+`python -X importtime`, falha se o tempo passar do orçamento ou se algum
+módulo pesado for carregado, e confere que /, /sobre e os health checks
+respondem sem carregar o subsistema SOAP.
+
+Uso:
+    python orcamento_importacao.py
+    python orcamento_importacao.py --orcamento-ms 200 --repeticoes 5
+
+Sai com código 1 em caso de violação (para usar no CI).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Pontos de entrada e orçamento padrão (ms, tempo cumulativo do módulo).
+# Cerca do dobro do medido com as importações adiadas (app ~130 ms, wsgi
+# ~130 ms, exportacao ~10 ms, novidades ~22 ms): com a pilha SOAP importada
+# de imediato o app passava de 450 ms, então uma regressão estoura o orçamento.
+MODULOS = {
+    'app': 250,
+    'wsgi': 250,
+    'exportacao': 30,
+    'novidades': 50,
+}
+
+# Carregados só no primeiro uso (cliente SOAP, exportação, webhook)
+MODULOS_PESADOS = ('zeep', 'lxml', 'requests', 'urllib3', 'pyarrow', 'soap_service')
+
+RE_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+# Executado em um interpretador novo: rotas leves não podem carregar a pilha SOAP
+VERIFICACAO_ROTAS = """
+import json, sys
+from app import app
+cliente = app.test_client()
+status = {rota: cliente.get(rota).status_code for rota in ('/', '/sobre', '/health/live', '/health/ready')}
+carregados = [m for m in MODULOS_PESADOS if m in sys.modules]
+print(json.dumps({'status': status, 'carregados': carregados}))
+"""
+
+
+def _ambiente():
+    ambiente = dict(os.environ)
+    ambiente['PYTHONPATH'] = os.pathsep.join(filter(None, [DIRETORIO, ambiente.get('PYTHONPATH')]))
+    # Sem endpoint real: o roteador pode ser criado, mas nada é consultado
+    ambiente.setdefault('SOAP_WSDL_URL', 'http://127.0.0.1:9/ws/mni.wsdl')
+    ambiente.setdefault('NOVIDADES_DIR', os.path.join(tempfile.gettempdir(), 'mni_orcamento_novidades'))
+    return ambiente
+
+
+def medir_importacao(modulo):
+    """
+    Importa o módulo em um interpretador novo com -X importtime
+
+    Returns:
+        tuple: (tempo cumulativo do módulo em ms, lista de módulos importados)
+    """
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=DIRETORIO, env=_ambiente(), capture_output=True, text=True
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f'Falha ao importar {modulo}:\n{processo.stderr[-2000:]}')
+
+    cumulativo = None
+    importados = []
+    for linha in processo.stderr.splitlines():
+        correspondencia = RE_IMPORTTIME.match(linha)
+        if not correspondencia:
+            continue
+        nome = correspondencia.group(4)
+        importados.append(nome)
+        # Nível zero de indentação: importado diretamente pelo -c
+        if nome == modulo and correspondencia.group(3) == ' ':
+            cumulativo = int(correspondencia.group(2)) / 1000
+    if cumulativo is None:
+        raise RuntimeError(f'{modulo} não aparece na saída de -X importtime')
+    return cumulativo, importados
+
+
+def verificar_rotas():
+    """Chama as rotas leves e retorna (status por rota, módulos pesados carregados)"""
+    import json
+
+    codigo = f'MODULOS_PESADOS = {MODULOS_PESADOS!r}\n' + VERIFICACAO_ROTAS
+    processo = subprocess.run([sys.executable, '-c', codigo], cwd=DIRETORIO, env=_ambiente(),
+                              capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f'Falha ao verificar as rotas:\n{processo.stderr[-2000:]}')
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    return resultado['status'], resultado['carregados']
+
+
+def _pesados(importados):
+    return sorted({nome.split('.')[0] for nome in importados
+                   if nome.split('.')[0] in MODULOS_PESADOS})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Orçamento de tempo de importação')
+    parser.add_argument('--orcamento-ms', type=float, default=None,
+                        help='Orçamento único para todos os módulos (padrão: por módulo)')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Importações por módulo; vale a mais rápida (padrão: 3)')
+    parser.add_argument('--modulo', action='append', choices=sorted(MODULOS),
+                        help='Verificar só estes módulos (padrão: todos)')
+    args = parser.parse_args()
+
+    violacoes = []
+    for modulo in args.modulo or MODULOS:
+        orcamento = args.orcamento_ms or MODULOS[modulo]
+        medicoes = [medir_importacao(modulo) for _ in range(max(args.repeticoes, 1))]
+        tempo = min(cumulativo for cumulativo, _ in medicoes)
+        pesados = _pesados(medicoes[0][1])
+
+        situacao = 'ok' if tempo <= orcamento and not pesados else 'FALHA'
+        print(f'{modulo:12} {tempo:8.1f} ms  (orçamento {orcamento:.0f} ms)  {situacao}')
+        if tempo > orcamento:
+            violacoes.append(f'{modulo}: {tempo:.1f} ms > {orcamento:.0f} ms')
+        if pesados:
+            violacoes.append(f'{modulo} carrega na importação: {", ".join(pesados)}')
+
+    status, carregados = verificar_rotas()
+    print('Rotas leves: ' + ', '.join(f'{rota} {codigo}' for rota, codigo in status.items()))
+    for rota, codigo in status.items():
+        # /health/ready responde 503 enquanto os clientes SOAP não foram aquecidos
+        if codigo >= 500 and rota != '/health/ready':
+            violacoes.append(f'{rota} respondeu {codigo}')
+    if carregados:
+        violacoes.append(f'rotas leves carregaram: {", ".join(carregados)}')
+
+    if violacoes:
+        print('\nViolações:')
+        for violacao in violacoes:
+            print(f'  - {violacao}')
+        sys.exit(1)
+    print('\nDentro do orçamento')
@@ -0,0 +1,230 @@
+import threading
+import time
+import logging
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointIndisponivel(Exception):
+    """O endpoint SOAP não pode atender agora (circuito aberto ou sobrecarga)"""
+
+
+class CircuitoAberto(EndpointIndisponivel):
+    """Circuito aberto: chamadas ao endpoint estão suspensas temporariamente"""
+
+
+class SobrecargaEndpoint(EndpointIndisponivel):
+    """Fila de espera do endpoint cheia ou tempo de espera esgotado"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por endpoint baseado em taxa de falhas numa janela deslizante
+
+    Chamadas mais lentas que latencia_lenta contam como falha. Com o circuito
+    aberto as chamadas falham imediatamente; após tempo_aberto segundos uma
+    única chamada de teste é liberada (meio-aberto) para decidir se fecha.
+    """
+
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio-aberto'
+
+    def __init__(self, nome, janela=20, minimo_chamadas=5, taxa_falhas=0.5,
+                 latencia_lenta=10.0, tempo_aberto=30.0):
+        """
+        Args:
+            nome: Identificação do endpoint (para logs)
+            janela: Quantidade de chamadas recentes consideradas
+            minimo_chamadas: Chamadas necessárias antes de avaliar a taxa
+            taxa_falhas: Fração de falhas (0-1) que abre o circuito
+            latencia_lenta: Latência em segundos considerada falha
+            tempo_aberto: Segundos com o circuito aberto antes do teste
+        """
+        self.nome = nome
+        self.minimo_chamadas = minimo_chamadas
+        self.taxa_falhas = taxa_falhas
+        self.latencia_lenta = latencia_lenta
+        self.tempo_aberto = tempo_aberto
+        self._resultados = deque(maxlen=janela)
+        self._estado = self.FECHADO
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+        self._lock = threading.Lock()
+
+    @property
+    def estado(self):
+        return self._estado
+
+    def permitir(self):
+        """
+        Verifica se uma chamada pode ser feita
+
+        Raises:
+            CircuitoAberto: Se o circuito estiver aberto
+        """
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return
+
+            restante = self._aberto_em + self.tempo_aberto - time.monotonic()
+            if self._estado == self.ABERTO and restante <= 0:
+                self._estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+
+            if self._estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return
+
+            raise CircuitoAberto(
+                f'Endpoint {self.nome} indisponível (circuito aberto, nova tentativa '
+                f'em {max(restante, 0):.0f}s)')
+
+    def cancelar(self):
+        """Libera a vaga de teste do meio-aberto quando a chamada não foi feita"""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def registrar(self, sucesso, latencia):
+        """Registra o resultado de uma chamada"""
+        falha = not sucesso or latencia > self.latencia_lenta
+        with self._lock:
+            if self._estado == self.MEIO_ABERTO:
+                self._teste_em_andamento = False
+                if falha:
+                    self._abrir()
+                else:
+                    logger.info(f"Circuito do endpoint {self.nome} fechado")
+                    self._estado = self.FECHADO
+                    self._resultados.clear()
+                return
+
+            self._resultados.append(falha)
+            if self._estado == self.FECHADO and len(self._resultados) >= self.minimo_chamadas:
+                if sum(self._resultados) / len(self._resultados) >= self.taxa_falhas:
+                    self._abrir()
+
+    def abrir(self):
+        """Abre o circuito já (ex: endpoint inacessível ao aquecer)"""
+        with self._lock:
+            self._abrir()
+
+    def _abrir(self):
+        logger.warning(f"Circuito do endpoint {self.nome} aberto por {self.tempo_aberto:.0f}s")
+        self._estado = self.ABERTO
+        self._aberto_em = time.monotonic()
+        self._resultados.clear()
+
+
+class LimitadorAdaptativo:
+    """
+    Limite de concorrência adaptativo (AIMD) com fila de espera curta
+
+    O limite cresce aditivamente enquanto as chamadas terminam abaixo da
+    latência alvo e cai pela metade em falhas ou lentidão, até limite_minimo.
+    Pedidos excedentes esperam no máximo espera_fila segundos, e a fila não
+    passa de fila_maxima; o restante é rejeitado de imediato. Chamadas em
+    lote informam um prazo e esperam a vez até ele, sem ocupar a fila das
+    requisições interativas.
+    """
+
+    def __init__(self, nome, limite_maximo, limite_minimo=1, latencia_alvo=5.0,
+                 espera_fila=5.0, fila_maxima=None):
+        self.nome = nome
+        self.limite_maximo = limite_maximo
+        self.limite_minimo = min(limite_minimo, limite_maximo)
+        self.latencia_alvo = latencia_alvo
+        self.espera_fila = espera_fila
+        self.fila_maxima = fila_maxima if fila_maxima is not None else limite_maximo * 2
+        self._limite = float(limite_maximo)
+        self._em_uso = 0
+        self._aguardando = 0
+        self._aguardando_lote = 0
+        self._condicao = threading.Condition()
+
+    @property
+    def limite(self):
+        return max(int(self._limite), self.limite_minimo)
+
+    def adquirir(self, prazo=None):
+        """
+        Reserva uma vaga de chamada
+
+        Args:
+            prazo: Instante (time.monotonic()) até o qual uma chamada em lote
+                espera por vaga, sem espera_fila nem fila_maxima (None = chamada
+                interativa)
+
+        Raises:
+            SobrecargaEndpoint: Se a fila estiver cheia ou a espera se esgotar
+        """
+        with self._condicao:
+            if self._em_uso < self.limite:
+                self._em_uso += 1
+                return
+
+            if prazo is not None:
+                # Lote: o tamanho já é limitado pelas threads de quem chama
+                self._aguardando_lote += 1
+                try:
+                    liberado = self._condicao.wait_for(lambda: self._em_uso < self.limite,
+                                                       timeout=max(prazo - time.monotonic(), 0))
+                finally:
+                    self._aguardando_lote -= 1
+                if not liberado:
+                    raise SobrecargaEndpoint(
+                        f'Endpoint {self.nome} ocupado: prazo do lote esgotado aguardando vaga')
+                self._em_uso += 1
+                return
+
+            if self._aguardando >= self.fila_maxima:
+                raise SobrecargaEndpoint(f'Endpoint {self.nome} sobrecarregado: fila de espera cheia')
+
+            self._aguardando += 1
+            try:
+                liberado = self._condicao.wait_for(lambda: self._em_uso < self.limite,
+                                                   timeout=self.espera_fila)
+            finally:
+                self._aguardando -= 1
+
+            if not liberado:
+                raise SobrecargaEndpoint(
+                    f'Endpoint {self.nome} ocupado: limite de {self.limite} consultas '
+                    f'simultâneas atingido')
+            self._em_uso += 1
+
+    def liberar(self, sucesso, latencia):
+        """Libera a vaga e ajusta o limite conforme o resultado da chamada"""
+        with self._condicao:
+            self._em_uso -= 1
+            if not sucesso or latencia > self.latencia_alvo:
+                self._limite = max(self._limite / 2, self.limite_minimo)
+            else:
+                self._limite = min(self._limite + 1 / self._limite, self.limite_maximo)
+            self._condicao.notify_all()
+
+    def estado(self):
+        return {'limite': self.limite, 'em_uso': self._em_uso, 'aguardando': self._aguardando,
+                'aguardando_lote': self._aguardando_lote}
+
+
+class UltimosResultados:
+    """Último resultado bem-sucedido de cada consulta, usado como fallback obsoleto"""
+
+    def __init__(self, max_itens=1000):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = (valor, time.time())
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def obter(self, chave):
+        """Retorna (valor, timestamp de obtenção) ou None"""
+        with self._lock:
+            return self._itens.get(chave)
@@ -0,0 +1,394 @@
+import contextvars
+import os
+import queue
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from resiliencia import CircuitBreaker, LimitadorAdaptativo
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(valor, padrao=True):
+    """Interpreta variáveis de ambiente booleanas (false/0/no/n/off)"""
+    if valor is None:
+        return padrao
+    return valor.lower() not in ('false', '0', 'no', 'n', 'off')
+
+
+def segmento_tribunal(numero_processo):
+    """
+    Extrai o segmento J.TR de um número CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO)
+
+    Args:
+        numero_processo: Número do processo (20 dígitos, com ou sem formatação)
+
+    Returns:
+        str: Segmento no formato 'J.TR' (ex: '8.27')
+    """
+    digitos = ''.join(filter(str.isdigit, numero_processo))
+    if len(digitos) != 20:
+        raise ValueError('Número do processo deve ter 20 dígitos')
+    return f'{digitos[13]}.{digitos[14:16]}'
+
+
+def falha_de_transporte(erro):
+    """
+    Indica se a exceção veio do transporte até o tribunal
+
+    Conexão recusada, timeout e HTTP de erro (TransportError do zeep, que
+    também cobre resposta que não é XML). Com um cliente criado o zeep e o
+    requests já estão carregados.
+    """
+    from requests.exceptions import RequestException
+    from zeep.exceptions import TransportError
+    return isinstance(erro, (RequestException, TransportError, TimeoutError, ConnectionError))
+
+
+class ConfiguracaoEndpoint:
+    """Configuração de acesso a uma instância MNI (eproc/PJe)"""
+
+    def __init__(self, nome, wsdl_url, usuario, senha, servidor_base=None, verify_ssl=True,
+                 timeout=30, max_concorrencia=4, clientes_aquecidos=1, espera_fila=5,
+                 fila_maxima=None, latencia_alvo=5, circuito_taxa_falhas=0.5,
+                 circuito_tempo_aberto=30, caminho_rapido=False):
+        """
+        Args:
+            nome: Identificação do endpoint (segmento J.TR ou 'padrao')
+            wsdl_url: URL do WSDL
+            usuario: Usuário para autenticação
+            senha: Senha para autenticação
+            servidor_base: URL base do servidor
+            verify_ssl: Verificar certificado SSL
+            timeout: Timeout das requisições SOAP em segundos
+            max_concorrencia: Máximo de chamadas simultâneas ao endpoint
+            clientes_aquecidos: Clientes criados antecipadamente por aquecer()
+            espera_fila: Segundos aguardando um cliente livre antes de desistir
+            fila_maxima: Pedidos aguardando além dos quais novos são rejeitados
+                (padrão: 2 x max_concorrencia)
+            latencia_alvo: Latência (s) acima da qual a concorrência é reduzida
+            circuito_taxa_falhas: Fração de falhas que abre o circuito
+            circuito_tempo_aberto: Segundos com o circuito aberto antes de testar
+            caminho_rapido: Consultas sem zeep (MotorRapidoMNI), com fallback
+        """
+        self.nome = nome
+        self.wsdl_url = wsdl_url
+        self.usuario = usuario
+        self.senha = senha
+        self.servidor_base = servidor_base
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+        self.max_concorrencia = max_concorrencia
+        self.clientes_aquecidos = clientes_aquecidos
+        self.espera_fila = espera_fila
+        self.fila_maxima = fila_maxima
+        self.latencia_alvo = latencia_alvo
+        self.circuito_taxa_falhas = circuito_taxa_falhas
+        self.circuito_tempo_aberto = circuito_tempo_aberto
+        self.caminho_rapido = caminho_rapido
+
+    @classmethod
+    def de_ambiente(cls, nome, prefixo, padrao=None):
+        """
+        Lê a configuração de variáveis de ambiente com o prefixo informado
+
+        Valores ausentes são herdados da configuração padrão, se houver.
+        Ex.: prefixo 'SOAP_TRIBUNAL_8_27_' lê SOAP_TRIBUNAL_8_27_WSDL_URL etc.
+        """
+        def valor(chave, herdado=None):
+            return os.getenv(prefixo + chave, herdado)
+
+        def herdar(atributo, valor_padrao=None):
+            return getattr(padrao, atributo) if padrao else valor_padrao
+
+        fila_maxima = valor('FILA_MAXIMA', herdar('fila_maxima'))
+
+        return cls(
+            nome=nome,
+            wsdl_url=valor('WSDL_URL', herdar('wsdl_url')),
+            usuario=valor('USUARIO', herdar('usuario')),
+            senha=valor('SENHA', herdar('senha')),
+            servidor_base=valor('SERVIDOR_BASE', herdar('servidor_base')),
+            verify_ssl=_env_bool(valor('VERIFY_SSL'), herdar('verify_ssl', True)),
+            timeout=float(valor('TIMEOUT', herdar('timeout', 30))),
+            max_concorrencia=int(valor('MAX_CONCORRENCIA', herdar('max_concorrencia', 4))),
+            clientes_aquecidos=int(valor('CLIENTES_AQUECIDOS', herdar('clientes_aquecidos', 1))),
+            espera_fila=float(valor('ESPERA_FILA', herdar('espera_fila', 5))),
+            fila_maxima=int(fila_maxima) if fila_maxima is not None else None,
+            latencia_alvo=float(valor('LATENCIA_ALVO', herdar('latencia_alvo', 5))),
+            circuito_taxa_falhas=float(valor('CIRCUITO_TAXA_FALHAS', herdar('circuito_taxa_falhas', 0.5))),
+            circuito_tempo_aberto=float(valor('CIRCUITO_TEMPO_ABERTO', herdar('circuito_tempo_aberto', 30))),
+            caminho_rapido=_env_bool(valor('CAMINHO_RAPIDO'), herdar('caminho_rapido', False)),
+        )
+
+    @property
+    def completa(self):
+        return all([self.wsdl_url, self.usuario, self.senha])
+
+
+class PoolClientes:
+    """
+    Pool de clientes SOAP de um endpoint, com WSDL parseado uma única vez
+
+    As chamadas passam por um circuit breaker e por um limitador de
+    concorrência adaptativo, para que um tribunal lento não prenda todos os
+    workers da aplicação.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._livres = queue.LifoQueue()
+        self.limitador = LimitadorAdaptativo(config.nome, config.max_concorrencia,
+                                             latencia_alvo=config.latencia_alvo,
+                                             espera_fila=config.espera_fila,
+                                             fila_maxima=config.fila_maxima)
+        # Chamadas mais lentas que o dobro da latência alvo contam como falha
+        self.circuito = CircuitBreaker(config.nome,
+                                       taxa_falhas=config.circuito_taxa_falhas,
+                                       latencia_lenta=config.latencia_alvo * 2,
+                                       tempo_aberto=config.circuito_tempo_aberto)
+        self._lock_wsdl = threading.Lock()
+        self._documento_wsdl = None
+        self._total_clientes = 0
+
+    def _criar_cliente(self):
+        """Cria um cliente; o primeiro baixa e parseia o WSDL, os demais o reaproveitam"""
+        # zeep/lxml/requests só são importados quando o primeiro cliente é criado
+        from soap_service import SOAPService
+
+        config = self.config
+        with self._lock_wsdl:
+            documento_wsdl = self._documento_wsdl
+            if documento_wsdl is None:
+                cliente = SOAPService(config.wsdl_url, config.usuario, config.senha,
+                                      verify_ssl=config.verify_ssl,
+                                      servidor_base=config.servidor_base,
+                                      timeout=config.timeout,
+                                      caminho_rapido=config.caminho_rapido)
+                self._documento_wsdl = cliente.client.wsdl
+                self._total_clientes += 1
+                return cliente
+
+        cliente = SOAPService(config.wsdl_url, config.usuario, config.senha,
+                              verify_ssl=config.verify_ssl,
+                              servidor_base=config.servidor_base,
+                              timeout=config.timeout,
+                              wsdl_documento=documento_wsdl,
+                              caminho_rapido=config.caminho_rapido)
+        with self._lock_wsdl:
+            self._total_clientes += 1
+        return cliente
+
+    def aquecer(self, quantidade=None):
+        """Cria antecipadamente clientes até o número configurado"""
+        quantidade = self.config.clientes_aquecidos if quantidade is None else quantidade
+        quantidade = min(quantidade, self.config.max_concorrencia)
+        while self._livres.qsize() < quantidade:
+            self._livres.put(self._criar_cliente())
+        logger.info(f"Endpoint {self.config.nome}: {self._livres.qsize()} cliente(s) aquecido(s)")
+
+    def tentar_aquecer(self):
+        """
+        Aquece sem levantar exceção
+
+        Se o endpoint estiver inacessível o circuito é aberto: as chamadas
+        falham rápido e o endpoint sai da prontidão até aquecer.
+
+        Returns:
+            bool: True se aqueceu
+        """
+        try:
+            self.aquecer()
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao aquecer o endpoint {self.config.nome}: {str(e)}")
+            self.circuito.abrir()
+            return False
+
+    def reiniciar_conexoes(self):
+        """Fecha as conexões HTTP dos clientes livres; novas são abertas sob demanda"""
+        for cliente in list(self._livres.queue):
+            cliente.fechar_conexoes()
+
+    @property
+    def aquecido(self):
+        return self._documento_wsdl is not None
+
+    def estado(self):
+        """Resumo do estado do endpoint (circuito e concorrência)"""
+        return {'circuito': self.circuito.estado, 'aquecido': self.aquecido,
+                **self.limitador.estado()}
+
+    @contextmanager
+    def cliente(self, prazo=None):
+        """
+        Empresta um cliente do pool respeitando circuito e limite de concorrência
+
+        Args:
+            prazo: Para chamadas em lote, instante (time.monotonic()) até o qual
+                esperar por vaga em vez de desistir após espera_fila
+
+        Raises:
+            CircuitoAberto: Se o circuito do endpoint estiver aberto
+            SobrecargaEndpoint: Se não houver vaga em espera_fila segundos
+        """
+        self.circuito.permitir()
+        try:
+            self.limitador.adquirir(prazo)
+        except Exception:
+            # A chamada não chegou ao tribunal; não conta para o circuito
+            self.circuito.cancelar()
+            raise
+
+        sucesso = False
+        inicio = time.monotonic()
+        try:
+            # O limitador garante que nunca há mais clientes em uso que o limite
+            try:
+                cliente = self._livres.get_nowait()
+            except queue.Empty:
+                cliente = self._criar_cliente()
+            try:
+                yield cliente
+                sucesso = True
+            except Exception as e:
+                # Só falhas de transporte contam contra o endpoint; Fault (ex:
+                # processo inexistente) e erros do próprio chamador, não
+                sucesso = not falha_de_transporte(e)
+                raise
+            finally:
+                self._livres.put(cliente)
+        finally:
+            latencia = time.monotonic() - inicio
+            self.limitador.liberar(sucesso, latencia)
+            self.circuito.registrar(sucesso, latencia)
+
+
+class Roteador:
+    """Direciona cada processo ao endpoint do seu tribunal (segmento J.TR do CNJ)"""
+
+    def __init__(self, endpoints, padrao=None):
+        """
+        Args:
+            endpoints: Dicionário segmento 'J.TR' -> ConfiguracaoEndpoint
+            padrao: Configuração usada para segmentos não mapeados (opcional)
+        """
+        self.pools = {segmento: PoolClientes(config) for segmento, config in endpoints.items()}
+        self.pool_padrao = PoolClientes(padrao) if padrao else None
+
+    @classmethod
+    def de_ambiente(cls):
+        """
+        Monta o roteador a partir das variáveis de ambiente
+
+        SOAP_* define o endpoint padrão. SOAP_TRIBUNAIS lista segmentos J.TR
+        (ex: '8.27,4.01'), cada um configurado por SOAP_TRIBUNAL_<J>_<TR>_*.
+        """
+        padrao = ConfiguracaoEndpoint.de_ambiente('padrao', 'SOAP_')
+        if not padrao.completa:
+            padrao = None
+
+        endpoints = {}
+        for segmento in filter(None, (s.strip() for s in os.getenv('SOAP_TRIBUNAIS', '').split(','))):
+            prefixo = 'SOAP_TRIBUNAL_' + segmento.replace('.', '_') + '_'
+            config = ConfiguracaoEndpoint.de_ambiente(segmento, prefixo, padrao)
+            if not config.completa:
+                raise ValueError(f'Configuração incompleta para o tribunal {segmento} ({prefixo}*)')
+            endpoints[segmento] = config
+
+        if not endpoints and not padrao:
+            raise ValueError("Configurações SOAP não encontradas. Configure as variáveis de ambiente.")
+
+        return cls(endpoints, padrao)
+
+    def pool_para(self, numero_processo):
+        """Retorna o pool do tribunal do processo"""
+        segmento = segmento_tribunal(numero_processo)
+        pool = self.pools.get(segmento, self.pool_padrao)
+        if pool is None:
+            raise ValueError(f'Tribunal {segmento} não configurado')
+        return pool
+
+    def cliente(self, numero_processo, prazo=None):
+        """Context manager que empresta um cliente do tribunal do processo"""
+        return self.pool_para(numero_processo).cliente(prazo)
+
+    def todos_pools(self):
+        pools = list(self.pools.values())
+        if self.pool_padrao:
+            pools.append(self.pool_padrao)
+        return pools
+
+    def aquecer(self):
+        """
+        Aquece cada endpoint independentemente (um tribunal fora do ar não impede os demais)
+
+        Returns:
+            list: Pools que não aqueceram (ver pendentes() para tentar de novo)
+        """
+        return [pool for pool in self.todos_pools() if not pool.tentar_aquecer()]
+
+    def pendentes(self):
+        """Pools ainda sem o WSDL parseado"""
+        return [pool for pool in self.todos_pools() if not pool.aquecido]
+
+    @property
+    def pronto(self):
+        """
+        True quando o endpoint padrão e os tribunais com circuito não aberto estão aquecidos
+
+        Um tribunal inacessível (circuito aberto) não tira a instância do ar:
+        os processos dele falham rápido enquanto os demais são atendidos.
+        """
+        exigidos = [pool for pool in self.pools.values() if pool.circuito.estado != CircuitBreaker.ABERTO]
+        if self.pool_padrao:
+            exigidos.append(self.pool_padrao)
+        return (all(pool.aquecido for pool in exigidos)
+                and any(pool.aquecido for pool in self.todos_pools()))
+
+    def estado(self):
+        """Estado de cada endpoint, por nome"""
+        return {pool.config.nome: pool.estado() for pool in self.todos_pools()}
+
+    def reiniciar_conexoes(self):
+        """Fecha as conexões HTTP abertas (ex: após fork do worker)"""
+        for pool in self.todos_pools():
+            pool.reiniciar_conexoes()
+
+    def executar_em_paralelo(self, numeros_processo, funcao, prazo=60):
+        """
+        Executa funcao(soap_service, numero_processo) para vários processos
+
+        As chamadas são distribuídas entre os tribunais em paralelo; o limite
+        de concorrência de cada endpoint continua valendo. Quando o limite de
+        um tribunal lento cai (AIMD), as chamadas excedentes esperam a vez até
+        o prazo em vez de serem descartadas por sobrecarga.
+
+        Args:
+            numeros_processo: Números a processar
+            funcao: Chamada com (soap_service, numero_processo)
+            prazo: Segundos, a partir de agora, para obter vaga em cada endpoint
+
+        Returns:
+            dict: numero_processo -> (resultado, erro)
+        """
+        limite = time.monotonic() + prazo
+
+        def executar(numero_processo):
+            try:
+                with self.cliente(numero_processo, prazo=limite) as soap_service:
+                    return numero_processo, funcao(soap_service, numero_processo), None
+            except Exception as e:
+                logger.error(f"Erro ao processar {numero_processo}: {str(e)}")
+                return numero_processo, None, e
+
+        max_workers = sum(pool.config.max_concorrencia for pool in self.todos_pools()) or 1
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(numeros_processo) or 1)) as executor:
+            # Cada tarefa leva o contexto da requisição (X-Request-ID, tempos)
+            futuros = [executor.submit(contextvars.copy_context().run, executar, numero)
+                       for numero in numeros_processo]
+            return {numero: (resultado, erro)
+                    for numero, resultado, erro in (futuro.result() for futuro in futuros)}
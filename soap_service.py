@@ -1,22 +1,28 @@
 import os
 import tempfile
 import re
+import base64
+from io import BytesIO
+from xml.sax.saxutils import escape
 from zeep import Client, Settings
+from zeep.exceptions import Fault, TransportError
 from zeep.transports import Transport
 from requests import Session
 from lxml import etree
 import logging
+import time
 import urllib3
 
-# Configurar logging para debug
-logging.basicConfig(level=logging.INFO)
+from log_estruturado import medir
+
 logger = logging.getLogger(__name__)
 
 
 class SOAPService:
     """Serviço para realizar consultas SOAP ao MNI (Modelo Nacional de Interoperabilidade)"""
     
-    def __init__(self, wsdl_url, usuario, senha, verify_ssl=True, servidor_base=None):
+    def __init__(self, wsdl_url, usuario, senha, verify_ssl=True, servidor_base=None,
+                 timeout=30, wsdl_documento=None, caminho_rapido=False):
         """
         Inicializa o serviço SOAP
         
@@ -26,12 +32,18 @@ class SOAPService:
             senha: Senha para autenticação
             verify_ssl: Verificar certificado SSL (padrão: True)
             servidor_base: URL base do servidor (ex: https://eproc-1g-to.dev.br)
+            timeout: Timeout das requisições HTTP em segundos (padrão: 30)
+            wsdl_documento: WSDL já parseado (zeep Document) compartilhado entre
+                clientes do mesmo endpoint; evita baixar e parsear o WSDL de novo
+            caminho_rapido: Usar MotorRapidoMNI (sem zeep) em consultarProcesso e
+                consultarDocumentosProcesso, com o zeep como fallback
         """
         self.wsdl_url = wsdl_url
         self.usuario = usuario
         self.senha = senha
         self.verify_ssl = verify_ssl
         self.servidor_base = servidor_base
+        self.timeout = timeout
         
         # Desabilitar warnings de SSL se verify_ssl for False
         if not verify_ssl:
@@ -43,28 +55,55 @@ class SOAPService:
         session.verify = verify_ssl  # Verificar certificado SSL
         
         # Se servidor_base foi fornecido, baixar e corrigir WSDL
-        if servidor_base:
-            wsdl_url = self._preparar_wsdl(wsdl_url, servidor_base, session)
+        wsdl_temporario = None
+        if servidor_base and wsdl_documento is None:
+            wsdl_url = wsdl_temporario = self._preparar_wsdl(wsdl_url, servidor_base, session)
         
         # Configurar transport e settings do Zeep
-        transport = Transport(session=session, timeout=30)
+        transport = Transport(session=session, timeout=timeout)
         settings = Settings(strict=False, xml_huge_tree=True, raw_response=False)
         
-        # Criar plugin para capturar requisições/respostas
-        from zeep.plugins import HistoryPlugin
-        history = HistoryPlugin()
-        
-        # Criar cliente SOAP
+        # Criar cliente SOAP (XML bruto para debug: consultar_processo_raw_xml)
         try:
-            self.client = Client(wsdl_url, transport=transport, settings=settings, plugins=[history])
-            self.history = history
-            logger.info(f"Cliente SOAP inicializado com sucesso: {wsdl_url}")
+            self.client = Client(wsdl_documento or wsdl_url, transport=transport, settings=settings)
+            logger.info(f"Cliente SOAP inicializado com sucesso: {self.wsdl_url}")
             
             # Descobrir operações disponíveis
             self._descobrir_operacoes()
         except Exception as e:
             logger.error(f"Erro ao inicializar cliente SOAP: {str(e)}")
             raise
+        finally:
+            # O zeep lê o WSDL na criação do cliente; o arquivo corrigido não é mais usado
+            if wsdl_temporario:
+                os.remove(wsdl_temporario)
+        
+        # Caminho rápido: mesma sessão HTTP, endereço e schema do serviço definido no WSDL
+        self.motor_rapido = None
+        if caminho_rapido:
+            endereco = self._endereco_servico()
+            self.motor_rapido = MotorRapidoMNI(session, endereco, usuario, senha, self.client.wsdl.types,
+                                               timeout=timeout)
+            logger.info(f"Caminho rápido habilitado: {endereco}")
+    
+    def _endereco_servico(self):
+        """
+        Endereço (soap:address) da porta usada pelo cliente
+        
+        Como client.service, usa o primeiro serviço e a primeira porta do WSDL.
+        """
+        servico = next(iter(self.client.wsdl.services.values()))
+        porta = next(iter(servico.ports.values()))
+        return porta.binding_options['address']
+    
+    def fechar_conexoes(self):
+        """
+        Fecha as conexões HTTP do cliente
+        
+        A sessão continua utilizável e abre novas conexões sob demanda; usado
+        após o fork dos workers para não compartilhar sockets com o processo pai.
+        """
+        self.client.transport.session.close()
     
     def _preparar_wsdl(self, wsdl_url, servidor_base, session):
         """
@@ -85,7 +124,7 @@ class SOAPService:
         logger.info(f"Baixando e corrigindo WSDL de: {wsdl_url}")
         
         # Baixar WSDL
-        response = session.get(wsdl_url, timeout=30)
+        response = session.get(wsdl_url, timeout=self.timeout)
         response.raise_for_status()
         
         wsdl_content = response.text
@@ -260,35 +299,40 @@ class SOAPService:
             if parametros:
                 requisicao['parametros'] = parametros
             
-            # Log da requisição
-            logger.info(f"Consultando processo: {numero_processo}")
-            
-            # Descobrir nome correto da operação
-            operation_name = self._get_operation_name('consultarprocesso')
-            logger.info(f"Usando operação: {operation_name}")
-            
-            # Realizar chamada SOAP
-            service_method = getattr(self.client.service, operation_name)
-            response = service_method(**requisicao)
+            inicio = time.perf_counter()
+            with medir('mni'):
+                # Caminho rápido (sem zeep) quando não há parâmetros extras
+                recebida = None
+                if self.motor_rapido and not parametros:
+                    try:
+                        resultado = self.motor_rapido.consultar_processo(
+                            numero_processo, data_inicial=data_inicial, data_final=data_final,
+                            incluir_cabecalho=incluir_cabecalho, incluir_partes=incluir_partes,
+                            incluir_enderecos=incluir_enderecos, incluir_movimentos=incluir_movimentos,
+                            incluir_documentos=incluir_documentos)
+                        self._registrar_consulta('consultarProcesso', numero_processo, inicio, 'rapido')
+                        return resultado
+                    except CaminhoRapidoIndisponivel as e:
+                        logger.warning(f"Caminho rápido indisponível, usando zeep: {str(e)}")
+                        recebida = e.resposta
+                
+                # Descobrir nome correto da operação
+                operation_name = self._get_operation_name('consultarprocesso')
+                
+                # Realizar chamada SOAP (ou só interpretar a resposta que o caminho rápido já recebeu)
+                if recebida is not None:
+                    response = self._interpretar_com_zeep(operation_name, recebida)
+                else:
+                    service_method = getattr(self.client.service, operation_name)
+                    response = service_method(**requisicao)
+                resultado = self._parse_response(response)
             
-            logger.info("Consulta realizada com sucesso")
-            return self._parse_response(response)
+            self._registrar_consulta(operation_name, numero_processo, inicio, 'zeep')
+            return resultado
             
         except Exception as e:
-            logger.error(f"Erro ao consultar processo: {str(e)}")
-            
-            # Tentar capturar resposta bruta para debug
-            if hasattr(self, 'history') and self.history.last_received:
-                try:
-                    response_content = self.history.last_received['http_headers'].get('content', b'')
-                    if not response_content and 'envelope' in self.history.last_received:
-                        response_content = etree.tostring(self.history.last_received['envelope'], encoding='unicode')
-                    
-                    logger.error(f"Resposta recebida (primeiros 500 caracteres):")
-                    logger.error(response_content[:500] if isinstance(response_content, str) else response_content.decode('utf-8', errors='ignore')[:500])
-                except:
-                    pass
-            
+            # Só a mensagem: o envelope de resposta pode trazer dados do processo
+            logger.error(f"Erro ao consultar processo {numero_processo}: {str(e)}")
             raise
     
     def consultar_documentos_processo(self, numero_processo, ids_documentos, parametros=None):
@@ -327,28 +371,61 @@ class SOAPService:
             if parametros:
                 requisicao['parametros'] = parametros
             
-            # Log da requisição
-            logger.info(f"Consultando documentos do processo: {numero_processo}")
-            logger.info(f"IDs dos documentos: {ids_documentos}")
-            
-            # Descobrir nome correto da operação
-            operation_name = self._get_operation_name('consultardocumentosprocesso')
-            logger.info(f"Usando operação: {operation_name}")
-            
-            # Realizar chamada SOAP
-            service_method = getattr(self.client.service, operation_name)
-            response = service_method(**requisicao)
-            
-            logger.info("Documentos consultados com sucesso")
+            inicio = time.perf_counter()
+            with medir('mni'):
+                # Caminho rápido (sem zeep) quando não há parâmetros extras
+                recebida = None
+                if self.motor_rapido and not parametros:
+                    try:
+                        resultado = self.motor_rapido.consultar_documentos_processo(numero_processo, ids_documentos)
+                        self._registrar_consulta('consultarDocumentosProcesso', numero_processo, inicio,
+                                                 'rapido', documentos=len(ids_documentos))
+                        return resultado
+                    except CaminhoRapidoIndisponivel as e:
+                        logger.warning(f"Caminho rápido indisponível, usando zeep: {str(e)}")
+                        recebida = e.resposta
+                
+                # Descobrir nome correto da operação
+                operation_name = self._get_operation_name('consultardocumentosprocesso')
+                
+                # Realizar chamada SOAP (ou só interpretar a resposta que o caminho rápido já recebeu)
+                if recebida is not None:
+                    response = self._interpretar_com_zeep(operation_name, recebida)
+                else:
+                    service_method = getattr(self.client.service, operation_name)
+                    response = service_method(**requisicao)
+                
+                # Processar resposta e extrair documentos
+                resultado = self._parse_documentos_response(response)
             
-            # Processar resposta e extrair documentos
-            return self._parse_documentos_response(response)
+            self._registrar_consulta(operation_name, numero_processo, inicio, 'zeep',
+                                     documentos=len(ids_documentos))
+            return resultado
             
         except Exception as e:
-            logger.error(f"Erro ao consultar documentos: {str(e)}")
+            logger.error(f"Erro ao consultar documentos do processo {numero_processo}: {str(e)}")
             raise
     
-    def _parse_documentos_response(self, response):
+    def _interpretar_com_zeep(self, operation_name, resposta):
+        """
+        Interpreta pelo zeep uma resposta HTTP já recebida, sem reenviar a chamada
+        
+        Mesmo processamento de client.service (Fault, MTOM, schema), a partir
+        do binding da porta usada pelo cliente.
+        """
+        binding = self.client.service._binding
+        return binding.process_reply(self.client, binding.get(operation_name), resposta)
+    
+    @staticmethod
+    def _registrar_consulta(operacao, numero_processo, inicio, caminho, **campos):
+        """Evento estruturado da chamada ao MNI (sem IDs nem conteúdo dos documentos)"""
+        duracao_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        logger.info(f"{operacao} {numero_processo}: {duracao_ms:.0f}ms ({caminho})", extra={
+            'evento': 'mni', 'operacao': operacao, 'numero_processo': numero_processo,
+            'caminho': caminho, 'duracao_ms': duracao_ms, **campos})
+    
+    @staticmethod
+    def _parse_documentos_response(response):
         """
         Processa a resposta de consulta de documentos e extrai anexos
         
@@ -452,10 +529,11 @@ class SOAPService:
         # Criar novo cliente com plugin de histórico
         session = Session()
         session.verify = self.verify_ssl
-        transport = Transport(session=session, timeout=30)
+        transport = Transport(session=session, timeout=self.timeout)
         settings = Settings(strict=False, xml_huge_tree=True)
         
-        client = Client(self.wsdl_url, transport=transport, 
+        # Reaproveitar o WSDL já parseado (e corrigido) pelo cliente principal
+        client = Client(self.client.wsdl, transport=transport, 
                        settings=settings, plugins=[history])
         
         # Preparar e executar requisição
@@ -520,4 +598,386 @@ class SOAPService:
                                                  encoding='unicode', pretty_print=True),
                     'error': str(e)
                 }
-            raise
\ No newline at end of file
+            raise
+        finally:
+            # Cliente descartável: fechar as conexões da sessão própria
+            session.close()
+
+
+# Namespaces do MNI 3.0
+NS_SOAP = 'http://schemas.xmlsoap.org/soap/envelope/'
+NS_V300 = 'http://www.cnj.jus.br/mni/v300/'
+NS_TIPOS = 'http://www.cnj.jus.br/mni/v300/tipos-servico-intercomunicacao'
+NS_INTERCOMUNICACAO = 'http://www.cnj.jus.br/mni/v300/intercomunicacao'
+NS_XOP = 'http://www.w3.org/2004/08/xop/include'
+NS_XSI = 'http://www.w3.org/2001/XMLSchema-instance'
+XSI_TYPE = f'{{{NS_XSI}}}type'
+
+
+class CaminhoRapidoIndisponivel(Exception):
+    """
+    A resposta não pode ser tratada pelo caminho rápido; usar o zeep
+    
+    resposta: resposta HTTP já recebida, quando a falha foi depois do envio;
+    o zeep a interpreta sem reenviar a chamada
+    """
+    
+    def __init__(self, mensagem, resposta=None):
+        super().__init__(mensagem)
+        self.resposta = resposta
+
+
+def _valor_simples(conversor, texto):
+    """Converte o texto pelo tipo simples do schema, como o zeep (erro de conversão vira None)"""
+    if texto is None or conversor is None:
+        return texto
+    try:
+        return conversor(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+class _PlanoTipo:
+    """
+    Campos de um tipo complexo do schema, pré-calculados para a leitura
+    
+    campos: (nome, é lista) na ordem do serialize_object (elementos, depois atributos)
+    elementos: nome local do elemento -> (nome, é lista, plano do tipo filho, conversor)
+    atributos: (nome, atributo no lxml, conversor)
+    simples/conteudo: tipo simpleContent e conversor do texto (campo _value_1)
+    """
+    
+    __slots__ = ('campos', 'elementos', 'atributos', 'simples', 'conteudo', 'vazio', 'nao_suportado')
+    
+    def __init__(self):
+        self.campos = ()
+        self.elementos = {}
+        self.atributos = ()
+        self.simples = False
+        self.conteudo = None
+        self.vazio = False
+        self.nao_suportado = None
+
+
+class MotorRapidoMNI:
+    """
+    Caminho rápido (sem zeep) para consultarProcesso e consultarDocumentosProcesso
+    
+    Os envelopes são montados a partir de templates pré-compilados (o mesmo
+    envelope fixo de test_requisicao.py) e as respostas são lidas direto com
+    lxml. A leitura segue um plano pré-calculado do schema do WSDL (o mesmo
+    do zeep): valores convertidos pelo tipo XSD (int, bool, Decimal, datas),
+    listas para maxOccurs > 1 e campos ausentes presentes como None ou [],
+    exatamente como serialize_object. Respostas que ele não trata (MTOM/XOP,
+    xsi:type, elementos fora do schema, xs:any) levantam
+    CaminhoRapidoIndisponivel para que o SOAPService use o zeep.
+    """
+    
+    _ENVELOPE = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<soapenv:Envelope xmlns:soapenv="{NS_SOAP}" xmlns:v300="{NS_V300}" '
+        f'xmlns:tip="{NS_TIPOS}" xmlns:int="{NS_INTERCOMUNICACAO}">'
+        '<soapenv:Header/><soapenv:Body>{corpo}</soapenv:Body></soapenv:Envelope>'
+    )
+    
+    _CONSULTANTE = (
+        '<tip:consultante><int:autenticacaoSimples>'
+        '<int:usuario>{usuario}</int:usuario><int:senha>{senha}</int:senha>'
+        '</int:autenticacaoSimples></tip:consultante>'
+    )
+    
+    def __init__(self, session, endereco, usuario, senha, esquema, timeout=30):
+        """
+        Args:
+            session: Sessão HTTP (requests) compartilhada com o cliente zeep
+            endereco: URL do serviço (soap:address do WSDL)
+            usuario: Usuário para autenticação
+            senha: Senha para autenticação
+            esquema: Schema do WSDL (client.wsdl.types do zeep)
+            timeout: Timeout das requisições em segundos
+        """
+        self.session = session
+        self.endereco = endereco
+        self.esquema = esquema
+        self.timeout = timeout
+        
+        # Partes fixas do envelope pré-codificadas; só o corpo varia por chamada
+        prefixo, sufixo = self._ENVELOPE.split('{corpo}')
+        self._prefixo = prefixo.encode('utf-8')
+        self._sufixo = sufixo.encode('utf-8')
+        self._consultante = self._CONSULTANTE.format(usuario=escape(usuario), senha=escape(senha))
+        self._parser = etree.XMLParser(huge_tree=True, resolve_entities=False, no_network=True)
+        
+        # Planos por elemento de resposta e por tipo (criados no primeiro uso)
+        self._planos_resposta = {}
+        self._planos_tipo = {}
+    
+    def _plano_resposta(self, tag):
+        """Plano do elemento de resposta (ex: respostaConsultarProcesso)"""
+        plano = self._planos_resposta.get(tag)
+        if plano is None:
+            try:
+                elemento = self.esquema.get_element(tag)
+            except Exception as e:
+                raise CaminhoRapidoIndisponivel(f'elemento de resposta fora do schema: {tag} ({str(e)})')
+            plano = self._planos_resposta[tag] = self._plano_tipo(elemento.type)
+        return plano
+    
+    def _plano_tipo(self, tipo):
+        """Monta (uma vez por tipo, inclusive recursivo) o plano de leitura de um tipo complexo"""
+        from zeep.xsd import ComplexType, Element
+        from zeep.xsd.types.builtins import String
+        from zeep.xsd.types.simple import AnySimpleType
+        
+        plano = self._planos_tipo.get(id(tipo))
+        if plano is not None:
+            return plano
+        plano = self._planos_tipo[id(tipo)] = _PlanoTipo()
+        
+        def conversor(tipo_simples):
+            # String não converte nada: evita a chamada por valor
+            return None if isinstance(tipo_simples, String) else tipo_simples.pythonvalue
+        
+        elementos = list(tipo.elements)
+        atributos = list(tipo.attributes)
+        plano.vazio = not elementos and not atributos
+        
+        campos = []
+        aninhados = list(tipo.elements_nested)
+        if (len(aninhados) == 1 and isinstance(aninhados[0][1], Element)
+                and isinstance(aninhados[0][1].type, AnySimpleType)):
+            # simpleContent: o texto do elemento vai para _value_1
+            campos.append((aninhados[0][0], False))
+            plano.simples = True
+            plano.conteudo = conversor(aninhados[0][1].type)
+        else:
+            for nome, elemento in elementos:
+                if not isinstance(elemento, Element):
+                    plano.nao_suportado = f'{type(elemento).__name__} em {tipo.name}'
+                    continue
+                lista = elemento.accepts_multiple
+                campos.append((nome, lista))
+                if isinstance(elemento.type, ComplexType):
+                    filho = (nome, lista, self._plano_tipo(elemento.type), None)
+                elif isinstance(elemento.type, AnySimpleType):
+                    filho = (nome, lista, None, conversor(elemento.type))
+                else:
+                    plano.nao_suportado = f'elemento {nome} sem tipo em {tipo.name}'
+                    continue
+                plano.elementos[etree.QName(elemento.qname).localname] = filho
+        
+        lidos = []
+        for nome, atributo in atributos:
+            if not atributo.name:
+                plano.nao_suportado = f'xs:anyAttribute em {tipo.name}'
+                continue
+            campos.append((nome, False))
+            lidos.append((nome, atributo.qname.text, conversor(atributo.type)))
+        
+        plano.campos = tuple(campos)
+        plano.atributos = tuple(lidos)
+        return plano
+    
+    def _converter(self, elemento, plano):
+        """Converte um elemento complexo em dicionário, como serialize_object do zeep"""
+        atributos = elemento.attrib
+        if XSI_TYPE in atributos:
+            raise CaminhoRapidoIndisponivel('xsi:type na resposta')
+        if plano.vazio:
+            return None
+        if plano.nao_suportado:
+            raise CaminhoRapidoIndisponivel(plano.nao_suportado)
+        
+        resultado = {nome: [] if lista else None for nome, lista in plano.campos}
+        if plano.simples:
+            resultado[plano.campos[0][0]] = _valor_simples(plano.conteudo, elemento.text)
+        else:
+            filhos = 0
+            for filho in elemento:
+                tag = filho.tag
+                if not isinstance(tag, str):
+                    continue  # comentários
+                filhos += 1
+                campo = plano.elementos.get(tag.rpartition('}')[2])
+                if campo is None:
+                    raise CaminhoRapidoIndisponivel(f'elemento fora do schema: {tag}')
+                nome, lista, plano_filho, conversor = campo
+                if plano_filho is not None:
+                    valor = self._converter(filho, plano_filho)
+                else:
+                    valor = _valor_simples(conversor, filho.text)
+                if lista:
+                    resultado[nome].append(valor)
+                else:
+                    resultado[nome] = valor
+            # Elemento sem filhos nem atributos: o zeep devolve None
+            if not filhos and not atributos:
+                return None
+        
+        for nome, chave, conversor in plano.atributos:
+            valor = atributos.get(chave)
+            if valor is not None:
+                resultado[nome] = _valor_simples(conversor, valor)
+        return resultado
+    
+    def _montar_envelope(self, operacao, campos):
+        """Monta o envelope: campos é uma lista (nome, valor) na ordem do schema"""
+        corpo = [f'<v300:{operacao}>', self._consultante]
+        for nome, valor in campos:
+            if isinstance(valor, bool):
+                valor = 'true' if valor else 'false'
+            corpo.append(f'<tip:{nome}>{escape(str(valor))}</tip:{nome}>')
+        corpo.append(f'</v300:{operacao}>')
+        return self._prefixo + ''.join(corpo).encode('utf-8') + self._sufixo
+    
+    def _enviar(self, envelope):
+        """Envia o envelope e retorna a resposta HTTP"""
+        resposta = self.session.post(
+            self.endereco,
+            data=envelope,
+            headers={'Content-Type': 'text/xml; charset=utf-8', 'SOAPAction': '""'},
+            timeout=self.timeout
+        )
+        
+        if 'multipart' in resposta.headers.get('Content-Type', '').lower():
+            raise CaminhoRapidoIndisponivel('resposta MTOM/multipart', resposta)
+        
+        if resposta.status_code >= 400 and b'Fault' not in resposta.content:
+            raise TransportError(status_code=resposta.status_code, content=resposta.content)
+        
+        return resposta
+    
+    @staticmethod
+    def _interpretar_recebida(interpretar, resposta):
+        """Interpreta a resposta; se não der, a anexa à exceção para o fallback não reenviar"""
+        try:
+            return interpretar(resposta.content)
+        except CaminhoRapidoIndisponivel as e:
+            e.resposta = resposta
+            raise
+    
+    @staticmethod
+    def _verificar_fault(elemento):
+        """Levanta zeep Fault, como o caminho zeep, se o elemento for um SOAP Fault"""
+        if etree.QName(elemento).localname == 'Fault':
+            mensagem = elemento.findtext('faultstring') or elemento.findtext('{*}faultstring')
+            codigo = elemento.findtext('faultcode') or elemento.findtext('{*}faultcode')
+            raise Fault(mensagem or 'SOAP Fault', codigo)
+    
+    def interpretar_processo(self, conteudo):
+        """
+        Interpreta o XML de resposta de consultarProcesso
+        
+        Returns:
+            dict: Mesma estrutura e tipos de serialize_object
+        """
+        try:
+            raiz = etree.fromstring(conteudo, self._parser)
+        except etree.XMLSyntaxError as e:
+            raise CaminhoRapidoIndisponivel(f'resposta não é XML: {str(e)}')
+        
+        corpo = raiz.find(f'{{{NS_SOAP}}}Body')
+        if corpo is None or not len(corpo):
+            raise CaminhoRapidoIndisponivel('envelope sem Body')
+        
+        resposta = corpo[0]
+        self._verificar_fault(resposta)
+        return self._converter(resposta, self._plano_resposta(resposta.tag))
+    
+    def interpretar_documentos(self, conteudo):
+        """
+        Interpreta o XML de resposta de consultarDocumentosProcesso via iterparse
+        
+        Cada documento é liberado da árvore assim que lido (com os irmãos já
+        processados), então o XML com os conteúdos em base64 nunca fica
+        inteiro em memória como árvore.
+        
+        Returns:
+            dict: Mesma estrutura de SOAPService._parse_documentos_response
+        """
+        documentos = []
+        recibo = None
+        plano = None
+        
+        try:
+            for evento, elemento in etree.iterparse(BytesIO(conteudo), events=('start', 'end'), huge_tree=True,
+                                                    resolve_entities=False, no_network=True):
+                if evento == 'start':
+                    # Elemento de resposta (primeiro filho do Body): define o plano de leitura
+                    if plano is None:
+                        pai = elemento.getparent()
+                        if pai is not None and pai.tag == f'{{{NS_SOAP}}}Body' and \
+                                etree.QName(elemento).localname != 'Fault':
+                            plano = self._plano_resposta(elemento.tag)
+                    continue
+                
+                nome = etree.QName(elemento).localname
+                
+                if nome == 'Fault':
+                    self._verificar_fault(elemento)
+                
+                elif nome == 'recibo' and plano is not None and 'recibo' in plano.elementos:
+                    _, _, plano_recibo, conversor = plano.elementos['recibo']
+                    recibo = (self._converter(elemento, plano_recibo) if plano_recibo is not None
+                              else _valor_simples(conversor, elemento.text))
+                
+                elif nome == 'documentos' and plano is not None and 'documentos' in plano.elementos:
+                    elemento_conteudo = elemento.find('{*}conteudo')
+                    conteudo_base64 = None
+                    if elemento_conteudo is not None:
+                        if elemento_conteudo.find(f'{{{NS_XOP}}}Include') is not None:
+                            raise CaminhoRapidoIndisponivel('conteúdo em anexo XOP')
+                        if elemento_conteudo.text:
+                            conteudo_base64 = ''.join(elemento_conteudo.text.split())
+                        # O conteúdo é decodificado uma vez só, abaixo
+                        elemento.remove(elemento_conteudo)
+                    
+                    documento = self._converter(elemento, plano.elementos['documentos'][2]) or {}
+                    documentos.append({
+                        'idDocumento': documento.get('idDocumento'),
+                        'mimetype': documento.get('mimetype'),
+                        'encoding': documento.get('encoding'),
+                        'hash': documento.get('hash'),
+                        'conteudo': base64.b64decode(conteudo_base64) if conteudo_base64 else None,
+                        'conteudo_base64': conteudo_base64
+                    })
+                    
+                    # Libera o documento e os irmãos anteriores (o iterparse mantém a árvore)
+                    elemento.clear()
+                    while elemento.getprevious() is not None:
+                        del elemento.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            raise CaminhoRapidoIndisponivel(f'resposta não é XML: {str(e)}')
+        
+        return {
+            'sucesso': True,
+            'recibo': recibo,
+            'documentos': documentos
+        }
+    
+    def consultar_processo(self, numero_processo, data_inicial=None, data_final=None,
+                           incluir_cabecalho=True, incluir_partes=False,
+                           incluir_enderecos=False, incluir_movimentos=True,
+                           incluir_documentos=True):
+        """Consulta o processo pelo caminho rápido (mesmos argumentos do SOAPService)"""
+        campos = [('numeroProcesso', numero_processo)]
+        if data_inicial:
+            campos.append(('dataInicial', data_inicial))
+        if data_final:
+            campos.append(('dataFinal', data_final))
+        campos += [
+            ('incluirCabecalho', incluir_cabecalho),
+            ('incluirPartes', incluir_partes),
+            ('incluirEnderecos', incluir_enderecos),
+            ('incluirMovimentos', incluir_movimentos),
+            ('incluirDocumentos', incluir_documentos),
+        ]
+        envelope = self._montar_envelope('requisicaoConsultarProcesso', campos)
+        return self._interpretar_recebida(self.interpretar_processo, self._enviar(envelope))
+    
+    def consultar_documentos_processo(self, numero_processo, ids_documentos):
+        """Consulta documentos pelo caminho rápido (mesmos argumentos do SOAPService)"""
+        campos = [('numeroProcesso', numero_processo)]
+        campos += [('idDocumento', id_documento) for id_documento in ids_documentos]
+        envelope = self._montar_envelope('requisicaoConsultarDocumentosProcesso', campos)
+        return self._interpretar_recebida(self.interpretar_documentos, self._enviar(envelope))
@@ -0,0 +1,26 @@
+from cache_fragmentos import CacheFragmentos
+
+
+def test_limite_por_tamanho_remove_os_menos_usados():
+    cache = CacheFragmentos(max_itens=100, max_bytes=1000)
+    for i in range(5):
+        cache.guardar(i, 'x' * 300)
+        cache.obter(0)  # mantém o primeiro como mais usado
+
+    assert cache.tamanho_bytes <= 1000
+    assert cache.obter(0) is not None
+    assert cache.obter(1) is None
+    assert cache.obter(4) is not None
+
+
+def test_fragmento_maior_que_o_limite_nao_e_guardado():
+    cache = CacheFragmentos(max_bytes=100)
+    assert cache.obter_ou_renderizar('json', lambda: 'y' * 500) == 'y' * 500
+    assert len(cache) == 0 and cache.tamanho_bytes == 0
+
+
+def test_substituir_chave_recontabiliza_tamanho():
+    cache = CacheFragmentos(max_bytes=1000)
+    cache.guardar('a', 'x' * 600)
+    cache.guardar('a', 'x' * 100)
+    assert cache.tamanho_bytes == 100
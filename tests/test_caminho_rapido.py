@@ -0,0 +1,95 @@
+import glob
+import os
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from conformidade_caminho_rapido import resultado_zeep, verificar
+from soap_service import CaminhoRapidoIndisponivel, MotorRapidoMNI, SOAPService
+
+# Respostas sintéticas, sanitizadas como as gravações reais, e o schema usado nelas
+GRAVACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gravacoes')
+WSDL = os.path.join(GRAVACOES, 'mni.wsdl')
+
+
+@pytest.fixture(scope='module')
+def servico():
+    return SOAPService(WSDL, 'usuario', 'senha', caminho_rapido=True)
+
+
+def _ler(nome):
+    with open(os.path.join(GRAVACOES, nome), 'rb') as f:
+        return f.read()
+
+
+def test_gravacoes_conformes_com_zeep():
+    assert len(glob.glob(os.path.join(GRAVACOES, '*.xml'))) >= 3
+    assert verificar(GRAVACOES, WSDL) == 0
+
+
+def test_processo_igual_ao_serialize_object(servico):
+    xml = _ler('00000011120248270001.processo.xml')
+
+    assert servico.motor_rapido.interpretar_processo(xml) == resultado_zeep(servico.client, 'consultarProcesso', xml)
+
+
+def test_tipos_do_schema_e_campos_ausentes(servico):
+    resultado = servico.motor_rapido.interpretar_processo(_ler('00000011120248270001.processo.xml'))
+    dados_basicos = resultado['processo']['dadosBasicos']
+    movimento = resultado['processo']['movimento'][1]
+
+    assert resultado['sucesso'] is True
+    assert dados_basicos['competencia'] == 3
+    assert dados_basicos['intervencaoMP'] is False
+    assert dados_basicos['valorCausa'] == Decimal('15000.50')
+    assert dados_basicos['polo'][1]['parte'][1] == {'pessoa': None, 'assistenciaJudiciaria': False}
+    assert movimento['movimentoNacional'] is None
+    assert movimento['movimentoLocal']['codigoMovimento'] == 1
+    assert movimento['idDocumentoVinculado'] == ['10010']
+    assert resultado['processo']['movimento'][-1]['complemento'] == []
+
+
+def test_documentos_iguais_ao_caminho_zeep(servico):
+    xml = _ler('00000011120248270001.documentos.xml')
+    resultado = servico.motor_rapido.interpretar_documentos(xml)
+
+    assert [{**doc, 'conteudo': None} for doc in resultado['documentos']] == \
+        resultado_zeep(servico.client, 'consultarDocumentosProcesso', xml)['documentos']
+    assert resultado['documentos'][1]['conteudo'].startswith(b'%PDF-1.4')
+    assert resultado['documentos'][2]['conteudo'] is None
+
+
+def test_elemento_fora_do_schema_volta_para_o_zeep(servico):
+    xml = _ler('00000021120248270001.processo.xml').replace(
+        b'</tip:mensagem>', b'</tip:mensagem><tip:novoCampo>x</tip:novoCampo>')
+
+    with pytest.raises(CaminhoRapidoIndisponivel):
+        servico.motor_rapido.interpretar_processo(xml)
+
+
+def test_endereco_vem_da_porta_do_wsdl(servico):
+    assert servico.motor_rapido.endereco == 'http://mni.exemplo.invalid/ws/controlador_ws.php?srv=intercomunicacao3.0'
+    assert isinstance(servico.motor_rapido, MotorRapidoMNI)
+
+
+def test_fallback_interpreta_resposta_recebida_sem_reenviar(servico, monkeypatch):
+    xml = _ler('00000021120248270001.processo.xml').replace(
+        b'</tip:mensagem>', b'</tip:mensagem><tip:novoCampo>x</tip:novoCampo>')
+    envios = []
+
+    def post(url, data=None, **kwargs):
+        envios.append(data)
+        return SimpleNamespace(status_code=200, headers={'Content-Type': 'text/xml; charset=utf-8'},
+                               content=xml, encoding='utf-8')
+
+    # A mesma sessão HTTP atende o caminho rápido e o zeep
+    monkeypatch.setattr(servico.motor_rapido.session, 'post', post)
+    resultado = servico.consultar_processo('00000021120248270001')
+
+    assert len(envios) == 1
+    esperado = resultado_zeep(servico.client, 'consultarProcesso', xml)
+    # Elemento fora do schema: o zeep o guarda em _raw_elements
+    assert resultado.pop('_raw_elements')[0].tag.endswith('novoCampo')
+    esperado.pop('_raw_elements')
+    assert resultado == esperado
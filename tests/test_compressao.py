@@ -0,0 +1,48 @@
+import io
+
+from flask import Flask, request, send_file
+
+from compressao import configurar_compressao
+
+
+def _app():
+    app = Flask(__name__)
+    configurar_compressao(app, tamanho_minimo=10)
+
+    @app.route('/pagina')
+    def pagina():
+        resposta = app.response_class('<p>' + 'x' * 100 + '</p>')
+        resposta.set_etag('v1')
+        return resposta.make_conditional(request)
+
+    @app.route('/documento')
+    def documento():
+        return send_file(io.BytesIO(b'%PDF-1.4 ' * 100), mimetype='application/pdf', etag='hash-mni')
+
+    return app
+
+
+def test_304_de_pagina_comprimida_usa_etag_fraco():
+    cliente = _app().test_client()
+
+    completa = cliente.get('/pagina', headers={'Accept-Encoding': 'gzip'})
+    assert completa.headers['Content-Encoding'] == 'gzip'
+    assert completa.headers['ETag'] == 'W/"v1"'
+
+    revalidada = cliente.get('/pagina', headers={'Accept-Encoding': 'gzip', 'If-None-Match': 'W/"v1"'})
+    assert revalidada.status_code == 304
+    assert revalidada.headers['ETag'] == 'W/"v1"'
+    assert 'Accept-Encoding' in revalidada.headers['Vary']
+
+
+def test_304_de_send_file_mantem_etag_forte_sem_vary():
+    cliente = _app().test_client()
+
+    completa = cliente.get('/documento', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in completa.headers
+    assert completa.headers['ETag'] == '"hash-mni"'
+
+    revalidada = cliente.get('/documento', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"hash-mni"'})
+    assert revalidada.status_code == 304
+    assert revalidada.headers['ETag'] == '"hash-mni"'
+    assert 'Vary' not in revalidada.headers
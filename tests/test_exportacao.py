@@ -0,0 +1,79 @@
+import csv
+import os
+
+import pytest
+
+from exportacao import ExportadorColunar, exportar_processos
+from modelo import Documento, Movimento, Parte, Processo
+
+
+def _processo(n):
+    """Processo com categorias que mudam de um processo para outro (dicionários diferentes por lote)"""
+    numero = f'{n:07d}1120248270001'
+    movimentos = [Movimento(str(n * 10 + i), '20250102030405', f'T{n}', f'Juntada {n}-{i % 2}', (f'd{n}',))
+                  for i in range(3)]
+    documentos = [Documento(f'd{n}', f'tipo{n}', '20250102', 'application/pdf', f'Doc {n}', hash=f'h{n}')]
+    partes = [Parte('AT' if n % 2 else 'PA', f'Parte {n}', str(n), 'fisica')]
+    return Processo(numero, f'classe{n}', '20250101', partes, movimentos, documentos)
+
+
+def _exportar(diretorio, formato, total=7):
+    # tamanho_lote pequeno: cada tabela é gravada em vários lotes
+    with ExportadorColunar(str(diretorio), formato, tamanho_lote=2) as exportador:
+        for n in range(total):
+            exportador.adicionar(_processo(n))
+        exportador.adicionar_erro('0' * 20, 'falhou')
+    return exportador
+
+
+@pytest.mark.parametrize('formato', ['parquet', 'arrow', 'csv'])
+def test_varios_lotes_ida_e_volta(tmp_path, formato):
+    pytest.importorskip('pyarrow')
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    exportador = _exportar(tmp_path, formato)
+    tabelas = {}
+    for caminho in exportador.arquivos:
+        nome = os.path.basename(caminho).split('.')[0]
+        if formato == 'parquet':
+            tabelas[nome] = pq.read_table(caminho).to_pylist()
+        elif formato == 'arrow':
+            with pa.ipc.open_file(caminho) as leitor:
+                tabelas[nome] = leitor.read_all().to_pylist()
+        else:
+            with open(caminho, newline='', encoding='utf-8') as f:
+                tabelas[nome] = list(csv.DictReader(f))
+
+    assert [p['classe_processual'] for p in tabelas['processos']] == [f'classe{n}' for n in range(7)]
+    assert len(tabelas['movimentos']) == 21
+    assert [m['tipo'] for m in tabelas['movimentos']][::3] == [f'T{n}' for n in range(7)]
+    assert [m['descricao'] for m in tabelas['movimentos']][:3] == ['Juntada 0-0', 'Juntada 0-1', 'Juntada 0-0']
+    assert [d['tipo_documento'] for d in tabelas['documentos']] == [f'tipo{n}' for n in range(7)]
+    assert [d['id_movimento'] for d in tabelas['documentos']][:2] == ['0', '10']
+    assert [p['polo'] for p in tabelas['partes']] == ['PA', 'AT'] * 3 + ['PA']
+    assert tabelas['erros'] == [{'numero_processo': '0' * 20, 'erro': 'falhou'}]
+
+
+def test_erro_ao_fechar_nao_esconde_excecao_original(tmp_path, monkeypatch):
+    exportador = ExportadorColunar(str(tmp_path), 'csv')
+
+    def fechar_com_erro():
+        raise OSError('disco cheio')
+
+    monkeypatch.setattr(exportador, 'fechar', fechar_com_erro)
+    with pytest.raises(RuntimeError, match='consulta'):
+        with exportador:
+            raise RuntimeError('consulta falhou')
+
+
+def test_prazo_esgotado_vai_para_erros(tmp_path):
+    class Roteador:
+        def executar_em_paralelo(self, numeros, funcao, prazo=60):
+            raise AssertionError('não deveria consultar após o prazo')
+
+    with ExportadorColunar(str(tmp_path), 'csv') as exportador:
+        exportar_processos(Roteador(), ['1' * 20, '2' * 20], exportador, prazo=0)
+
+    assert exportador.total_processos == 0
+    assert exportador.total_erros == 2
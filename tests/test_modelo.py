@@ -0,0 +1,82 @@
+import json
+from collections import OrderedDict
+
+from modelo import Processo, medir_memoria, versao_conteudo
+
+
+def _resposta(total_movimentos=30):
+    """Resposta no formato de serialize_object, como a do MNI simulado da carga"""
+    movimentos = [
+        OrderedDict([
+            ('movimentoLocal', OrderedDict([('codigoMovimento', str(i % 7)), ('descricao', f'Juntada {i % 5}')])),
+            ('idDocumentoVinculado', [str(1000 + i)]),
+            ('dataHora', f'202501{i % 28 + 1:02d}1200{i % 60:02d}'),
+            ('idMovimento', str(i)),
+            ('tipoMovimento', f'T{i % 3}'),
+        ])
+        for i in range(total_movimentos)
+    ]
+    documentos = [
+        OrderedDict([
+            ('outroParametro', [
+                OrderedDict([('nome', 'rotulo'), ('valor', f'Rótulo {i % 4}')]),
+                OrderedDict([('nome', 'tamanho'), ('valor', str(i * 100))]),
+            ]),
+            ('idDocumento', str(1000 + i)),
+            ('tipoDocumento', '5'),
+            ('dataHora', '20250101120000'),
+            ('mimetype', 'application/pdf'),
+            ('descricao', f'Doc {i}'),
+            ('hash', f'h{i}'),
+        ])
+        for i in range(total_movimentos)
+    ]
+    pessoa = OrderedDict([('nome', 'Fulano'), ('numeroDocumentoPrincipal', '123'), ('tipoPessoa', 'fisica')])
+    dados_basicos = OrderedDict([
+        ('polo', [OrderedDict([('parte', [OrderedDict([('pessoa', pessoa)])]), ('polo', 'AT')])]),
+        ('numero', '00000011120248270001'),
+        ('classeProcessual', '7'),
+        ('dataAjuizamento', '20250101120000'),
+    ])
+    return OrderedDict([
+        ('sucesso', True),
+        ('mensagem', 'ok'),
+        ('processo', OrderedDict([('dadosBasicos', dados_basicos), ('movimento', movimentos),
+                                  ('documento', documentos)])),
+    ])
+
+
+def test_modelo_ocupa_menos_de_um_terco_dos_dicionarios():
+    # Medição de referência (30 movimentos): 3.444 bytes por movimento nos
+    # dicionários contra 993 no modelo; o tamanho exato varia com a versão do Python
+    medicao = medir_memoria(_resposta())
+
+    assert medicao['movimentos'] == 30
+    assert medicao['bytes_por_movimento_modelo'] * 3 < medicao['bytes_por_movimento_dict']
+    assert medicao['reducao'] >= 0.65
+
+
+def test_conversao_normaliza_listas_e_rotulo():
+    processo = Processo.de_resposta(_resposta(3))
+
+    assert processo.numero == '00000011120248270001'
+    assert [p.nome for p in processo.partes] == ['Fulano']
+    assert processo.movimentos[1].ids_documentos == ('1001',)
+    assert processo.documento('1002').titulo == 'Rótulo 2'
+
+
+def test_versao_cobre_todos_os_campos_da_resposta():
+    def versao(resposta):
+        return versao_conteudo(json.dumps(resposta, separators=(',', ':'), sort_keys=True))
+
+    original = versao(_resposta(3))
+    assert versao(_resposta(3)) == original
+    assert versao(_resposta(4)) != original
+
+    # Campos fora do modelo (valor da causa, advogados) também mudam a versão
+    resposta = _resposta(3)
+    resposta['processo']['dadosBasicos']['valorCausa'] = 1000.0
+    assert versao(resposta) != original
+    resposta = _resposta(3)
+    resposta['processo']['dadosBasicos']['polo'][0]['parte'][0]['advogado'] = [{'nome': 'Beltrano'}]
+    assert versao(resposta) != original
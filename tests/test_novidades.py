@@ -0,0 +1,133 @@
+import os
+import threading
+
+import pytest
+
+from modelo import Movimento, Processo
+from novidades import CursorExpirado, DiarioEventos, RepositorioSnapshots, ServicoNovidades, validar_webhook_url
+
+
+def _processo(numero, *ids_movimentos):
+    return Processo(numero, movimentos=[Movimento(i) for i in ids_movimentos])
+
+
+def test_snapshots_limitados_preservam_assinados(tmp_path):
+    snapshots = RepositorioSnapshots(str(tmp_path), max_itens=10, protegidos=lambda: {'0' * 20},
+                                     intervalo_varredura=0)
+    snapshots.guardar('0' * 20, ['1'], [])
+    for n in range(1, 15):
+        caminho = snapshots._caminho(f'{n:020d}')
+        snapshots.guardar(f'{n:020d}', ['1'], [])
+        # mtime crescente: o assinado é o mais antigo
+        os.utime(caminho, (1000 + n, 1000 + n))
+    os.utime(snapshots._caminho('0' * 20), (1, 1))
+    snapshots.guardar(f'{99:020d}', ['1'], [])
+
+    restantes = len(os.listdir(snapshots.diretorio))
+    assert restantes <= 10
+    assert snapshots.obter('0' * 20) is not None
+    assert snapshots.obter(f'{99:020d}') is not None
+
+
+def test_registro_em_segundo_plano(tmp_path):
+    servico = ServicoNovidades(str(tmp_path / 'novidades'))
+    numero = '1' * 20
+
+    assert servico.registrar(numero, _processo(numero, 'm1'))
+    servico._fila.join()
+    assert servico.snapshots.obter(numero)['movimentos'] == ['m1']
+
+    cursor = servico.diario.cursor_atual()
+    servico.registrar(numero, _processo(numero, 'm1', 'm2'))
+    servico._fila.join()
+    eventos, _ = servico.diario.ler(cursor)
+    assert [evento['id'] for _, evento in eventos] == [f'{numero}:movimento:m2']
+    assert oct(os.stat(servico.diretorio).st_mode & 0o777) == oct(0o700)
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1:5000/x', 'http://localhost/x', 'http://10.0.0.5/x', 'http://192.168.1.1/x',
+    'http://169.254.169.254/latest/meta-data', 'http://[::1]/x', 'http://0.0.0.0/x',
+    'ftp://8.8.8.8/x', 'http:///x', 123,
+])
+def test_webhook_recusa_enderecos_internos(url):
+    with pytest.raises(ValueError):
+        validar_webhook_url(url)
+
+
+def test_webhook_hosts_permitidos():
+    validar_webhook_url('https://8.8.8.8/mni')
+    validar_webhook_url('http://interno.local/mni', frozenset({'interno.local'}))
+    with pytest.raises(ValueError):
+        validar_webhook_url('https://8.8.8.8/mni', frozenset({'interno.local'}))
+
+
+def test_entrega_nao_envia_para_endereco_interno(tmp_path):
+    servico = ServicoNovidades(str(tmp_path / 'novidades'), tentativas=3)
+    assinatura = {'id': 'a1', 'segredo': 's', 'webhook_url': 'http://127.0.0.1:9/mni'}
+
+    assert servico.entregador._enviar(assinatura, [{'numero_processo': '1' * 20}]) is False
+    with open(servico.entregador.caminho_falhas, encoding='utf-8') as f:
+        assert 'não público' in f.read()
+
+
+def test_leitura_atravessa_rotacao(tmp_path):
+    diario = DiarioEventos(str(tmp_path), max_bytes=200)
+    cursor = diario.cursor_atual()
+    diario.publicar([{'id': str(i), 'numero_processo': '1' * 20} for i in range(5)])
+    eventos, cursor = diario.ler(cursor, limite=2)
+    diario.publicar([{'id': 'novo', 'numero_processo': '1' * 20}])  # rotaciona
+
+    restantes, cursor = diario.ler(cursor)
+    assert [e['id'] for _, e in eventos + restantes] == ['0', '1', '2', '3', '4', 'novo']
+    assert cursor.startswith('2:')
+
+
+def test_cursor_de_segmento_descartado_expira(tmp_path):
+    diario = DiarioEventos(str(tmp_path), max_bytes=50)
+    cursor = diario.cursor_atual()
+    for i in range(6):  # uma rotação por publicação: só os segmentos 5 e 6 ficam
+        diario.publicar([{'id': str(i), 'numero_processo': '1' * 20}])
+
+    with pytest.raises(CursorExpirado) as erro:
+        diario.ler(cursor)
+    assert erro.value.cursor_atual == diario.cursor_atual()
+    # Números de segmento não se repetem: o cursor antigo nunca cai em outro arquivo
+    assert diario._segmentos() == [5, 6]
+    with pytest.raises(CursorExpirado):
+        diario.ler('99:0')
+
+
+def test_leitura_concorrente_com_rotacao(tmp_path):
+    diario = DiarioEventos(str(tmp_path), max_bytes=500)
+    erros = []
+    parar = threading.Event()
+
+    def ler():
+        cursor = diario.cursor_atual()
+        ultimo = -1
+        while not parar.is_set():
+            try:
+                diario.cursor_atual()
+                eventos, cursor = diario.ler(cursor)
+            except CursorExpirado as e:
+                cursor, ultimo = e.cursor_atual, -1
+                continue
+            except Exception as e:
+                erros.append(e)
+                continue
+            for _, evento in eventos:
+                # Em ordem e sem saltos enquanto o cursor não expira
+                if ultimo >= 0 and int(evento['id']) != ultimo + 1:
+                    erros.append(AssertionError(f"{evento['id']} depois de {ultimo}"))
+                ultimo = int(evento['id'])
+
+    leitores = [threading.Thread(target=ler) for _ in range(4)]
+    for leitor in leitores:
+        leitor.start()
+    for i in range(2000):
+        diario.publicar([{'id': str(i), 'numero_processo': '1' * 20}])
+    parar.set()
+    for leitor in leitores:
+        leitor.join()
+    assert erros == []
@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importacao_dentro_do_orcamento(tmp_path):
+    ambiente = dict(os.environ, NOVIDADES_DIR=str(tmp_path / 'novidades'))
+    processo = subprocess.run(
+        [sys.executable, os.path.join(RAIZ, 'orcamento_importacao.py'), '--repeticoes', '3'],
+        cwd=RAIZ, env=ambiente, capture_output=True, text=True
+    )
+
+    assert processo.returncode == 0, processo.stdout + processo.stderr
@@ -0,0 +1,62 @@
+import os
+import time
+
+from resiliencia import CircuitBreaker
+from roteamento import ConfiguracaoEndpoint, Roteador
+
+WSDL = os.path.join(os.path.dirname(__file__), 'gravacoes', 'mni.wsdl')
+
+
+def _roteador(wsdl_tribunal):
+    padrao = ConfiguracaoEndpoint('padrao', WSDL, 'usuario', 'senha')
+    tribunal = ConfiguracaoEndpoint('4.01', wsdl_tribunal, 'usuario', 'senha', timeout=2)
+    return Roteador({'4.01': tribunal}, padrao)
+
+
+def test_tribunal_inacessivel_nao_impede_aquecimento_nem_prontidao():
+    roteador = _roteador('http://127.0.0.1:9/mni.wsdl')
+
+    falhas = roteador.aquecer()
+
+    assert [pool.config.nome for pool in falhas] == ['4.01']
+    assert roteador.pool_padrao.aquecido
+    assert roteador.pools['4.01'].circuito.estado == CircuitBreaker.ABERTO
+    assert roteador.pronto
+    assert [pool.config.nome for pool in roteador.pendentes()] == ['4.01']
+
+
+def test_tribunal_que_volta_aquece_na_nova_tentativa():
+    roteador = _roteador('http://127.0.0.1:9/mni.wsdl')
+    roteador.aquecer()
+
+    pool = roteador.pools['4.01']
+    pool.config.wsdl_url = WSDL
+    assert pool.tentar_aquecer()
+    assert roteador.pendentes() == []
+
+
+def test_padrao_frio_nao_esta_pronto():
+    padrao = ConfiguracaoEndpoint('padrao', 'http://127.0.0.1:9/mni.wsdl', 'usuario', 'senha', timeout=2)
+    roteador = Roteador({}, padrao)
+
+    assert roteador.aquecer() == [roteador.pool_padrao]
+    assert not roteador.pronto
+
+
+def test_lote_em_tribunal_lento_espera_vaga_sem_descartar():
+    # Chamadas acima da latência alvo derrubam o limite (AIMD) para 1, com
+    # espera_fila curta: sem prazo de lote, as excedentes seriam descartadas
+    padrao = ConfiguracaoEndpoint('padrao', WSDL, 'usuario', 'senha', max_concorrencia=4,
+                                  espera_fila=0.01, latencia_alvo=0.04)
+    roteador = Roteador({}, padrao)
+
+    def consultar_lento(soap_service, numero_processo):
+        time.sleep(0.05)
+        return numero_processo
+
+    numeros = [f'{n:020d}' for n in range(20)]
+    resultados = roteador.executar_em_paralelo(numeros, consultar_lento, prazo=30)
+
+    assert [erro for _, erro in resultados.values() if erro is not None] == []
+    assert roteador.pool_padrao.limitador.limite == 1
+    assert roteador.pool_padrao.circuito.estado == CircuitBreaker.FECHADO
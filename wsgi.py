@@ -0,0 +1,80 @@
+"""
+Ponto de entrada WSGI para produção
+
+Uso: gunicorn -c gunicorn.conf.py
+
+Com preload_app (padrão em gunicorn.conf.py) este módulo é importado e os
+clientes SOAP são aquecidos no processo master antes do fork: o WSDL é
+baixado e parseado uma única vez e os workers o herdam (copy-on-write).
+"""
+
+import logging
+import os
+import threading
+
+from app import app, get_roteador, novidades
+from log_estruturado import reiniciar_apos_fork
+
+logger = logging.getLogger(__name__)
+
+
+# Segundos entre novas tentativas de aquecer endpoints que falharam
+INTERVALO_REAQUECIMENTO = float(os.getenv('SOAP_REAQUECIMENTO_INTERVALO', 30))
+
+
+def aquecer_clientes():
+    """
+    Baixa/parseia o WSDL e cria os clientes SOAP de todos os endpoints
+
+    Returns:
+        list: Pools que não aqueceram (vazia se todos aqueceram)
+    """
+    try:
+        falhas = get_roteador().aquecer()
+    except ValueError as e:
+        # Sem configuração SOAP: /health/ready continua respondendo 503
+        logger.error(f"Erro ao aquecer clientes SOAP: {str(e)}")
+        return []
+    if falhas:
+        logger.warning(f"Endpoints não aquecidos: {', '.join(p.config.nome for p in falhas)}")
+    else:
+        logger.info("Clientes SOAP aquecidos")
+    return falhas
+
+
+def aquecer_ate_concluir(parar=None):
+    """Aquece e tenta de novo, a cada INTERVALO_REAQUECIMENTO, os endpoints que falharam"""
+    parar = parar or threading.Event()
+    pendentes = aquecer_clientes()
+    while pendentes and not parar.wait(INTERVALO_REAQUECIMENTO):
+        pendentes = [pool for pool in get_roteador().pendentes() if not pool.tentar_aquecer()]
+    if not parar.is_set():
+        logger.info("Todos os endpoints SOAP aquecidos")
+
+
+def aquecer_em_segundo_plano():
+    """
+    Aquece os clientes sem bloquear o worker
+
+    Sem preload faz o aquecimento completo; com preload só repete os
+    endpoints que falharam no master (os demais já vêm aquecidos).
+    """
+    threading.Thread(target=aquecer_ate_concluir, name='aquecer-soap', daemon=True).start()
+
+
+def reiniciar_conexoes():
+    """Descarta conexões HTTP herdadas do master após o fork"""
+    try:
+        get_roteador().reiniciar_conexoes()
+    except ValueError:
+        pass
+
+
+def reiniciar_logging():
+    """Recria a thread de escrita dos logs, que não é herdada no fork"""
+    reiniciar_apos_fork()
+
+
+def iniciar_novidades():
+    """Inicia o monitor de novidades e a entrega de webhooks (só um worker vira líder)"""
+    novidades.iniciar(get_roteador)